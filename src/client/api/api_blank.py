@@ -7,8 +7,28 @@ class APIBlank(ApiClient):
     
     def get_list_blank(self):
         """Получить список всех заготовок"""
-        return self._request("GET", "/api/blank")
+        return self._request_all("/api/blank")
     
+    def get_blank_order(self):
+        """Сводка заказов заготовок (группировка на сервере)"""
+        return self._request("GET", "/api/blank/order")
+
+    def get_blank_order_group(self, order: int):
+        """Группы заготовок заказа по материалу и размеру"""
+        return self._request("GET", f"/api/blank/order/{order}/group")
+
+    def get_blank_stock(self):
+        """Остатки прибывших заготовок по материалу и размеру"""
+        return self._request("GET", "/api/blank/stock")
+
+    def update_blank_order(self, order: int, blank_data: dict):
+        """Обновить все заготовки заказа"""
+        return self._request("PATCH", f"/api/blank/order/{order}", json=blank_data)
+
+    def delete_blank_order(self, order: int):
+        """Удалить все заготовки заказа"""
+        return self._request("DELETE", f"/api/blank/order/{order}")
+
     def get_next_order_number(self):
         """Получить следующий номер заказа"""
         return self._request("GET", "/api/blank/order/next")
@@ -0,0 +1,58 @@
+"""API начальной загрузки: все ключи реестра одним запросом"""
+
+from .api_client import ApiClient
+
+
+class ApiBootstrap(ApiClient):
+    """API начальной загрузки (нормализованный граф строк)"""
+
+    def get_bootstrap(self):
+        """Получение всех таблиц и справочников одним ответом"""
+        return self._request("GET", "/api/bootstrap")
+
+
+def build_storage(data: dict) -> dict:
+    """Документы ключей реестра из нормализованного графа: {(group, key): [документ]}.
+
+    Документы собираются по форме из data["shape"] и совпадают с ответами
+    списков; каждый документ — отдельный объект, как при загрузке по ключам.
+    """
+    dict_shape = data["shape"]
+    # В JSON id строк стали строками
+    dict_entity = {
+        table_name: {int(row_id): row for row_id, row in dict_row.items()}
+        for table_name, dict_row in data["entity"].items()
+    }
+    dict_index = {}  # (table_name, column) → {value: [строка по id]}
+
+    def get_index(table_name: str, column: str) -> dict:
+        key = (table_name, column)
+        if key not in dict_index:
+            index = {}
+            for row_id in sorted(dict_entity[table_name]):
+                row = dict_entity[table_name][row_id]
+                index.setdefault(row.get(column), []).append(row)
+            dict_index[key] = index
+        return dict_index[key]
+
+    def build(shape_name: str, row: dict) -> dict:
+        shape = dict_shape[shape_name]
+        document = {field: row.get(field) for field in shape["field"]}
+        for name, ref in shape["nested"].items():
+            table_name = dict_shape[ref["shape"]]["table"]
+            value = row.get(ref["local"])
+            if ref["remote"] == "id":
+                list_row = [dict_entity[table_name][value]] if value in dict_entity[table_name] else []
+            else:
+                list_row = get_index(table_name, ref["remote"]).get(value, []) if value is not None else []
+            if ref["many"]:
+                document[name] = [build(ref["shape"], item) for item in list_row]
+            else:
+                document[name] = build(ref["shape"], list_row[0]) if list_row else None
+        return document
+
+    dict_storage = {}
+    for item in data["list"]:
+        dict_row = dict_entity[dict_shape[item["shape"]]["table"]]
+        dict_storage[(item["group"], item["key"])] = [build(item["shape"], dict_row[row_id]) for row_id in item["id"]]
+    return dict_storage
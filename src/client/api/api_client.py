@@ -1,22 +1,53 @@
 """Базовый API клиент для взаимодействия с сервером"""
 
+import json
+import threading
 import httpx
 from typing import Dict, Any
-from ..constant import API_BASE_URL, API_TIMEOUT
+from ..constant import API_BASE_URL, API_TIMEOUT, API_PAGE_LIMIT, API_MSGPACK
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_TYPE_MSGPACK = "application/msgpack"
+
+
+def decode_body(content: bytes, content_type: str | None) -> Any:
+    """Тело ответа: MessagePack или JSON по Content-Type"""
+    if not content:
+        return None
+    if content_type and content_type.startswith(MEDIA_TYPE_MSGPACK):
+        return msgpack.unpackb(content, raw=False)
+    return json.loads(content)
 
 
 class ApiClient:
-    """Базовый API клиент"""
+    """Базовый API клиент.
+
+    Ответы GET со списками запоминаются вместе с ETag: повторный запрос
+    отправляет If-None-Match, и на 304 Not Modified используется сохранённое тело.
+    Кеш общий для всех клиентов процесса. При API_MSGPACK и установленном
+    msgpack ответы запрашиваются в MessagePack; сжатие httpx согласует сам.
+    """
+
+    _lock_etag = threading.Lock()
+    _dict_etag: Dict[tuple, tuple] = {}  # (url, params) → (etag, тело в байтах, Content-Type, курсор)
     
     def __init__(self, base_url: str = API_BASE_URL):
         """Инициализация клиента API"""
         self.base_url = base_url.rstrip('/')
         self.timeout = API_TIMEOUT
+        self.headers = {"Accept": f"{MEDIA_TYPE_MSGPACK}, application/json;q=0.9"} if API_MSGPACK and msgpack else {}
     
     def _request(self, method: str, endpoint: str, **kwargs) -> Dict[Any, Any] | None:
         """Выполнение HTTP-запроса к серверу"""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        with httpx.Client(timeout=self.timeout) as client:
+        with httpx.Client(timeout=self.timeout, headers=self.headers) as client:
+            if method.upper() == "GET":
+                body, _ = self._get_etag(client, url, kwargs.pop("params", None), **kwargs)
+                return body
             response = client.request(method, url, **kwargs)
             response.raise_for_status()
 
@@ -24,9 +55,42 @@ class ApiClient:
             if response.status_code in (204, 205):
                 return None
 
-            # Если есть тело — возвращаем JSON
-            if response.text:
-                return response.json()
+            # Если есть тело — возвращаем JSON (или MessagePack)
+            return decode_body(response.content, response.headers.get("Content-Type"))
+
+    def _request_all(self, endpoint: str, params: Dict[str, Any] | None = None) -> list:
+        """Загрузка всего списка постранично по курсору из заголовка X-Next-Cursor"""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        params = {**(params or {}), "limit": API_PAGE_LIMIT}
+        list_item = []
+        with httpx.Client(timeout=self.timeout, headers=self.headers) as client:
+            while True:
+                body, cursor = self._get_etag(client, url, params)
+                list_item.extend(body)
+                if not cursor:
+                    return list_item
+                params["cursor"] = cursor
+
+    def _get_etag(self, client: httpx.Client, url: str, params: Dict[str, Any] | None = None,
+                  **kwargs) -> tuple[Any, str | None]:
+        """GET с If-None-Match по сохранённому ETag: (тело, X-Next-Cursor)"""
+        key = (url, tuple(sorted((name, str(value)) for name, value in (params or {}).items())))
+        with self._lock_etag:
+            cached = self._dict_etag.get(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = client.get(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 304 and cached:
+            # Тело разбирается заново: вызывающий код может менять полученные объекты
+            return decode_body(cached[1], cached[2]), cached[3]
+        response.raise_for_status()
 
-            # На всякий случай
-            return None
\ No newline at end of file
+        content = response.content if response.status_code not in (204, 205) else b""
+        content_type = response.headers.get("Content-Type")
+        cursor = response.headers.get("X-Next-Cursor")
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._lock_etag:
+                self._dict_etag[key] = (etag, content, content_type, cursor)
+        return decode_body(content, content_type), cursor
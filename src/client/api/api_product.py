@@ -9,7 +9,7 @@ class ApiProduct(ApiClient):
     """API для продуктов"""
     def get_product(self):
         """Получение всех продуктов"""
-        return self._request("GET", "/api/product")
+        return self._request_all("/api/product")
 
     def create_product(self, product_data):
         """Создание нового продукта"""
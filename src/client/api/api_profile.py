@@ -1,4 +1,5 @@
 """API для работы с профилями"""
+import httpx
 from .api_client import ApiClient
 
 
@@ -6,8 +7,25 @@ class ApiProfile(ApiClient):
     """API для профилей"""
     def get_profile(self):
         """Получение всех профилей"""
-        return self._request("GET", "/api/profile")
+        return self._request_all("/api/profile")
     
+    def get_profile_sketch(self, profile_id, etag=None, size=None):
+        """Получение эскиза профиля байтами.
+
+        :param etag: ETag уже загруженного эскиза — при совпадении
+                     сервер отвечает 304, и возвращается None
+        :param size: миниатюра ("preview", "icon"); без size — оригинал
+        """
+        url = f"{self.base_url}/api/profile/{profile_id}/sketch"
+        headers = {"If-None-Match": etag} if etag else {}
+        params = {"size": size} if size else {}
+        with httpx.Client(timeout=self.timeout) as client:
+            response = client.get(url, headers=headers, params=params)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            return response.content
+
     def create_profile(self, profile_data):
         """Создание нового профиля"""
         return self._request("POST", "/api/profile", json=profile_data)
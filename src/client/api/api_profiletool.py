@@ -8,7 +8,7 @@ class ApiProfileTool(ApiClient):
     
     def get_profiletool(self):
         """Получение всех инструментов профиля"""
-        return self._request("GET", "/api/profile-tool")
+        return self._request_all("/api/profile-tool")
 
     def create_profiletool(self, tool_data):
         """Создание нового инструмента профиля"""
@@ -43,6 +43,10 @@ class ApiProfileTool(ApiClient):
         """Обновление компонента инструмента профиля"""
         return self._request("PATCH", f"/api/profile-tool/component/{component_id}", json=component_data)
 
+    def get_profiletool_component_history(self, profiletool_component_id):
+        """Получение истории статусов компонента в хронологическом порядке"""
+        return self._request_all(f"/api/profile-tool/component/{profiletool_component_id}/history", {"sort": "id"})
+
     def create_profiletool_component_history(self, profiletool_component_id, history_data):
         """Создание истории изменений компонента инструмента профиля"""
         return self._request("POST", f"/api/profile-tool/component/{profiletool_component_id}/history", json=history_data)
\ No newline at end of file
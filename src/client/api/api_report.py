@@ -0,0 +1,19 @@
+"""API для работы с отчётами"""
+from .api_client import ApiClient
+
+
+class ApiReport(ApiClient):
+    """API для отчётов"""
+    def get_report_task(self, params):
+        """Отчёт по задачам: строки и сводки, посчитанные сервером
+
+        :param params: from, to, department_id, type_id, status_id, group_by
+        """
+        return self._request("GET", "/api/report/task", params=params)
+
+    def get_report_machine(self, params):
+        """Отчёт по загрузке станков и типов работ
+
+        :param params: from, to, machine_id, work_type_id
+        """
+        return self._request("GET", "/api/report/machine", params=params)
@@ -0,0 +1,13 @@
+"""API дельта-синхронизации"""
+from .api_client import ApiClient
+
+
+class ApiSync(ApiClient):
+    """API для синхронизации по журналу изменений"""
+    def get_version(self):
+        """Получение текущей версии данных сервера"""
+        return self._request("GET", "/api/sync")
+
+    def get_sync(self, since: int):
+        """Получение изменений после версии since"""
+        return self._request("GET", "/api/sync", params={"since": since})
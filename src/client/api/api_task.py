@@ -3,17 +3,17 @@ from .api_client import ApiClient
 
 class ApiTask(ApiClient):
     """API для задач"""
-    def get_task(self):
-        """Получение всех задач"""
-        return self._request("GET", "api/task")
+    def get_task(self, fields: str | None = None):
+        """Получение всех задач; fields — только эти поля документа (id,type.name,...)"""
+        return self._request_all("api/task", {"fields": fields} if fields else None)
 
     def get_taskdev(self):
         """Получение всех задач разработки"""
-        return self._request("GET", "api/taskdev")
+        return self._request_all("api/taskdev")
 
     def get_queue(self):
         """Получить текущую очередь (в статусе 'в работе', с position)"""
-        return self._request("GET", "api/task/queue")
+        return self._request_all("api/task/queue")
     
     def get_task_component(self, task_id):
         """Получение компонентов задач"""
@@ -1,6 +1,8 @@
 """Менеджер данных для ADITIM Monitor Client"""
 from PySide6.QtCore import QObject, Signal, QTimer
 import asyncio
+import json
+import threading
 import websockets
 from .async_util import run_async
 from .api.api_profile import ApiProfile
@@ -10,10 +12,14 @@ from .api.api_task import ApiTask
 from .api.api_directory import ApiDirectory
 from .api.api_plan import ApiPlanTaskComponentStage
 from .api.api_blank import APIBlank
+from .api.api_sync import ApiSync
+from .api.api_report import ApiReport
+from .api.api_bootstrap import ApiBootstrap, build_storage
 
 class ApiManager(QObject):
     instance = None
     data_updated = Signal(str, str, bool)  # group, key, success
+    data_changed = Signal(str, str, list)  # group, key, id изменённых и удалённых документов
 
     def __new__(cls):
         if cls.instance is None:
@@ -35,6 +41,9 @@ class ApiManager(QObject):
         self.api_directory = ApiDirectory()
         self.api_plan_task_component_stage = ApiPlanTaskComponentStage()
         self.api_blank = APIBlank()
+        self.api_sync = ApiSync()
+        self.api_report = ApiReport()
+        self.api_bootstrap = ApiBootstrap()
 
         # Хранилища данных
         self.table = {}
@@ -76,10 +85,24 @@ class ApiManager(QObject):
         ]
 
 
+        # Порядок документов в ключах реестра (как сортирует сервер)
+        self.dict_sort = {
+            "taskdev": lambda item: (item.get('position') is None, item.get('position') or 0),
+            "queue": lambda item: (item.get('position') is None, item.get('position') or 0),
+            "blank": lambda item: (-(item.get('order') or 0), -item['id']),
+        }
+
         # Инициализация хранилищ
         for key, group, _ in self.registry:
             getattr(self, group)[key] = []
 
+        # Дельта-синхронизация: версия данных, с которой загружены хранилища
+        self.version = None
+        self.lock_sync = threading.Lock()
+
+        # Эскизы профилей: {(profile_id, size): (sketch_hash, bytes)}
+        self.sketch = {}
+
         # Вебсокет
         # self.ws_url = "ws://0.0.0.0:8000/ws/updates"
         
@@ -126,8 +149,17 @@ class ApiManager(QObject):
         """Прослушивание активного соединения"""
         try:
             async for message in ws:
-                if data := self.parse_message(message):
-                    QTimer.singleShot(0, lambda k=data["key"]: self.refresh(k))
+                data = self.parse_message(message)
+                if data is None:
+                    continue
+                if data["event"] == "ping":
+                    await ws.send("pong")
+                elif data["event"] == "resync":
+                    # Сервер отбросил события, которые мы не успели принять
+                    list_key = [key for key, group, loader in self.registry]
+                    QTimer.singleShot(0, lambda k=list_key: self.sync_async(k))
+                else:
+                    QTimer.singleShot(0, lambda d=data: self.apply_event(d))
         except websockets.ConnectionClosed:
             print("⚠️ [WebSocket] Соединение закрыто")
         except Exception as e:
@@ -136,8 +168,8 @@ class ApiManager(QObject):
     def parse_message(self, message):
         """Парсинг сообщения вебсокета"""
         try:
-            data = eval(message) 
-            return data if data.get("event") == "data_updated" else None
+            data = json.loads(message)
+            return data if data.get("event") in ("data_updated", "resync", "ping") else None
         except Exception as e:
             print(f"❌ [WebSocket] Ошибка парсинга: {e}")
             return None
@@ -150,11 +182,127 @@ class ApiManager(QObject):
                 run_async(lambda k=key, g=group, l=loader: self.load_data(k, g, l))
 
     def load_all_async(self):
-        """Загружает все данные в фоне"""
+        """Загружает все данные в фоне одним запросом /api/bootstrap.
+
+        Если он недоступен — версия данных и каждый ключ реестра загружаются
+        отдельно. Версия запрашивается до загрузки: изменения, пришедшие во время
+        загрузки, будут повторно применены при следующей синхронизации.
+        """
+        run_async(self.load_bootstrap, on_error=lambda e: self._load_all_separate_async(e))
+
+    def _load_all_separate_async(self, error: Exception):
+        """Загрузка по ключам реестра, если начальная загрузка не удалась"""
+        print(f"❌ Начальная загрузка недоступна, данные загружаются по ключам: {error}")
+        run_async(self.load_version, on_success=lambda _: self._load_all_group_async())
+
+    def load_bootstrap(self):
+        """Загружает все ключи реестра одним ответом и испускает сигналы"""
+        data = self.api_bootstrap.get_bootstrap()
+        dict_storage = build_storage(data)
+        self.version = data["version"]
+        for key, group, loader in self.registry:
+            if (group, key) not in dict_storage:
+                # Ключа нет в начальной загрузке — загружается отдельно
+                self.refresh_async(key, group, loader)
+                continue
+            getattr(self, group)[key] = dict_storage[(group, key)]
+            self.data_updated.emit(group, key, True)
+        print("✅ Начальная загрузка завершена")
+
+    def _load_all_group_async(self):
+        """Загружает все группы данных в фоне"""
         self._load_group_async("table")
         self._load_group_async("directory")
         self._load_group_async("plan")
 
+    def load_version(self):
+        """Запоминает текущую версию данных сервера"""
+        try:
+            self.version = self.api_sync.get_version()["version"]
+        except Exception as e:
+            self.version = None
+            print(f"❌ Синхронизация недоступна, используется полная загрузка: {e}")
+
+    # Дельта-синхронизация
+    def sync_async(self, list_key: list):
+        """Запускает синхронизацию в фоне"""
+        run_async(lambda: self.sync(list_key))
+
+    def sync(self, list_key: list):
+        """Загружает только изменения после self.version и применяет их к хранилищам.
+
+        :param list_key: ключи из события вебсокета — перезагружаются целиком,
+                         если синхронизация недоступна
+        """
+        with self.lock_sync:
+            if self.version is None:
+                for key in list_key:
+                    self.refresh(key)
+                return
+            try:
+                data = self.api_sync.get_sync(self.version)
+            except Exception as e:
+                print(f"❌ Ошибка синхронизации: {e}")
+                for key in list_key:
+                    self.refresh(key)
+                return
+            if data["is_reset"]:
+                self.version = data["version"]
+                self._load_all_group_async()
+                return
+            for change in data["change"]:
+                self.apply_change(change)
+            self.version = data["version"]
+
+    def apply_event(self, data: dict):
+        """Применяет изменения, пришедшие вместе с событием вебсокета.
+
+        События образуют цепочку версий since → version. Если цепочка
+        не продолжает self.version или изменения не приложены —
+        недостающее дозапрашивается через синхронизацию.
+        """
+        list_key = [item["key"] for item in data.get("list_key", [data])]
+        if data.get("change") is None or self.version is None:
+            self.sync_async(list_key)
+            return
+        if not self.lock_sync.acquire(blocking=False):
+            # Идёт синхронизация в фоне — она заберёт и эти изменения
+            self.sync_async(list_key)
+            return
+        try:
+            if data["version"] <= self.version:
+                return  # Уже получено синхронизацией
+            if data["since"] != self.version:
+                self.sync_async(list_key)
+                return
+            for change in data["change"]:
+                self.apply_change(change)
+            self.version = data["version"]
+        finally:
+            self.lock_sync.release()
+
+    def apply_change(self, change: dict):
+        """Применяет изменения одного ключа реестра к хранилищу"""
+        group, key = change["group"], change["key"]
+        if change["is_reset"]:
+            self.refresh(key)
+            return
+        storage = getattr(self, group)
+        if key not in storage:
+            return
+        dict_item = {item['id']: item for item in storage[key]}
+        for item_id in change["list_delete_id"]:
+            dict_item.pop(item_id, None)
+        for item in change["list_upsert"]:
+            dict_item[item['id']] = item
+        storage[key] = sorted(dict_item.values(), key=self.dict_sort.get(key, lambda item: item['id']))
+        list_id = [item['id'] for item in change["list_upsert"]] + change["list_delete_id"]
+        if not list_id:
+            return
+        print(f"✅ Данные {group}['{key}'] синхронизированы")
+        self.data_changed.emit(group, key, list_id)
+        self.data_updated.emit(group, key, True)
+
     # Обновление данных
     def refresh_async(self, key: str, group: str, loader_func):
         run_async(lambda: self.load_data(key, group, loader_func))
@@ -165,6 +313,49 @@ class ApiManager(QObject):
                 self.refresh_async(k, group, loader)
                 return
         print(f"❌ Не найден источник: '{key}'")
+
+    def get_sketch(self, profile: dict | None, size: str | None = "preview") -> bytes | None:
+        """Байты эскиза профиля (по умолчанию — миниатюра 200x150).
+
+        Загружается с сервера только при смене sketch_hash.
+        """
+        if not profile or not profile.get('sketch_hash'):
+            return None
+        key = (profile['id'], size)
+        sketch_hash, image_data = self.sketch.get(key, (None, None))
+        if sketch_hash == profile['sketch_hash']:
+            return image_data
+        etag = None
+        if sketch_hash:
+            etag = f'"{sketch_hash}"' if size is None else f'"{sketch_hash}-{size}"'
+        try:
+            new_data = self.api_profile.get_profile_sketch(profile['id'], etag, size)
+        except Exception as e:
+            print(f"❌ Ошибка загрузки эскиза профиля {profile['id']}: {e}")
+            return image_data
+        if new_data is not None:
+            image_data = new_data
+        self.sketch[key] = (profile['sketch_hash'], image_data)
+        return image_data
+
+    def get_sketch_async(self, profile: dict | None, on_loaded, size: str | None = "preview"):
+        """Эскиз профиля без блокировки интерфейса: on_loaded(profile, image_data).
+
+        Эскиз из кеша передаётся сразу, загрузка с сервера идёт в пуле потоков.
+        """
+        if not profile or not profile.get('sketch_hash'):
+            on_loaded(profile, None)
+            return
+        sketch_hash, image_data = self.sketch.get((profile['id'], size), (None, None))
+        if sketch_hash == profile['sketch_hash']:
+            on_loaded(profile, image_data)
+            return
+        run_async(
+            lambda: self.get_sketch(profile, size),
+            on_success=lambda image_data: on_loaded(profile, image_data),
+            on_error=lambda e: on_loaded(profile, None)
+        )
+
     # Поиск
     def get_by_id(self, category: str, item_id) -> dict | None:
         for key, group, _ in self.registry:
@@ -11,6 +11,10 @@ CLIENT_BASE_PATH = Path(__file__).parent
 API_BASE_URL = os.getenv('ADITIM_API_URL', 'http://127.0.0.1:8000')
 # API_BASE_URL = os.getenv('ADITIM_API_URL', 'http://192.168.5.100:8000')
 API_TIMEOUT = int(os.getenv('ADITIM_API_TIMEOUT', '30'))
+# Размер страницы при загрузке больших списков (keyset-пагинация сервера)
+API_PAGE_LIMIT = int(os.getenv('ADITIM_API_PAGE_LIMIT', '500'))
+# Запрашивать ответы в MessagePack (нужен пакет msgpack на клиенте и сервере)
+API_MSGPACK = os.getenv('ADITIM_API_MSGPACK', '0') == '1'
 
 # UI Colors - ADITIM Corporate Style
 COLORS = {
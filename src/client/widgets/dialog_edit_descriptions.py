@@ -4,6 +4,7 @@ from PySide6.QtCore import QFile, Qt
 from PySide6.QtUiTools import QUiLoader
 from ..constant import UI_PATHS_ABS
 from ..api_manager import api_manager
+from ..async_util import run_async
 
 
 class DialogEditDescriptions(QDialog):
@@ -113,14 +114,25 @@ class DialogEditDescriptions(QDialog):
         
         # История компонента (если это компонент профиля)
         if component.get('profiletool_component_id'):
-            profiletool_comp = component['profiletool_component']
-            if profiletool_comp.get('history'):
-                history_item = QTreeWidgetItem(comp_item)
-                history_item.setText(0, f"📜 История ({len(profiletool_comp['history'])} записей)")
-                history_item.setExpanded(False)
-                
-                for hist in profiletool_comp['history']:
-                    self.add_history_item(history_item, hist)
+            # История не входит в задачу — загружается для компонента отдельно, в фоне
+            history_item = QTreeWidgetItem(comp_item)
+            history_item.setText(0, "📜 История (загрузка...)")
+            history_item.setExpanded(False)
+            profiletool_component_id = component['profiletool_component_id']
+            run_async(
+                lambda: api_manager.api_profiletool.get_profiletool_component_history(profiletool_component_id),
+                on_success=lambda list_history: self.fill_history_item(history_item, list_history),
+                on_error=lambda e: history_item.setText(0, "📜 История (не загружена)")
+            )
+
+    def fill_history_item(self, history_item, list_history):
+        """Заполняет узел истории компонента загруженными записями"""
+        if not list_history:
+            history_item.parent().removeChild(history_item)
+            return
+        history_item.setText(0, f"📜 История ({len(list_history)} записей)")
+        for hist in list_history:
+            self.add_history_item(history_item, hist)
     
     def add_stage_item(self, parent, stage):
         """Добавляет этап работы с редактируемым описанием"""
@@ -13,7 +13,7 @@ class DialogEditProfile(BaseDialog):
     """Диалог для редактирования существующего профиля."""
     def __init__(self, profile, parent):
         self.profile = profile
-        self.sketch_data = profile['sketch']
+        self.sketch_data = None  # Новый эскиз; None — эскиз не менялся
         super().__init__(UI_PATHS_ABS["DIALOG_EDIT_PROFILE"], api_manager, parent)
 
     def setup_ui(self):
@@ -28,13 +28,17 @@ class DialogEditProfile(BaseDialog):
         self.load_sketch()
 
     def load_sketch(self):
-        """Загружает и отображает эскиз профиля"""
-        if self.profile['sketch']:
-            base64_data = self.profile['sketch']
-            image_data = base64.b64decode(base64_data, validate=True)
-            pixmap = QPixmap()
-            if pixmap.loadFromData(image_data) and not pixmap.isNull():
-                scaled = pixmap.scaled(200, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        """Загружает эскиз профиля в фоне"""
+        self.ui.label_sketch.setText("Загрузка эскиза...")
+        api_manager.get_sketch_async(self.profile, self.show_sketch)
+
+    def show_sketch(self, profile, image_data):
+        """Отображает загруженный эскиз"""
+        if self.sketch_data is not None:
+            return  # эскиз уже заменён вставленным изображением
+        pixmap = QPixmap()
+        if image_data and pixmap.loadFromData(image_data) and not pixmap.isNull():
+            scaled = pixmap.scaled(200, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
             self.ui.label_sketch.setPixmap(scaled)
             self.ui.label_sketch.setText("")
         else:
@@ -88,8 +92,9 @@ class DialogEditProfile(BaseDialog):
             data_profile = {
                 "article": self.ui.lineEdit_article.text().strip(),
                 "description": self.ui.textEdit_description.toPlainText().strip(),
-                "sketch": self.sketch_data
             }
+            if self.sketch_data is not None:
+                data_profile["sketch"] = self.sketch_data
             api_manager.api_profile.update_profile(self.profile['id'], data_profile)
         else:
             QMessageBox.warning(self, "Ошибка", "Пожалуйста, исправьте ошибки в форме.")
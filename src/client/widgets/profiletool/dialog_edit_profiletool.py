@@ -2,7 +2,6 @@
 from PySide6.QtWidgets import (QTableWidgetItem, QCheckBox, QAbstractItemView)
 from PySide6.QtCore import Qt, Slot
 from PySide6.QtGui import QPixmap
-import base64
 
 from ...base_dialog import BaseDialog
 from ...constant import UI_PATHS_ABS
@@ -100,18 +99,14 @@ class DialogEditProfileTool(BaseDialog):
             })
 
     def load_profile_sketch(self, profile):
-        """Загружает и отображает эскиз профиля"""
-        # Получаем данные профиля из api_manager
-        if profile and profile['sketch']:
-            # Конвертируем base64 в QPixmap
-            sketch_data = profile['sketch']
-            if sketch_data.startswith('data:image'):
-                # Убираем префикс data:image/...;base64,
-                base64_data = sketch_data.split(',')[1]
-            else:
-                base64_data = sketch_data
-            # Декодируем base64 и создаем QPixmap
-            image_data = base64.b64decode(base64_data)
+        """Загружает эскиз профиля в фоне"""
+        # Эскиз загружается с сервера только при смене sketch_hash
+        self.ui.label_sketch.setText("Загрузка эскиза...")
+        api_manager.get_sketch_async(profile, self.show_profile_sketch)
+
+    def show_profile_sketch(self, profile, image_data):
+        """Отображает загруженный эскиз профиля"""
+        if image_data:
             pixmap = QPixmap()
             if pixmap.loadFromData(image_data):
                 # Масштабируем изображение
@@ -1,12 +1,13 @@
 """Окно управления заготовками для ADITIM Monitor Client"""
 from PySide6.QtWidgets import QTableWidgetItem, QAbstractItemView, QMenu, QDialog, QMessageBox
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QAction
+from PySide6.QtGui import QAction, QFont, QColor
 
 from ..base_window import BaseWindow
 from ..base_table import BaseTable
 from ..constant import UI_PATHS_ABS
 from ..api_manager import api_manager
+from ..async_util import run_async
 from ..widgets.dialog_create_blank import DialogCreateBlank
 
 
@@ -16,6 +17,8 @@ class WindowBlank(BaseWindow):
     def __init__(self):
         self.selected_order = None  # Выбранный заказ
         self.dict_expanded_order = {}  # Словарь развернутых заказов {order_num: True/False}
+        self.list_order = []  # Сводка заказов с сервера
+        self.dict_order_group = {}  # Группы развернутых заказов {order_num: [группы]}, грузятся при раскрытии
         super().__init__(UI_PATHS_ABS["BLANK_CONTENT"], api_manager)
     
     # =============================================================================
@@ -55,90 +58,55 @@ class WindowBlank(BaseWindow):
     # =============================================================================
     # УПРАВЛЕНИЕ ДАННЫМИ: ЗАГРУЗКА И ОБНОВЛЕНИЕ
     # =============================================================================
-    def refresh_data(self):
-        """Обновление данных в окне заготовок"""
+    def refresh_data(self, group=None, key=None, success=True):
+        """Обновление данных в окне заготовок (только при изменении заготовок)"""
+        if key is not None and key not in ("blank", "blank_material"):
+            return
         self.selected_order = None
         current_tab = self.ui.tabWidget.currentIndex()
         if current_tab == 0:  # Вкладка "Заказы"
-            self.update_table_blank()
+            self.load_order()
         elif current_tab == 1:  # Вкладка "Остатки"
             self.update_table_stock()
-    
+
+    def load_order(self):
+        """Загрузка сводки заказов и групп развернутых заказов (группировка на сервере)"""
+        def load():
+            list_order = api_manager.api_blank.get_blank_order()
+            dict_order_group = {
+                order_num: api_manager.api_blank.get_blank_order_group(order_num)
+                for order_num, is_expanded in self.dict_expanded_order.items() if is_expanded
+            }
+            return list_order, dict_order_group
+
+        def on_success(result):
+            self.list_order, self.dict_order_group = result
+            self.update_table_blank()
+
+        run_async(load, on_success=on_success, on_error=lambda e: print(f"❌ Ошибка загрузки заказов: {e}"))
+
+    def load_order_group(self, order_num):
+        """Загрузка групп одного заказа при его раскрытии"""
+        def on_success(list_group):
+            self.dict_order_group[order_num] = list_group
+            self.update_table_blank()
+
+        run_async(
+            lambda: api_manager.api_blank.get_blank_order_group(order_num),
+            on_success=on_success,
+            on_error=lambda e: print(f"❌ Ошибка загрузки групп заказа {order_num}: {e}")
+        )
+
     def update_table_blank(self):
         """Обновление таблицы заказов (агрегированные данные с раскрывающимися группами)"""
         table = self.ui.tableWidget_blank
-        list_blank = api_manager.table.get('blank', [])
-        
-        # Группировка заготовок по номеру заказа и агрегация данных
-        dict_order_data = {}
-        for blank in list_blank:
-            order_num = blank.get('order', 0)
-            if order_num not in dict_order_data:
-                dict_order_data[order_num] = {
-                    'order': order_num,
-                    'material_set': set(),
-                    'size_set': set(),
-                    'date_order': blank.get('date_order'),
-                    'date_arrival': blank.get('date_arrival'),
-                    'count_total': 0,
-                    'count_arrived': 0,
-                    'list_blank_id': [],
-                    'dict_group': {}  # Группы по материалу+размеру
-                }
-            
-            order_data = dict_order_data[order_num]
-            
-            # Материал
-            material = blank.get('material')
-            material_name = material['name'] if material else 'Не указан'
-            order_data['material_set'].add(material_name)
-            
-            # Размер
-            width = blank.get('blank_width')
-            height = blank.get('blank_height')
-            length = blank.get('blank_length')
-            size = f"{width or '—'}×{height or '—'}×{length or '—'}"
-            order_data['size_set'].add(size)
-            
-            # Группировка по материалу+размеру
-            group_key = f"{material_name} | {size}"
-            if group_key not in order_data['dict_group']:
-                order_data['dict_group'][group_key] = {
-                    'material': material_name,
-                    'size': size,
-                    'count_total': 0,
-                    'count_arrived': 0,
-                    'list_blank_id': []
-                }
-            
-            group = order_data['dict_group'][group_key]
-            group['count_total'] += 1
-            group['list_blank_id'].append(blank['id'])
-            
-            if blank.get('date_arrival'):
-                group['count_arrived'] += 1
-            
-            # Количество для заказа
-            order_data['count_total'] += 1
-            if blank.get('date_arrival'):
-                order_data['count_arrived'] += 1
-            
-            # Дата прибытия (берем последнюю непустую)
-            if blank.get('date_arrival') and not order_data['date_arrival']:
-                order_data['date_arrival'] = blank.get('date_arrival')
-            
-            # Список ID заготовок
-            order_data['list_blank_id'].append(blank['id'])
-        
-        # Сортировка заказов по убыванию номера
-        list_sorted_order = sorted(dict_order_data.keys(), reverse=True)
-        
+
         # Подсчет строк с учетом развернутых заказов
         total_row = 0
-        for order_num in list_sorted_order:
+        for order_data in self.list_order:
             total_row += 1  # Строка заказа
-            if self.dict_expanded_order.get(order_num, False):
-                total_row += len(dict_order_data[order_num]['dict_group'])  # Строки групп
+            if self.dict_expanded_order.get(order_data['order'], False):
+                total_row += len(self.dict_order_group.get(order_data['order'], []))  # Строки групп
         
         table.setRowCount(total_row)
         table.setColumnCount(6)
@@ -146,157 +114,62 @@ class WindowBlank(BaseWindow):
             "Заказ №", "Материал", "Размер", "Заказано", "Прибыло", "Количество"
         ])
         table.horizontalHeader().setStretchLastSection(True)
+
+        font = QFont()
+        font.setBold(True)
         
         current_row = 0
-        for order_num in list_sorted_order:
-            order_data = dict_order_data[order_num]
+        for order_data in self.list_order:
+            order_num = order_data['order']
             is_expanded = self.dict_expanded_order.get(order_num, False)
             
             # Строка заказа (заголовок)
             arrow = "▼" if is_expanded else "▶"
-            order_text = f"{arrow} Заказ № {order_num if order_num else '—'}"
-            item_order = QTableWidgetItem(order_text)
-            item_order.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
-            
-            # Стиль для заголовка
-            from PySide6.QtGui import QFont, QColor
-            font = QFont()
-            font.setBold(True)
-            item_order.setFont(font)
-            item_order.setBackground(QColor("#E3F2FD"))
-            
-            # Материал (сводка)
-            material_text = ', '.join(sorted(order_data['material_set'])) if order_data['material_set'] else '—'
-            item_material = QTableWidgetItem(material_text)
-            item_material.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
-            item_material.setFont(font)
-            item_material.setBackground(QColor("#E3F2FD"))
-            
-            # Размер (сводка)
-            size_text = ', '.join(sorted(order_data['size_set'])) if order_data['size_set'] else '—'
-            item_size = QTableWidgetItem(size_text)
-            item_size.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
-            item_size.setFont(font)
-            item_size.setBackground(QColor("#E3F2FD"))
-            
-            # Дата заказа
-            item_date_order = QTableWidgetItem(order_data['date_order'] or '—')
-            item_date_order.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
-            item_date_order.setFont(font)
-            item_date_order.setBackground(QColor("#E3F2FD"))
-            
-            # Дата прибытия
-            item_date_arrival = QTableWidgetItem(order_data['date_arrival'] or '—')
-            item_date_arrival.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
-            item_date_arrival.setFont(font)
-            item_date_arrival.setBackground(QColor("#E3F2FD"))
-            
-            # Количество (только общее)
-            quantity_text = str(order_data['count_total'])
-            item_quantity = QTableWidgetItem(quantity_text)
-            item_quantity.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
-            item_quantity.setFont(font)
-            item_quantity.setBackground(QColor("#E3F2FD"))
-            
-            table.setItem(current_row, 0, item_order)
-            table.setItem(current_row, 1, item_material)
-            table.setItem(current_row, 2, item_size)
-            table.setItem(current_row, 3, item_date_order)
-            table.setItem(current_row, 4, item_date_arrival)
-            table.setItem(current_row, 5, item_quantity)
+            list_text = [
+                f"{arrow} Заказ № {order_num if order_num else '—'}",
+                ', '.join(order_data['list_material_name']) or '—',
+                ', '.join(order_data['list_size']) or '—',
+                order_data['date_order'] or '—',
+                order_data['date_arrival'] or '—',
+                str(order_data['count_total'])
+            ]
+            for column, text in enumerate(list_text):
+                item = QTableWidgetItem(text)
+                item.setData(Qt.UserRole, {'type': 'order_header', 'order_data': order_data})
+                item.setFont(font)
+                item.setBackground(QColor("#E3F2FD"))
+                table.setItem(current_row, column, item)
             current_row += 1
             
             # Детализированные группы (если заказ развернут)
             if is_expanded:
-                for group_key in sorted(order_data['dict_group'].keys()):
-                    group = order_data['dict_group'][group_key]
-                    
-                    # Пустая колонка для отступа
-                    item_empty = QTableWidgetItem("")
-                    item_empty.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
-                    
-                    # Материал группы
-                    item_group_material = QTableWidgetItem(f"  {group['material']}")
-                    item_group_material.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
-                    
-                    # Размер группы
-                    item_group_size = QTableWidgetItem(group['size'])
-                    item_group_size.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
-                    
-                    # Пустые ячейки для дат
-                    item_empty2 = QTableWidgetItem("")
-                    item_empty2.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
-                    
-                    item_empty3 = QTableWidgetItem("")
-                    item_empty3.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
-                    
-                    # Количество группы (только общее)
-                    group_quantity = str(group['count_total'])
-                    item_group_quantity = QTableWidgetItem(group_quantity)
-                    item_group_quantity.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
-                    
-                    table.setItem(current_row, 0, item_empty)
-                    table.setItem(current_row, 1, item_group_material)
-                    table.setItem(current_row, 2, item_group_size)
-                    table.setItem(current_row, 3, item_empty2)
-                    table.setItem(current_row, 4, item_empty3)
-                    table.setItem(current_row, 5, item_group_quantity)
+                for group in self.dict_order_group.get(order_num, []):
+                    list_text = ["", f"  {group['material_name']}", group['size'], "", "", str(group['count_total'])]
+                    for column, text in enumerate(list_text):
+                        item = QTableWidgetItem(text)
+                        item.setData(Qt.UserRole, {'type': 'group', 'group_data': group, 'order_data': order_data})
+                        table.setItem(current_row, column, item)
                     current_row += 1
     
     def update_table_stock(self):
-        """Обновление таблицы остатков заготовок"""
-        table = self.ui.tableWidget_stock
-        list_blank = api_manager.table.get('blank', [])
-        
-        # Группировка заготовок по материалу и размеру
-        dict_stock = {}
-        for blank in list_blank:
-            # Пропускаем заготовки, которые еще не прибыли
-            if not blank.get('date_arrival'):
-                continue
-            
-            # Материал
-            material = blank.get('material')
-            material_name = material['name'] if material else 'Не указан'
-            
-            # Размер
-            width = blank.get('blank_width')
-            height = blank.get('blank_height')
-            length = blank.get('blank_length')
-            size = f"{width or '—'}×{height or '—'}×{length or '—'}"
-            
-            # Ключ группировки
-            key = f"{material_name}|{size}"
-            
-            if key not in dict_stock:
-                dict_stock[key] = {
-                    'material': material_name,
-                    'size': size,
-                    'total': 0,      # Всего в наличии (прибыли)
-                    'free': 0        # Свободные (не обработаны)
-                }
-            
-            stock = dict_stock[key]
-            stock['total'] += 1
-            
-            # Проверяем, свободна ли заготовка (нет date_product)
-            if not blank.get('date_product'):
-                stock['free'] += 1
-        
-        # Сортировка по материалу, затем по размеру
-        list_sorted_keys = sorted(dict_stock.keys())
-        list_stock = [dict_stock[key] for key in list_sorted_keys]
-        
-        # Используем BaseTable для заполнения
+        """Обновление таблицы остатков заготовок (группировка на сервере)"""
+        run_async(
+            api_manager.api_blank.get_blank_stock,
+            on_success=self.show_table_stock,
+            on_error=lambda e: print(f"❌ Ошибка загрузки остатков: {e}")
+        )
+
+    def show_table_stock(self, list_stock):
+        """Отображение остатков: прибывшие заготовки по материалу и размеру"""
         BaseTable.populate_table(
-            table,
+            self.ui.tableWidget_stock,
             ["Материал", "Размер", "В наличии", "Свободные"],
             list_stock,
             func_row_mapper=lambda stock: [
-                stock['material'],
+                stock['material_name'],
                 stock['size'],
-                str(stock['total']),
-                str(stock['free'])
+                str(stock['count_arrived']),
+                str(stock['count_free'])
             ],
             func_id_getter=None  # Нет ID для группировки
         )
@@ -309,7 +182,7 @@ class WindowBlank(BaseWindow):
     def on_tab_changed(self, index):
         """Обработчик смены вкладки"""
         if index == 0:  # Вкладка "Заказы"
-            self.update_table_blank()
+            self.load_order()
         elif index == 1:  # Вкладка "Остатки"
             self.update_table_stock()
     
@@ -325,10 +198,14 @@ class WindowBlank(BaseWindow):
             order_num = order_data['order']
             
             # Переключаем состояние
-            self.dict_expanded_order[order_num] = not self.dict_expanded_order.get(order_num, False)
+            is_expanded = not self.dict_expanded_order.get(order_num, False)
+            self.dict_expanded_order[order_num] = is_expanded
             
-            # Перерисовываем таблицу
-            self.update_table_blank()
+            # Группы заказа загружаются при первом раскрытии
+            if is_expanded and order_num not in self.dict_order_group:
+                self.load_order_group(order_num)
+            else:
+                self.update_table_blank()
             return
         
         # Если клик по группе - выбираем заказ
@@ -370,9 +247,8 @@ class WindowBlank(BaseWindow):
         )
         
         if reply == QMessageBox.Yes:
-            # Удаление всех заготовок заказа
-            for blank_id in self.selected_order['list_blank_id']:
-                api_manager.api_blank.delete_blank(blank_id)
+            # Удаление всех заготовок заказа одним запросом
+            api_manager.api_blank.delete_blank_order(order_num)
             
             QMessageBox.information(self, "Успех", f"Заказ № {order_num} удален")
             self.refresh_data()
@@ -449,8 +325,7 @@ class WindowBlank(BaseWindow):
             "date_arrival": QDate.currentDate().toString("yyyy-MM-dd")
         }
         
-        for blank_id in self.selected_order['list_blank_id']:
-            api_manager.api_blank.update_blank(blank_id, blank_data)
+        api_manager.api_blank.update_blank_order(order_num, blank_data)
         
         QMessageBox.information(self, "Успех", f"Дата прибытия установлена для заказа № {order_num} ({count} шт.)")
         self.refresh_data()
@@ -1,5 +1,4 @@
 from PySide6.QtCore import Qt, QDate
-import base64
 from PySide6.QtGui import QPixmap, QAction
 from PySide6.QtWidgets import QMenu, QAbstractItemView
 
@@ -14,6 +13,7 @@ class WindowDevelopment(BaseWindow):
     def __init__(self):
         self.task = None
         self.component_id = None
+        self.sketch_profile_id = None  # профиль, эскиз которого ожидается
         super().__init__(UI_PATHS_ABS["DEVELOPMENT_CONTENT"], api_manager)
     
     # =============================================================================
@@ -31,11 +31,17 @@ class WindowDevelopment(BaseWindow):
         self.ui.tableWidget_taskdev.setFocusPolicy(Qt.NoFocus)
         self.refresh_data()
 
-    def load_and_show_sketch(self, sketch_data):
-        """Отображение эскиза профиля"""
-        if sketch_data:
-            base64_str = sketch_data.split(",", 1)[1] if "," in sketch_data else sketch_data
-            image_data = base64.b64decode(base64_str)
+    def load_and_show_sketch(self, profile):
+        """Отображение эскиза профиля; с сервера эскиз загружается в фоне"""
+        self.sketch_profile_id = profile['id'] if profile else None
+        self.ui.label_sketch.setText("Загрузка эскиза...")
+        api_manager.get_sketch_async(profile, self.show_sketch)
+
+    def show_sketch(self, profile, image_data):
+        """Показ загруженного эскиза, если профиль ещё выбран"""
+        if profile and profile['id'] != self.sketch_profile_id:
+            return
+        if image_data:
             pixmap = QPixmap()
             if pixmap.loadFromData(image_data) and not pixmap.isNull():
                 scaled = pixmap.scaled(200, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -82,19 +88,12 @@ class WindowDevelopment(BaseWindow):
             profiletool = self.task.get('profiletool')
             if profiletool:
                 profile = profiletool.get('profile')
-                if profile and profile.get('sketch'):
-                    sketch_data = profile["sketch"]
-                    self.load_and_show_sketch(sketch_data)
-                elif profiletool.get('profile_id'):
+                if not profile and profiletool.get('profile_id'):
                     # Попытка получить profile через ID
                     profile = api_manager.get_by_id('profile', profiletool['profile_id'])
-                    if profile and profile.get('sketch'):
-                        self.load_and_show_sketch(profile["sketch"])
-                    else:
-                        self.ui.label_sketch.setText("Эскиз отсутствует")
-                else:
-                    self.ui.label_sketch.setText("Эскиз отсутствует")
+                self.load_and_show_sketch(profile)
             else:
+                self.sketch_profile_id = None
                 self.ui.label_sketch.setText("Эскиз отсутствует")
             
             self.update_table_task_component()
@@ -106,18 +105,9 @@ class WindowDevelopment(BaseWindow):
         
         # Маппер для строки компонента
         def map_component_row(component):
-            # Определяем статус разработки
-            # Ищем статусы, относящиеся к разработке (id 1, 2, 3)
-            # 1 - Новая, 2 - В разработке, 3 - Разработан
-            history = component.get('history', [])
-            status_name = "Новая"  # По умолчанию
-            
-            if history:
-                # Ищем последний статус из категории разработки
-                dev_statuses = [h for h in history if h['status']['id'] in [1, 2, 3]]
-                if dev_statuses:
-                    last_dev_status = dev_statuses[-1]
-                    status_name = last_dev_status['status']['name']
+            # Последний статус разработки (без статусов изготовления) поддерживает сервер
+            current_status = component.get('current_development_status')
+            status_name = current_status['name'] if current_status else "Новая"
             
             return [
                 component["type"]["name"],
@@ -127,12 +117,7 @@ class WindowDevelopment(BaseWindow):
         
         # Функция для определения статуса компонента
         def get_component_status_id(component):
-            history = component.get('history', [])
-            if history:
-                dev_statuses = [h for h in history if h['status']['id'] in [1, 2, 3]]
-                if dev_statuses:
-                    return dev_statuses[-1]['status']['id']
-            return 1  # По умолчанию "Новая"
+            return component.get('current_development_status_id') or 1  # По умолчанию "Новая"
         
         # Фильтруем только компоненты со статусом "В разработке" (id=2)
         list_component_in_development = [
@@ -173,6 +158,7 @@ class WindowDevelopment(BaseWindow):
         """Очистка панели информации о задаче"""
         self.ui.label_name.clear()
         self.ui.label_description.clear()
+        self.sketch_profile_id = None
         self.ui.label_sketch.clear()
         self.ui.tableWidget_component.setRowCount(0)
 
@@ -14,6 +14,7 @@ class WindowMachine(BaseWindow):
     """Виджет станков"""
 
     def __init__(self):
+        self.dict_operation = None  # {machine_id: [операции]} по очереди, строится при первом клике
         super().__init__(UI_PATHS_ABS["MACHINE_CONTENT"], api_manager)
         self.setup_tree()
 
@@ -36,6 +37,8 @@ class WindowMachine(BaseWindow):
         """Реакция на обновление данных"""
         if success and group == "directory" and key == "machine":
             self.setup_tree()
+        if group == "table" and key == "queue":
+            self.dict_operation = None
 
     def refresh_data(self):
         """Принудительное обновление данных"""
@@ -80,16 +83,7 @@ class WindowMachine(BaseWindow):
         if machine_id is None:
             return
         
-        list_operation = []
-        for task in api_manager.table["queue"]:
-            for component in task["component"]:
-                for stage in component["stage"]:
-                    if stage["machine"] and stage["machine"]["id"] == machine_id:
-                        list_operation.append({
-                            "task": task,
-                            "component": component,
-                            "stage": stage
-                        })
+        list_operation = self.get_operation_by_machine().get(machine_id, [])
 
         # Отображение
         
@@ -102,6 +96,21 @@ class WindowMachine(BaseWindow):
 
         self.ui.listView_machine_task.setModel(list_model)
 
+    def get_operation_by_machine(self):
+        """Операции очереди, сгруппированные по станку (один проход по очереди)"""
+        if self.dict_operation is None:
+            self.dict_operation = {}
+            for task in api_manager.table["queue"]:
+                for component in task["component"]:
+                    for stage in component["stage"]:
+                        if stage["machine"]:
+                            self.dict_operation.setdefault(stage["machine"]["id"], []).append({
+                                "task": task,
+                                "component": component,
+                                "stage": stage
+                            })
+        return self.dict_operation
+
     def get_operation_display_name(self, operation):
         """Имя для строки в listView: основывается на стадии и её контексте"""
         task = operation["task"]
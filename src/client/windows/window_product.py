@@ -7,6 +7,7 @@ from ..base_window import BaseWindow
 from ..base_table import BaseTable
 from ..constant import UI_PATHS_ABS
 from ..api_manager import api_manager
+from ..async_util import run_async
 from ..widgets.profiletool.dialog_create_profiletool import DialogCreateProfileTool
 from ..widgets.profiletool.dialog_edit_profiletool import DialogEditProfileTool
 from ..widgets.product.dialog_create_product import DialogCreateProduct
@@ -113,12 +114,9 @@ class WindowProduct(BaseWindow):
             # Название компонента
             name = component["type"]["name"]
             
-            # Последний статус из истории
-            if component['history']:
-                last_history = component['history'][-1]
-                status = last_history["status"]["name"]
-            else:
-                status = "Новая"
+            # Текущий статус (последняя запись истории)
+            current_status = component.get('current_status')
+            status = current_status["name"] if current_status else "Новая"
             
             # Вариант
             variant = str(component["variant"])
@@ -160,19 +158,27 @@ class WindowProduct(BaseWindow):
         Заполняет tableWidget_component_stage для изделия:
         группировка по задачам (type.name), внутри — этапы
         """
+        # История загружается в фоне и только для выбранного компонента
+        BaseTable.clear_table(self.ui.tableWidget_component_stage)
+        run_async(
+            lambda: api_manager.api_profiletool.get_profiletool_component_history(profiletool_component_id),
+            on_success=lambda list_history: self.fill_table_component_history(profiletool_component_id, list_history),
+            on_error=lambda e: print(f"❌ Ошибка загрузки истории компонента {profiletool_component_id}: {e}")
+        )
+
+    def fill_table_component_history(self, profiletool_component_id, list_history):
+        """Заполняет таблицу загруженной историей, если компонент ещё выбран"""
+        if profiletool_component_id != self.component_id:
+            return
         table = self.ui.tableWidget_component_stage
-        
-        # Собираем историю
-        history_data = []
-        for profiletool in api_manager.table['profiletool']:
-            for component in profiletool["component"]:
-                if component['id'] == profiletool_component_id:
-                    for history in component["history"]:
-                        history_data.append({
-                            "type_name": history['status']['name'],
-                            "date": history["date"],
-                            "description": history["description"]
-                        })
+        history_data = [
+            {
+                "type_name": history['status']['name'] if history.get('status') else "",
+                "date": history["date"],
+                "description": history["description"]
+            }
+            for history in list_history
+        ]
 
         # Заполняем таблицу
         BaseTable.setup_table(table, ["Тип работы", "Дата", "Описание"], len(history_data))
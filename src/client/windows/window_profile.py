@@ -1,5 +1,4 @@
 """Содержимое профилей для ADITIM Monitor Client"""
-import base64
 from PySide6.QtWidgets import QMessageBox
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QPixmap
@@ -15,6 +14,7 @@ class WindowProfile(BaseWindow):
     """Виджет содержимого профилей с таблицей, фильтрацией и просмотром эскизов"""
     def __init__(self):
         self.profile = None
+        self.sketch_profile_id = None  # профиль, эскиз которого ожидается
         super().__init__(UI_PATHS_ABS["PROFILE_CONTENT"], api_manager)
 
     # =============================================================================
@@ -56,20 +56,26 @@ class WindowProfile(BaseWindow):
         """Обновление панели профиля"""
         self.ui.label_profile_article.setText(f"Артикул: {self.profile['article']}")
         self.ui.label_profile_description.setText(f"Описание: {self.profile['description']}")
-        sketch_data = self.profile["sketch"]
-        self.load_and_show_sketch(sketch_data)
+        self.load_and_show_sketch(self.profile)
 
     def clear_info_panel(self):
         """Очистка панели информации о профиле"""
         self.ui.label_profile_article.setText("Артикул: -")
         self.ui.label_profile_description.setText("Описание: -")
+        self.sketch_profile_id = None
         self.ui.label_sketch.setText("Эскиз отсутствует")
 
-    def load_and_show_sketch(self, sketch_data):
-        """Отображение эскиза профиля"""
-        if sketch_data:
-            base64_str = sketch_data.split(",", 1)[1] if "," in sketch_data else sketch_data
-            image_data = base64.b64decode(base64_str)
+    def load_and_show_sketch(self, profile):
+        """Отображение эскиза профиля; с сервера эскиз загружается в фоне"""
+        self.sketch_profile_id = profile['id'] if profile else None
+        self.ui.label_sketch.setText("Загрузка эскиза...")
+        api_manager.get_sketch_async(profile, self.show_sketch)
+
+    def show_sketch(self, profile, image_data):
+        """Показ загруженного эскиза, если профиль ещё выбран"""
+        if profile and profile['id'] != self.sketch_profile_id:
+            return
+        if image_data:
             pixmap = QPixmap()
             if pixmap.loadFromData(image_data) and not pixmap.isNull():
                 scaled = pixmap.scaled(200, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
@@ -13,6 +13,7 @@ from PySide6.QtWidgets import QWidget, QTableWidgetItem, QFileDialog, QMessageBo
 from ..base_table import BaseTable
 from ..constant import UI_PATHS_ABS as UI_PATHS
 from ..api_manager import api_manager
+from ..async_util import run_async
 
 
 class WindowReport(QWidget):
@@ -70,25 +71,25 @@ class WindowReport(QWidget):
         """Загрузка справочников в фильтры."""
         # Отделы
         self.ui.comboBox_department.clear()
-        for item in self.api_manager.directory.get("dir_department", []):
+        for item in self.api_manager.directory.get("department", []):
             self.ui.comboBox_department.addItem(
-                item["description"], 
+                item.get("description") or item["name"],
                 item["id"]
             )
         
         # Типы задач
         self.ui.comboBox_task_type.clear()
-        for item in self.api_manager.directory.get("dir_task_type", []):
+        for item in self.api_manager.directory.get("task_type", []):
             self.ui.comboBox_task_type.addItem(
-                item["description"], 
+                item.get("description") or item["name"],
                 item["id"]
             )
         
         # Статусы задач
         self.ui.comboBox_status.clear()
-        for item in self.api_manager.directory.get("dir_task_status", []):
+        for item in self.api_manager.directory.get("task_status", []):
             self.ui.comboBox_status.addItem(
-                item["description"], 
+                item.get("description") or item["name"],
                 item["id"]
             )
 
@@ -167,10 +168,10 @@ class WindowReport(QWidget):
             filters["department_id"] = self.ui.comboBox_department.currentData()
         
         if self.ui.checkBox_filter_task_type.isChecked():
-            filters["task_type_id"] = self.ui.comboBox_task_type.currentData()
+            filters["type_id"] = self.ui.comboBox_task_type.currentData()
         
         if self.ui.checkBox_filter_status.isChecked():
-            filters["task_status_id"] = self.ui.comboBox_status.currentData()
+            filters["status_id"] = self.ui.comboBox_status.currentData()
         
         return filters
 
@@ -193,109 +194,84 @@ class WindowReport(QWidget):
         self.ui.pushButton_export.setEnabled(True)
 
     def generate_report_task(self) -> None:
-        """Формирование отчёта по задачам."""
+        """Формирование отчёта по задачам.
+
+        Фильтрация и подсчёт сводок выполняются сервером (GET /api/report/task),
+        окно только отображает результат.
+        """
         date_from, date_to = self.get_date_range()
-        filters = self.get_filters()
-        
-        # Получаем все задачи
-        list_task = self.api_manager.table.get("task", [])
-        
-        # Фильтруем по периоду
-        list_filtered = []
-        for task in list_task:
-            task_date = datetime.fromisoformat(task["created"]).date()
-            
-            if date_from <= task_date <= date_to:
-                # Применяем дополнительные фильтры
-                if "department_id" in filters:
-                    if task.get("department_id") != filters["department_id"]:
-                        continue
-                
-                if "task_type_id" in filters:
-                    if task.get("task_type_id") != filters["task_type_id"]:
-                        continue
-                
-                if "task_status_id" in filters:
-                    if task.get("task_status_id") != filters["task_status_id"]:
-                        continue
-                
-                list_filtered.append(task)
-        
+        params = {
+            "from": date_from.isoformat(),
+            "to": date_to.isoformat(),
+            "group_by": "status,department,month",
+            **self.get_filters()
+        }
+        self.ui.pushButton_generate.setEnabled(False)
+        run_async(
+            lambda: self.api_manager.api_report.get_report_task(params),
+            on_success=self.show_report_task,
+            on_error=self.on_report_error
+        )
+
+    def show_report_task(self, report: Dict[str, Any]) -> None:
+        """Отображение отчёта по задачам, полученного с сервера."""
+        self.ui.pushButton_generate.setEnabled(True)
+        list_task = report["list_task"]
+
         # Сохраняем данные для экспорта
-        self.current_report_data = list_filtered
+        self.current_report_data = list_task
         
         # Формируем таблицу
         list_header = [
             "Номер",
+            "Задача",
             "Тип",
             "Отдел",
             "Статус",
-            "Местоположение",
             "Создана",
             "Срок",
             "Описание"
         ]
         
-        def map_row(task: Dict[str, Any]) -> List[str]:
-            task_type = self.api_manager.get_by_id("dir_task_type", task.get("task_type_id"))
-            department = self.api_manager.get_by_id("dir_department", task.get("department_id"))
-            status = self.api_manager.get_by_id("dir_task_status", task.get("task_status_id"))
-            location = self.api_manager.get_by_id("dir_task_location", task.get("task_location_id"))
-            
-            created = datetime.fromisoformat(task["created"]).strftime("%d.%m.%Y")
-            deadline = datetime.fromisoformat(task["deadline"]).strftime("%d.%m.%Y") if task.get("deadline") else "-"
-            
-            return [
-                task.get("number", ""),
-                task_type.get("description", "") if task_type else "",
-                department.get("description", "") if department else "",
-                status.get("description", "") if status else "",
-                location.get("description", "") if location else "",
-                created,
-                deadline,
-                task.get("description", "")
-            ]
-        
+        def format_date(value: Optional[str]) -> str:
+            return date.fromisoformat(value).strftime("%d.%m.%Y") if value else "-"
+
         BaseTable.populate_table(
             self.ui.tableWidget_report,
             list_header,
-            list_filtered,
-            func_row_mapper=map_row,
+            list_task,
+            func_row_mapper=lambda task: [
+                str(task["id"]),
+                task["name"],
+                task.get("type_name") or "",
+                task.get("department_name") or "",
+                task.get("status_name") or "",
+                format_date(task.get("created")),
+                format_date(task.get("deadline")),
+                task.get("description") or ""
+            ],
             func_id_getter=lambda t: t["id"]
         )
         
         # Формируем сводку
-        self.generate_summary_task(list_filtered, date_from, date_to)
+        self.generate_summary_task(report)
 
-    def generate_summary_task(self, list_task: List[Dict[str, Any]], date_from: date, date_to: date) -> None:
+    def on_report_error(self, error: Exception) -> None:
+        """Ошибка получения отчёта с сервера."""
+        self.ui.pushButton_generate.setEnabled(True)
+        QMessageBox.critical(self.ui, "Ошибка", f"Не удалось сформировать отчёт:\n{error}")
+
+    def generate_summary_task(self, report: Dict[str, Any]) -> None:
         """
         Формирование сводки по задачам.
 
         Args:
-            list_task: Список задач
-            date_from: Начало периода
-            date_to: Конец периода
+            report: Отчёт сервера с итогом и группами
         """
-        total = len(list_task)
-        
-        # Группировка по статусам
-        dict_status = {}
-        for task in list_task:
-            status_id = task.get("task_status_id")
-            status = self.api_manager.get_by_id("dir_task_status", status_id)
-            status_name = status.get("description", "Неизвестно") if status else "Неизвестно"
-            
-            dict_status[status_name] = dict_status.get(status_name, 0) + 1
-        
-        # Группировка по отделам
-        dict_department = {}
-        for task in list_task:
-            dept_id = task.get("department_id")
-            dept = self.api_manager.get_by_id("dir_department", dept_id)
-            dept_name = dept.get("description", "Неизвестно") if dept else "Неизвестно"
-            
-            dict_department[dept_name] = dict_department.get(dept_name, 0) + 1
-        
+        date_from = date.fromisoformat(report["date_from"])
+        date_to = date.fromisoformat(report["date_to"])
+        dict_group = report.get("group", {})
+
         # Формируем текст сводки
         summary = f"""
 СВОДКА ПО ЗАДАЧАМ
@@ -304,30 +280,75 @@ class WindowReport(QWidget):
 ═══════════════════════════════════════════════════════
 
 ОБЩАЯ СТАТИСТИКА:
-  • Всего задач: {total}
-
-ПО СТАТУСАМ:
+  • Всего задач: {report["total"]}
 """
         
-        for status_name, count in sorted(dict_status.items()):
-            percent = (count / total * 100) if total > 0 else 0
-            summary += f"  • {status_name}: {count} ({percent:.1f}%)\n"
-        
-        summary += "\nПО ОТДЕЛАМ:\n"
-        for dept_name, count in sorted(dict_department.items()):
-            percent = (count / total * 100) if total > 0 else 0
-            summary += f"  • {dept_name}: {count} ({percent:.1f}%)\n"
+        for group_name, title in [("status", "ПО СТАТУСАМ"), ("department", "ПО ОТДЕЛАМ"), ("month", "ПО МЕСЯЦАМ")]:
+            if group_name not in dict_group:
+                continue
+            summary += f"\n{title}:\n"
+            for group in dict_group[group_name]:
+                summary += f"  • {group['name']}: {group['count']} ({group['percent']:.1f}%)\n"
         
         self.ui.textEdit_summary.setPlainText(summary)
 
     def generate_report_machine(self) -> None:
-        """Формирование отчёта по станкам."""
-        QMessageBox.information(
-            self.ui,
-            "В разработке",
-            "Отчёт по станкам будет реализован в следующей версии."
+        """Формирование отчёта по загрузке станков (считается сервером)."""
+        date_from, date_to = self.get_date_range()
+        params = {"from": date_from.isoformat(), "to": date_to.isoformat()}
+        self.ui.pushButton_generate.setEnabled(False)
+        run_async(
+            lambda: self.api_manager.api_report.get_report_machine(params),
+            on_success=self.show_report_machine,
+            on_error=self.on_report_error
+        )
+
+    def show_report_machine(self, report: Dict[str, Any]) -> None:
+        """Отображение отчёта по загрузке станков."""
+        self.ui.pushButton_generate.setEnabled(True)
+        list_machine = report["list_machine"]
+        self.current_report_data = list_machine
+
+        def format_number(value: Optional[float]) -> str:
+            return f"{value:.1f}" if value is not None else "-"
+
+        BaseTable.populate_table(
+            self.ui.tableWidget_report,
+            ["Станок", "Тип работ", "Операций", "Занято дней", "Загрузка, %",
+             "Средняя длит., дн", "Медиана, дн", "p90, дн", "Простоев", "Макс. простой, дн"],
+            list_machine,
+            func_row_mapper=lambda machine: [
+                machine["name"],
+                machine.get("work_type_name") or "",
+                str(machine["operation_count"]),
+                str(machine["busy_days"]),
+                format_number(machine["utilisation"]),
+                format_number(machine.get("duration_avg")),
+                format_number(machine.get("duration_p50")),
+                format_number(machine.get("duration_p90")),
+                str(machine["gap_count"]),
+                str(machine["gap_max_days"])
+            ],
+            func_id_getter=lambda m: m["id"]
         )
 
+        date_from = date.fromisoformat(report["date_from"])
+        date_to = date.fromisoformat(report["date_to"])
+        summary = f"""
+ЗАГРУЗКА СТАНКОВ
+Период: {date_from.strftime('%d.%m.%Y')} - {date_to.strftime('%d.%m.%Y')} ({report["period_days"]} дн.)
+
+═══════════════════════════════════════════════════════
+
+ПО ТИПАМ РАБОТ:
+"""
+        for work_type in report["list_work_type"]:
+            summary += (
+                f"  • {work_type['name']}: станков {work_type['machine_count']}, "
+                f"операций {work_type['operation_count']}, загрузка {work_type['utilisation']:.1f}%\n"
+            )
+        self.ui.textEdit_summary.setPlainText(summary)
+
     def generate_report_blank(self) -> None:
         """Формирование отчёта по заготовкам."""
         QMessageBox.information(
@@ -144,47 +144,26 @@ class WindowTask(BaseWindow):
     def get_component_stage_status(self, component):
         """Определяет текущий статус этапа компонента
         
+        Текущий этап поддерживает сервер в current_stage_id: последний начатый,
+        если он не завершён, иначе первый незавершённый.
         Возвращает строку с текущим статусом:
         - "Название этапа" - если этап в процессе (есть start, нет finish)
         - "Ожидает: Название этапа" - если предыдущий завершён, текущий не начат
         - "Изготовлен" - если все этапы завершены
         """
-        list_stage = component.get('stage', [])
-        if not list_stage:
+        if not component.get('stages_total'):
             return "Нет этапов"
         
-        # Сортируем по номеру этапа
-        sorted_stage = sorted(list_stage, key=lambda s: s.get('stage_num', 0))
+        current_stage_id = component.get('current_stage_id')
+        if current_stage_id is None:
+            # Все этапы завершены
+            return "Изготовлен"
         
-        # Ищем последний этап с датой начала
-        last_started_stage = None
-        for stage in sorted_stage:
-            if stage.get('start') and stage['start'] != 'None':
-                last_started_stage = stage
-        
-        # Если есть начатый этап без окончания - текущий
-        if last_started_stage and (not last_started_stage.get('finish') or last_started_stage['finish'] == 'None'):
-            work_subtype = last_started_stage.get('work_subtype', {})
-            return work_subtype.get('name', 'Неизвестный этап')
-        
-        # Ищем первый незавершённый этап
-        for stage in sorted_stage:
-            start = stage.get('start')
-            finish = stage.get('finish')
-            
-            # Проверяем, что этап не начат или не завершён
-            if not start or start == 'None' or not finish or finish == 'None':
-                work_subtype = stage.get('work_subtype', {})
-                stage_name = work_subtype.get('name', 'Неизвестный этап')
-                
-                # Если этап не начат - ожидает
-                if not start or start == 'None':
-                    return f"Ожидает: {stage_name}"
-                # Если начат, но не завершён - текущий
-                return stage_name
-        
-        # Все этапы завершены
-        return "Изготовлен"
+        stage = next((s for s in component.get('stage') or [] if s['id'] == current_stage_id), {})
+        stage_name = (stage.get('work_subtype') or {}).get('name', 'Неизвестный этап')
+        if stage.get('start'):
+            return stage_name
+        return f"Ожидает: {stage_name}"
 
     def update_task_component_table(self):
         """Обновление таблицы компонентов задачи"""
@@ -218,18 +197,9 @@ class WindowTask(BaseWindow):
                     len(self.task['component'])
                 )
                 for row, component in enumerate(self.task['component']):
-                    # Определяем статус разработки
-                    # Ищем статусы, относящиеся к разработке (id 1, 2, 3)
-                    # 1 - Новая, 2 - В разработке, 3 - Разработан
-                    history = component['profiletool_component']['history']
-                    status_name = "Новая"  # По умолчанию
-                    
-                    if history:
-                        # Ищем последний статус из категории разработки
-                        dev_statuses = [h for h in history if h['status']['id'] in [1, 2, 3]]
-                        if dev_statuses:
-                            last_dev_status = dev_statuses[-1]
-                            status_name = last_dev_status['status']['name']
+                    # Последний статус разработки (без статусов изготовления) поддерживает сервер
+                    current_status = component['profiletool_component'].get('current_development_status')
+                    status_name = current_status['name'] if current_status else "Новая"
                     
                     BaseTable.populate_row(
                         table,
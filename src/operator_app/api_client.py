@@ -1,18 +1,35 @@
 # api_client.py
+import os
 import requests
 from typing import List, Dict
 from datetime import date
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # BASE_URL = "http://0.0.0.0:8000/api"
 BASE_URL = "http://127.0.0.1:8000/api"
 # BASE_URL = "http://192.168.5.100:8000/api"
 
+# Ответы в MessagePack по желанию: ADITIM_API_MSGPACK=1 и установлен msgpack
+HEADERS = {"Accept": "application/msgpack, application/json;q=0.9"} \
+    if msgpack and os.getenv("ADITIM_API_MSGPACK", "0") == "1" else {}
+
+
+def decode(resp) -> List[Dict]:
+    """Тело ответа: MessagePack или JSON по Content-Type"""
+    if resp.headers.get("Content-Type", "").startswith("application/msgpack"):
+        return msgpack.unpackb(resp.content, raw=False)
+    return resp.json()
+
 def get_work_types():
     url = f"{BASE_URL}/directory/dir_work_type"
 
-    resp = requests.get(url)
+    resp = requests.get(url, headers=HEADERS)
     if resp.status_code == 200:
-        data = resp.json()
+        data = decode(resp)
         return data
     
 def get_machines_by_work_type(work_type_id: int = None) -> List[Dict]:
@@ -21,222 +38,37 @@ def get_machines_by_work_type(work_type_id: int = None) -> List[Dict]:
         url = f"{BASE_URL}/directory/dir_machine"
     else:
         url = f"{BASE_URL}/directory/dir_machine?work_type_id={work_type_id}"
-        resp = requests.get(url)
+        resp = requests.get(url, headers=HEADERS)
         if resp.status_code == 200:
-            data = resp.json()
+            data = decode(resp)
             return data
 
-def get_stages_for_machine(machine_id: int, work_type_id: int = None) -> List[Dict]:
-    tasks = requests.get(f"{BASE_URL}/task").json()
-    next_stages = []
-    for task in tasks:
-        for component in task.get("component", []):
-            # Собираем ВСЕ этапы этого компонента
-            all_component_stages = component.get("stage", []) or []
-            if not all_component_stages:
-                continue
-            # Сортируем по stage_num
-            sorted_stages = sorted(all_component_stages, key=lambda s: s.get("stage_num", 0))
-            # Находим первый незавершённый этап
-            next_stage = None
-            for stage in sorted_stages:
-                if stage.get("finish") is None:
-                    next_stage = stage
-                    break
-            # Если нет незавершённого — пропускаем
-            if next_stage is None:
-                continue
-            # Проверяем, что все предыдущие этапы завершены
-            previous_stages = [s for s in sorted_stages if s["stage_num"] < next_stage["stage_num"]]
-            if any(s.get("finish") is None for s in previous_stages):
-                # Есть незавершённые предыдущие этапы → пропускаем
-                continue
-            # Проверяем, подходит ли этот этап по станку и типу работ
-            machine_match = (
-                next_stage.get("machine") and 
-                next_stage["machine"]["id"] == machine_id
-            )
-            work_type_match = True
-            if work_type_id is not None:
-                if next_stage.get("work_subtype"):
-                    work_type_match = (next_stage["work_subtype"].get("work_type_id") == work_type_id)
-                else:
-                    work_type_match = False
-            if machine_match and work_type_match:
-                # Добавляем контекст
-                next_stage["task_id"] = task["id"]
-                next_stage["task_name"] = _get_task_name(task)
-                next_stage["component_id"] = component.get("id")
-                next_stage["component_name"] = (
-                    component["profiletool_component"]["type"]["name"]
-                    if component.get("profiletool_component")
-                    else (component["product_component"]["name"] if component.get("product_component") else "Без имени")
-                )
-                next_stages.append(next_stage)
-    return next_stages
+def get_operator_stage(**params) -> List[Dict]:
+    """Этапы, доступные оператору: первый незавершённый этап каждого компонента.
 
-def _get_blank_info(component_dict: Dict) -> Dict:
-    """Извлекает информацию о заготовке из компонента профиля
-    
-    Returns:
-        Dict с ключами:
-        - blank_size: str - размеры заготовки "ШxВxД"
-        - product_size: str - размеры детали "ШxВxД"  
-        - material: str - материал заготовки
+    Отбор и названия задач/компонентов считает сервер (GET /api/operator/stage).
     """
-    profiletool_component = component_dict.get('profiletool_component')
-    if not profiletool_component:
-        return {}
-    
-    # Получаем заготовку компонента (если есть)
-    list_blank = profiletool_component.get('blank', [])
-    if not list_blank:
-        return {}
-    
-    # Берем последнюю заготовку (с date_product)
-    blank = None
-    for b in list_blank:
-        if b.get('date_product'):
-            blank = b
-            break
-    
-    if not blank:
-        return {}
-    
-    # Формируем строки размеров
-    blank_width = blank.get('blank_width', 0) or 0
-    blank_height = blank.get('blank_height', 0) or 0
-    blank_length = blank.get('blank_length', 0) or 0
-    blank_size = f"{blank_width}×{blank_height}×{blank_length}"
-    
-    product_width = blank.get('product_width', 0) or 0
-    product_height = blank.get('product_height', 0) or 0
-    product_length = blank.get('product_length', 0) or 0
-    product_size = f"{product_width}×{product_height}×{product_length}"
-    
-    material = blank.get('material', {}).get('name', 'N/A') if blank.get('material') else 'N/A'
-    
-    return {
-        'blank_size': blank_size,
-        'product_size': product_size,
-        'material': material
-    }
+    params = {key: value for key, value in params.items() if value is not None}
+    resp = requests.get(f"{BASE_URL}/operator/stage", params=params, headers=HEADERS)
+    resp.raise_for_status()
+    return decode(resp)
 
-def _get_task_name(task: Dict) -> str:
-    """Возвращает название задачи: артикул профиля или имя изделия"""
-    if task.get('profiletool_id'):
-        profiletool = task.get('profiletool')
-        if profiletool and profiletool.get('profile'):
-            return f"Инструмент {profiletool['profile']['article']}"
-        return "Инструмент N/A"
-    elif task.get('product_id'):
-        product = task.get('product')
-        return f"Изделие {product['name']}" if product else "Изделие N/A"
-    return "Задача N/A"
+def get_stages_for_machine(machine_id: int, work_type_id: int = None) -> List[Dict]:
+    """Следующие этапы компонентов, назначенные на станок"""
+    return get_operator_stage(machine_id=machine_id, work_type_id=work_type_id)
 
 def get_quenching_stages(work_type_id: int) -> List[Dict]:
     """
     Возвращает следующую стадию закалки для каждого компонента каждой задачи.
     """
-    tasks = requests.get(f"{BASE_URL}/task").json()
-    quenching_stages = []
-
-    for task in tasks:
-        for component in task.get("component", []):
-            # Собираем все этапы закалки этого конкретного компонента
-            quenching_stages_for_component = [
-                stage for stage in component.get("stage", []) or []
-                if (stage.get("work_subtype") and 
-                    "закалка" in stage["work_subtype"]["name"].lower() and
-                    stage.get("machine") is None and
-                    stage["work_subtype"].get("work_type_id") == work_type_id)
-            ]
-            
-            if not quenching_stages_for_component:
-                continue
-
-            # Сортируем этапы закалки этого компонента по stage_num
-            sorted_stages = sorted(quenching_stages_for_component, key=lambda s: s.get("stage_num", 0))
-
-            # Ищем первую незавершенную стадию закалки для этого компонента
-            next_stage = None
-            for stage in sorted_stages:
-                if stage.get("finish") is None:
-                    next_stage = stage
-                    break  # Только первая незавершённая для этого компонента
-
-            if next_stage:
-                # Добавляем контекст
-                next_stage["task_id"] = task["id"]
-                next_stage["task_name"] = _get_task_name(task)
-                next_stage["component_id"] = component.get("id")
-                next_stage["component_name"] = (
-                    component["profiletool_component"]["type"]["name"]
-                    if component.get("profiletool_component")
-                    else (component["product_component"]["name"] if component.get("product_component") else "Без имени")
-                )
-                next_stage["is_quenching"] = True
-                quenching_stages.append(next_stage)
-
-    return quenching_stages
+    return get_operator_stage(work_type_id=work_type_id, quenching="true")
 
 def get_all_stages_by_work_type(work_type_id: int) -> List[Dict]:
     """
     Возвращает все незавершённые этапы для выбранной категории работ.
     Этапы НЕ привязаны к станку — станок выбирает оператор.
     """
-    tasks = requests.get(f"{BASE_URL}/task").json()
-    list_stage = []
-    
-    for task in tasks:
-        for component in task.get("component", []):
-            all_component_stage = component.get("stage", []) or []
-            if not all_component_stage:
-                continue
-            
-            # Сортируем по stage_num
-            sorted_stage = sorted(all_component_stage, key=lambda s: s.get("stage_num", 0))
-            
-            # Находим первый незавершённый этап
-            next_stage = None
-            for stage in sorted_stage:
-                if stage.get("finish") is None:
-                    next_stage = stage
-                    break
-            
-            if next_stage is None:
-                continue
-            
-            # Проверяем, что все предыдущие этапы завершены
-            list_previous_stage = [s for s in sorted_stage if s["stage_num"] < next_stage["stage_num"]]
-            if any(s.get("finish") is None for s in list_previous_stage):
-                continue
-            
-            # Проверяем соответствие типу работ
-            work_type_match = False
-            if next_stage.get("work_subtype"):
-                work_type_match = (next_stage["work_subtype"].get("work_type_id") == work_type_id)
-            
-            if work_type_match:
-                # Добавляем контекст
-                next_stage["task_id"] = task["id"]
-                next_stage["task_name"] = _get_task_name(task)
-                next_stage["task_type_id"] = task.get("type_id", 0)
-                next_stage["component_id"] = component.get("id")
-                next_stage["component_name"] = (
-                    component["profiletool_component"]["type"]["name"]
-                    if component.get("profiletool_component")
-                    else (component["product_component"]["name"] if component.get("product_component") else "Без имени")
-                )
-                
-                # Для задач заготовок (type_id = 3) добавляем информацию о размерах
-                if task.get("type_id") == 3:
-                    blank_info = _get_blank_info(component)
-                    next_stage["blank_info"] = blank_info
-                
-                list_stage.append(next_stage)
-    
-    return list_stage
+    return get_operator_stage(work_type_id=work_type_id)
 
 
 def update_stage_dates(stage_id: int, start: date = None, finish: date = None, machine_id: int = None):
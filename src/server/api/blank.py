@@ -1,20 +1,54 @@
 """API routes for blanks"""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, case, literal
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models.blank import ModelBlank
-from ..schemas.blank import SchemaBlankCreate, SchemaBlankUpdate, SchemaBlankResponse, SchemaBlankBulkCreate
+from ..models.directory import ModelDirBlankMaterial
+from ..schemas.blank import (
+    SchemaBlankCreate, SchemaBlankUpdate, SchemaBlankResponse, SchemaBlankBulkCreate,
+    SchemaBlankGroup, SchemaBlankOrder
+)
 from ..events import notify_clients
+from ..pagination import ParamPage, paginate, filter_equal, filter_range, filter_null
+from ..etag import etag_table, SET_TABLE_BLANK
+from ..eager_load import query_schema
 
 router = APIRouter(prefix="/api", tags=["blank"], redirect_slashes=False)
 
+# Разрешённые поля сортировки списка заготовок
+DICT_SORT_BLANK = {
+    "id": ModelBlank.id,
+    "order": ModelBlank.order,
+    "date_order": ModelBlank.date_order,
+    "date_arrival": ModelBlank.date_arrival,
+    "date_product": ModelBlank.date_product,
+}
 
-@router.get("/blank", response_model=List[SchemaBlankResponse])
-def get_list_blank(db: Session = Depends(get_db)):
-    """Получить все заготовки"""
-    return db.query(ModelBlank).order_by(ModelBlank.order.desc(), ModelBlank.id.desc()).all()
+
+@router.get("/blank", response_model=List[SchemaBlankResponse],
+            dependencies=[Depends(etag_table("blank", SET_TABLE_BLANK))])
+def get_list_blank(
+    response: Response,
+    page: ParamPage = Depends(),
+    material_id: Optional[int] = Query(None),
+    order: Optional[int] = Query(None, description="Номер заказа"),
+    has_arrival: Optional[bool] = Query(None, description="Заготовка поступила (есть date_arrival)"),
+    created_from: Optional[date] = Query(None, description="Дата заказа с"),
+    created_to: Optional[date] = Query(None, description="Дата заказа по"),
+    db: Session = Depends(get_db)
+):
+    """Получить заготовки, новые заказы первыми (постранично при limit)"""
+    query = filter_equal(query_schema(db, ModelBlank, SchemaBlankResponse), {
+        ModelBlank.material_id: material_id,
+        ModelBlank.order: order,
+    })
+    query = filter_null(query, ModelBlank.date_arrival, has_arrival)
+    query = filter_range(query, ModelBlank.date_order, created_from, created_to)
+    return paginate(query, ModelBlank, page, DICT_SORT_BLANK, "-order", response)
 
 
 @router.get("/blank/order/next")
@@ -25,6 +59,151 @@ def get_next_order_number(db: Session = Depends(get_db)):
     return {"next_order": next_order}
 
 
+# =============================================================================
+# АГРЕГАЦИЯ: ЗАКАЗЫ И ОСТАТКИ
+# =============================================================================
+NAME_MATERIAL_UNKNOWN = "Не указан"
+
+# Номер заказа; заготовки без номера собираются в заказ 0
+column_order = func.coalesce(ModelBlank.order, 0)
+column_count_arrived = func.count(ModelBlank.date_arrival)
+column_count_free = func.sum(case(
+    (ModelBlank.date_arrival.isnot(None) & ModelBlank.date_product.is_(None), 1), else_=0
+))
+
+
+def format_size(width, height, length) -> str:
+    return f"{width or '—'}×{height or '—'}×{length or '—'}"
+
+
+def query_blank_group(db: Session, is_with_id: bool):
+    """Группы заготовок по материалу и размеру с количествами
+
+    :param is_with_id: добавить id заготовок группы (нужны для действий над заказом)
+    """
+    return db.query(
+        ModelBlank.material_id,
+        ModelDirBlankMaterial.name,
+        ModelBlank.blank_width,
+        ModelBlank.blank_height,
+        ModelBlank.blank_length,
+        func.count(ModelBlank.id),
+        column_count_arrived,
+        column_count_free,
+        func.group_concat(ModelBlank.id) if is_with_id else literal(None),
+    ).outerjoin(
+        ModelDirBlankMaterial, ModelBlank.material_id == ModelDirBlankMaterial.id
+    ).group_by(
+        ModelBlank.material_id, ModelDirBlankMaterial.name,
+        ModelBlank.blank_width, ModelBlank.blank_height, ModelBlank.blank_length
+    )
+
+
+def build_blank_group(list_row) -> list[SchemaBlankGroup]:
+    list_group = [
+        SchemaBlankGroup(
+            material_id=material_id,
+            material_name=material_name or NAME_MATERIAL_UNKNOWN,
+            blank_width=width,
+            blank_height=height,
+            blank_length=length,
+            size=format_size(width, height, length),
+            count_total=count_total,
+            count_arrived=count_arrived,
+            count_free=count_free or 0,
+            list_blank_id=sorted(int(blank_id) for blank_id in str(list_id).split(",")) if list_id else []
+        )
+        for material_id, material_name, width, height, length, count_total, count_arrived, count_free, list_id in list_row
+    ]
+    list_group.sort(key=lambda group: (group.material_name, group.size))
+    return list_group
+
+
+@router.get("/blank/stock", response_model=List[SchemaBlankGroup],
+            dependencies=[Depends(etag_table("blank", SET_TABLE_BLANK))])
+def get_blank_stock(db: Session = Depends(get_db)):
+    """Остатки: прибывшие заготовки по материалу и размеру, сколько из них свободно"""
+    list_row = query_blank_group(db, is_with_id=False).filter(ModelBlank.date_arrival.isnot(None)).all()
+    return build_blank_group(list_row)
+
+
+@router.get("/blank/order", response_model=List[SchemaBlankOrder],
+            dependencies=[Depends(etag_table("blank", SET_TABLE_BLANK))])
+def get_blank_order(db: Session = Depends(get_db)):
+    """Сводка заказов (новые первыми); группы заказа — GET /blank/order/{order}/group"""
+    list_row = db.query(
+        column_order,
+        func.min(ModelBlank.date_order),
+        func.max(ModelBlank.date_arrival),
+        func.count(ModelBlank.id),
+        column_count_arrived,
+        column_count_free,
+    ).group_by(column_order).order_by(column_order.desc()).all()
+
+    # Материалы и размеры заказов — по одной строке на группу, а не на заготовку
+    dict_material = {}
+    dict_size = {}
+    list_row_group = db.query(
+        column_order, ModelDirBlankMaterial.name,
+        ModelBlank.blank_width, ModelBlank.blank_height, ModelBlank.blank_length
+    ).outerjoin(
+        ModelDirBlankMaterial, ModelBlank.material_id == ModelDirBlankMaterial.id
+    ).distinct()
+    for order, material_name, width, height, length in list_row_group:
+        dict_material.setdefault(order, set()).add(material_name or NAME_MATERIAL_UNKNOWN)
+        dict_size.setdefault(order, set()).add(format_size(width, height, length))
+
+    return [
+        SchemaBlankOrder(
+            order=order,
+            date_order=date_order,
+            date_arrival=date_arrival,
+            count_total=count_total,
+            count_arrived=count_arrived,
+            count_free=count_free or 0,
+            list_material_name=sorted(dict_material.get(order, ())),
+            list_size=sorted(dict_size.get(order, ())),
+        )
+        for order, date_order, date_arrival, count_total, count_arrived, count_free in list_row
+    ]
+
+
+@router.get("/blank/order/{order}/group", response_model=List[SchemaBlankGroup],
+            dependencies=[Depends(etag_table("blank", SET_TABLE_BLANK))])
+def get_blank_order_group(order: int, db: Session = Depends(get_db)):
+    """Группы одного заказа по материалу и размеру (для раскрытия заказа)"""
+    list_row = query_blank_group(db, is_with_id=True).filter(column_order == order).all()
+    return build_blank_group(list_row)
+
+
+@router.patch("/blank/order/{order}", response_model=dict)
+def update_blank_order(order: int, blank_data: SchemaBlankUpdate, db: Session = Depends(get_db)):
+    """Обновить все заготовки заказа (например, отметить прибытие)"""
+    list_blank = db.query(ModelBlank).filter(column_order == order).all()
+    if not list_blank:
+        raise HTTPException(status_code=404, detail="Заказ не найден")
+    dict_value = blank_data.model_dump(exclude_unset=True)
+    for blank in list_blank:
+        for key, value in dict_value.items():
+            setattr(blank, key, value)
+    db.commit()
+    notify_clients("table", "blank", "updated")
+    return {"message": "Заказ обновлён", "count": len(list_blank)}
+
+
+@router.delete("/blank/order/{order}", response_model=dict)
+def delete_blank_order(order: int, db: Session = Depends(get_db)):
+    """Удалить все заготовки заказа"""
+    list_blank = db.query(ModelBlank).filter(column_order == order).all()
+    if not list_blank:
+        raise HTTPException(status_code=404, detail="Заказ не найден")
+    for blank in list_blank:
+        db.delete(blank)
+    db.commit()
+    notify_clients("table", "blank", "deleted")
+    return {"message": "Заказ удалён", "count": len(list_blank)}
+
+
 @router.get("/blank/{blank_id}", response_model=SchemaBlankResponse)
 def get_blank(blank_id: int, db: Session = Depends(get_db)):
     """Получить заготовку по ID"""
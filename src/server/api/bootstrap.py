@@ -0,0 +1,145 @@
+"""API начальной загрузки клиента: все таблицы и справочники одним ответом.
+
+Ответ — нормализованный граф: строки таблиц по id, вложенные документы
+заменены ссылками. Форма документа каждого ключа реестра клиента описана
+в "shape" (выводится из схем ответов и связей моделей), клиент собирает
+по ней те же документы, что отдают списки, без повторов одной строки.
+"""
+from typing import Callable, Optional
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models.task import ModelTask
+from ..models.profile import ModelProfile
+from ..models.profiletool import ModelProfileTool
+from ..models.product import ModelProduct
+from ..models.blank import ModelBlank
+from ..models.plan import ModelPlanTaskComponentStage
+from ..schemas.task import SchemaTaskResponse
+from ..schemas.profile import SchemaProfileResponse
+from ..schemas.profiletool import SchemaProfileToolResponse
+from ..schemas.product import SchemaProductResponse
+from ..schemas.blank import SchemaBlankResponse
+from ..schemas.plan import SchemaPlanTaskComponentStageResponse
+from ..directory_cache import DICT_DIRECTORY, SnapshotDirectory, get_directory
+from ..eager_load import get_schema_model, get_dict_field
+from ..etag import etag_table, SET_TABLE_TASK
+from .sync import get_version
+from .task import NAME_TYPE_DEVELOPMENT, NAME_STATUS_IN_PROGRESS
+
+router = APIRouter(prefix="/api", tags=["bootstrap"])
+
+# Ключ реестра клиента → (модель, схема документа, сортировка как у списка)
+DICT_LIST_TABLE = {
+    ("table", "profile"): (ModelProfile, SchemaProfileResponse, "id"),
+    ("table", "profiletool"): (ModelProfileTool, SchemaProfileToolResponse, "id"),
+    ("table", "product"): (ModelProduct, SchemaProductResponse, "id"),
+    ("table", "task"): (ModelTask, SchemaTaskResponse, "id"),
+    ("table", "taskdev"): (ModelTask, SchemaTaskResponse, "position"),
+    ("table", "queue"): (ModelTask, SchemaTaskResponse, "position"),
+    ("table", "blank"): (ModelBlank, SchemaBlankResponse, "-order"),
+    ("plan", "task_component_stage"): (ModelPlanTaskComponentStage, SchemaPlanTaskComponentStageResponse, "id"),
+}
+
+# Ключ реестра клиента → таблица справочника
+DICT_LIST_DIRECTORY = {
+    "department": "dir_department",
+    "component_type": "dir_profiletool_component_type",
+    "profiletool_component_type": "dir_profiletool_component_type",
+    "component_status": "dir_profiletool_component_status",
+    "task_status": "dir_task_status",
+    "profiletool_dimension": "dir_profiletool_dimension",
+    "machine": "dir_machine",
+    "work_type": "dir_work_type",
+    "work_subtype": "dir_work_subtype",
+    "task_type": "dir_task_type",
+    "blank_material": "dir_blank_material",
+    "blank_type": "dir_blank_type",
+}
+
+
+def build_shape(model, schema: type[BaseModel], dict_shape: dict, dict_model: dict):
+    """Форма документа schema: поля строки и ссылки на вложенные документы.
+
+    Ссылка — связь модели с тем же именем: many=False — строка, у которой
+    remote == local текущей строки (обычно id), many=True — все такие строки по id.
+    В dict_model собираются модели всех таблиц, из которых строится документ.
+    """
+    if schema.__name__ in dict_shape:
+        return
+    shape = {"table": model.__table__.name, "field": [], "nested": {}}
+    dict_shape[schema.__name__] = shape
+    dict_model[model.__table__.name] = model
+    mapper = inspect(model)
+    for name, field in get_dict_field(schema).items():
+        schema_nested = get_schema_model(field.annotation)
+        if schema_nested is None:
+            shape["field"].append(name)
+            continue
+        relationship = mapper.relationships[name]
+        (local, remote), = relationship.local_remote_pairs
+        shape["nested"][name] = {
+            "shape": schema_nested.__name__, "local": local.key, "remote": remote.key, "many": relationship.uselist
+        }
+        build_shape(relationship.mapper.class_, schema_nested, dict_shape, dict_model)
+
+
+def query_table(db: Session, model) -> dict:
+    """{id: строка} таблицы одним запросом; отложенные колонки (эскизы) не читаются"""
+    list_column = [prop.columns[0] for prop in inspect(model).column_attrs if not prop.deferred]
+    return {row["id"]: dict(row) for row in db.execute(select(*list_column)).mappings()}
+
+
+def sort_id(dict_row: dict, sort: str, func_filter: Optional[Callable] = None) -> list[int]:
+    """id строк в порядке paginate: (поле IS NULL, поле, id), NULL в конце"""
+    name = sort.lstrip("-")
+    is_desc = sort.startswith("-")
+    list_row = [row for row in dict_row.values() if func_filter is None or func_filter(row)]
+    list_value = sorted(
+        (row for row in list_row if row[name] is not None), key=lambda row: (row[name], row["id"]), reverse=is_desc
+    )
+    list_null = sorted((row for row in list_row if row[name] is None), key=lambda row: row["id"], reverse=is_desc)
+    return [row["id"] for row in list_value + list_null]
+
+
+@router.get("/bootstrap", dependencies=[Depends(etag_table("bootstrap", SET_TABLE_TASK | {"plan_task_component_stage"}))])
+def get_bootstrap(db: Session = Depends(get_db), directory: SnapshotDirectory = Depends(get_directory)):
+    """Все ключи реестра клиента одним ответом.
+
+    version — версия журнала изменений до чтения данных: с неё клиент
+    продолжает дельта-синхронизацию.
+    """
+    version = get_version(db)
+
+    dict_shape = {}
+    dict_model = {}
+    list_key = []
+    for (group, key), (model, schema, _) in DICT_LIST_TABLE.items():
+        build_shape(model, schema, dict_shape, dict_model)
+        list_key.append((group, key, schema.__name__))
+    for key, table_name in DICT_LIST_DIRECTORY.items():
+        model, schema = DICT_DIRECTORY[table_name]
+        build_shape(model, schema, dict_shape, dict_model)
+        list_key.append(("directory", key, schema.__name__))
+
+    dict_entity = {table_name: query_table(db, model) for table_name, model in dict_model.items()}
+
+    type_dev_id = directory.get_id("dir_task_type", NAME_TYPE_DEVELOPMENT)
+    status_in_progress_id = directory.get_id("dir_task_status", NAME_STATUS_IN_PROGRESS)
+    dict_filter = {
+        ("table", "taskdev"): lambda row: row["type_id"] == type_dev_id and row["status_id"] == status_in_progress_id,
+        ("table", "queue"): lambda row: row["status_id"] == status_in_progress_id and row["position"] is not None,
+    }
+    list_result = []
+    for group, key, shape_name in list_key:
+        sort = DICT_LIST_TABLE[(group, key)][2] if (group, key) in DICT_LIST_TABLE else "id"
+        dict_row = dict_entity[dict_shape[shape_name]["table"]]
+        list_result.append({
+            "group": group, "key": key, "shape": shape_name,
+            "id": sort_id(dict_row, sort, dict_filter.get((group, key)))
+        })
+
+    return {"version": version, "shape": dict_shape, "entity": dict_entity, "list": list_result}
@@ -4,93 +4,97 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..models.directory import ( ModelDirDepartment, ModelDirTaskStatus, ModelDirProfileToolComponentType,
-                                 ModelDirProfileToolComponentStatus, ModelDirProfileToolDimension, ModelDirMachine,
-                                 ModelDirWorkType, ModelDirWorkSubtype, ModelDirTaskType,
-                                 ModelDirBlankMaterial, ModelDirBlankType)
+from ..models.directory import ModelDirProfileToolDimension, ModelDirProfileToolComponentType
 
 from ..schemas.directory import ( SchemaDirDepartment, SchemaDirTaskStatus, SchemaDirProfiletoolComponentType,
                                   SchemaDirComponentStatus, SchemaDirToolDimension, SchemaDirToolDimensionCreate,
                                   SchemaDirToolDimensionUpdate, SchemaDirProfiletoolComponentTypeCreate,
                                   SchemaDirProfiletoolComponentTypeUpdate,
-                                  SchemaDirWorkType, WorkSubtype, SchemaDirTaskType,
+                                  SchemaDirWorkType, WorkSubtype, SchemaDirTaskType, SchemaDirMachine,
                                   SchemaDirBlankMaterial, SchemaDirBlankTypeResponse)
 
 from ..events import notify_clients
+from ..directory_cache import SnapshotDirectory, cache_directory, get_directory
+from ..etag import etag_table, SET_TABLE_DIRECTORY
 
 router = APIRouter(prefix="/api/directory", tags=["directory"], redirect_slashes=False)
 
 
-@router.get("/dir_department", response_model=List[SchemaDirDepartment])
-def get_department(db: Session = Depends(get_db)):
+@router.get("/dir_department", response_model=List[SchemaDirDepartment],
+            dependencies=[Depends(etag_table("dir_department", SET_TABLE_DIRECTORY))])
+def get_department(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все отделы"""
-    return db.query(ModelDirDepartment).all()
+    return directory.get_list("dir_department")
 
 
-@router.get("/dir_task_status", response_model=List[SchemaDirTaskStatus])
-def get_task_status(db: Session = Depends(get_db)):
+@router.get("/dir_task_status", response_model=List[SchemaDirTaskStatus],
+            dependencies=[Depends(etag_table("dir_task_status", SET_TABLE_DIRECTORY))])
+def get_task_status(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все статусы задач"""
-    return db.query(ModelDirTaskStatus).all()
+    return directory.get_list("dir_task_status")
 
 
-@router.get("/dir_component_type", response_model=List[SchemaDirProfiletoolComponentType])
-def get_component_type(db: Session = Depends(get_db)):
+@router.get("/dir_component_type", response_model=List[SchemaDirProfiletoolComponentType],
+            dependencies=[Depends(etag_table("dir_profiletool_component_type", SET_TABLE_DIRECTORY))])
+def get_component_type(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все типы компонентов"""
-    return db.query(ModelDirProfileToolComponentType).all()
+    return directory.get_list("dir_profiletool_component_type")
 
 
-@router.get("/dir_component_status", response_model=List[SchemaDirComponentStatus])
-def get_component_status(db: Session = Depends(get_db)):
+@router.get("/dir_component_status", response_model=List[SchemaDirComponentStatus],
+            dependencies=[Depends(etag_table("dir_profiletool_component_status", SET_TABLE_DIRECTORY))])
+def get_component_status(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все статусы компонентов"""
-    return db.query(ModelDirProfileToolComponentStatus).all()
+    return directory.get_list("dir_profiletool_component_status")
 
 
-@router.get("/dir_tool_dimension", response_model=List[SchemaDirToolDimension])
-def get_tool_dimension(db: Session = Depends(get_db)):
+@router.get("/dir_tool_dimension", response_model=List[SchemaDirToolDimension],
+            dependencies=[Depends(etag_table("dir_profiletool_dimension", SET_TABLE_DIRECTORY))])
+def get_tool_dimension(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все размерности инструмента"""
-    return db.query(ModelDirProfileToolDimension).all()
+    return directory.get_list("dir_profiletool_dimension")
 
-@router.get("/dir_machine")
+@router.get("/dir_machine", response_model=List[SchemaDirMachine],
+            dependencies=[Depends(etag_table("dir_machine", SET_TABLE_DIRECTORY))])
 def get_machine(
-        db: Session = Depends(get_db),
+        directory: SnapshotDirectory = Depends(get_directory),
         work_type_id: int = Query(None, description="Фильтр по типу работ")
     ):
-        query = db.query(ModelDirMachine)
-        if work_type_id is not None:
-            query = query.filter(ModelDirMachine.work_type_id == work_type_id)
-        return query.all()
+        return directory.get_list("dir_machine", work_type_id=work_type_id)
 
-@router.get("/dir_work_type", response_model=List[SchemaDirWorkType])
-def get_work_type(db: Session = Depends(get_db)):
+@router.get("/dir_work_type", response_model=List[SchemaDirWorkType],
+            dependencies=[Depends(etag_table("dir_work_type", SET_TABLE_DIRECTORY))])
+def get_work_type(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все типы работ"""
-    return db.query(ModelDirWorkType).all()
+    return directory.get_list("dir_work_type")
 
-@router.get("/dir_work_subtype", response_model=List[WorkSubtype])
-def get_task_component_stage(db: Session = Depends(get_db)):
+@router.get("/dir_work_subtype", response_model=List[WorkSubtype],
+            dependencies=[Depends(etag_table("dir_work_subtype", SET_TABLE_DIRECTORY))])
+def get_task_component_stage(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все стадии задач компонентов"""
-    return db.query(ModelDirWorkSubtype).all()
+    return directory.get_list("dir_work_subtype")
 
-@router.get("/dir_task_type", response_model=List[SchemaDirTaskType])
-def get_task_type(db: Session = Depends(get_db)):
+@router.get("/dir_task_type", response_model=List[SchemaDirTaskType],
+            dependencies=[Depends(etag_table("dir_task_type", SET_TABLE_DIRECTORY))])
+def get_task_type(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все типы задач"""
-    return db.query(ModelDirTaskType).all()
+    return directory.get_list("dir_task_type")
 
 
-@router.get("/dir_blank_material", response_model=List[SchemaDirBlankMaterial])
-def get_blank_material(db: Session = Depends(get_db)):
+@router.get("/dir_blank_material", response_model=List[SchemaDirBlankMaterial],
+            dependencies=[Depends(etag_table("dir_blank_material", SET_TABLE_DIRECTORY))])
+def get_blank_material(directory: SnapshotDirectory = Depends(get_directory)):
     """Получить все материалы заготовок"""
-    return db.query(ModelDirBlankMaterial).all()
+    return directory.get_list("dir_blank_material")
 
-@router.get("/dir_blank_type", response_model=List[SchemaDirBlankTypeResponse])
+@router.get("/dir_blank_type", response_model=List[SchemaDirBlankTypeResponse],
+            dependencies=[Depends(etag_table("dir_blank_type", SET_TABLE_DIRECTORY))])
 def get_blank_type(
-    db: Session = Depends(get_db),
+    directory: SnapshotDirectory = Depends(get_directory),
     material_id: int = Query(None, description="Фильтр по материалу")
 ):
     """Получить все типы заготовок с опциональным фильтром по материалу"""
-    query = db.query(ModelDirBlankType)
-    if material_id is not None:
-        query = query.filter(ModelDirBlankType.material_id == material_id)
-    return query.all()
+    return directory.get_list("dir_blank_type", material_id=material_id)
 
 
 # =============================================================================
@@ -105,6 +109,7 @@ def create_profiletool_dimension(
     db_dimension = ModelDirProfileToolDimension(**dimension.model_dump())
     db.add(db_dimension)
     db.commit()
+    cache_directory.invalidate()
     db.refresh(db_dimension)
     
     # Отправляем сигнал об изменении данных
@@ -133,6 +138,7 @@ def update_profiletool_dimension(
         setattr(db_dimension, key, value)
     
     db.commit()
+    cache_directory.invalidate()
     db.refresh(db_dimension)
     
     # Отправляем сигнал об изменении данных
@@ -156,6 +162,7 @@ def delete_profiletool_dimension(
     
     db.delete(db_dimension)
     db.commit()
+    cache_directory.invalidate()
     
     # Отправляем сигнал об изменении данных
     notify_clients("directory", "profiletool_dimension", "delete")
@@ -175,6 +182,7 @@ def create_component_type(
     db_component_type = ModelDirProfileToolComponentType(**component_type.model_dump())
     db.add(db_component_type)
     db.commit()
+    cache_directory.invalidate()
     db.refresh(db_component_type)
     
     # Отправляем сигнал об изменении данных
@@ -203,6 +211,7 @@ def update_component_type(
         setattr(db_component_type, key, value)
     
     db.commit()
+    cache_directory.invalidate()
     db.refresh(db_component_type)
     
     # Отправляем сигнал об изменении данных
@@ -226,6 +235,7 @@ def delete_component_type(
     
     db.delete(db_component_type)
     db.commit()
+    cache_directory.invalidate()
     
     # Отправляем сигнал об изменении данных
     notify_clients("directory", "component_type", "delete")
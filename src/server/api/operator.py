@@ -0,0 +1,166 @@
+"""API routes for operator app"""
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Session, aliased, contains_eager, joinedload
+
+from ..database import get_db
+from ..models.task import ModelTask, ModelTaskComponent, ModelTaskComponentStage
+from ..models.product import ModelProduct, ModelProductComponent
+from ..models.profile import ModelProfile
+from ..models.profiletool import ModelProfileTool, ModelProfileToolComponent
+from ..models.blank import ModelBlank
+from ..models.directory import ModelDirWorkSubtype, ModelDirProfileToolComponentType, ModelDirBlankMaterial
+from ..schemas.task import SchemaTaskComponentStageResponse
+from ..schemas.operator import SchemaOperatorStage, SchemaOperatorBlankInfo
+from ..directory_cache import SnapshotDirectory, get_directory
+from ..etag import etag_table, SET_TABLE_TASK
+from .report import column_task_name
+
+router = APIRouter(prefix="/api", tags=["operator"])
+
+NAME_QUENCHING = "закалка"
+NAME_COMPONENT_UNKNOWN = "Без имени"
+TYPE_ID_BLANK = 3  # Тип задачи "изготовление заготовок": оператору нужны габариты заготовки
+
+
+def get_quenching_subtype_id(directory: SnapshotDirectory, work_type_id: Optional[int]) -> list[int]:
+    """id подтипов работ закалки.
+
+    Справочник берётся из кеша, а lower() в SQLite не понимает кириллицу,
+    поэтому название проверяется в Python.
+    """
+    return [
+        row["id"] for row in directory.get_list("dir_work_subtype", work_type_id=work_type_id)
+        if NAME_QUENCHING in row["name"].lower()
+    ]
+
+
+def query_next_quenching_stage(db: Session, list_subtype_id: list[int]):
+    """Подзапрос: первый незавершённый этап закалки каждого компонента.
+
+    Этапы нумеруются оконной функцией по (stage_num, id) только среди этапов
+    закалки без станка — предыдущие этапы других видов работ не проверяются,
+    поэтому денормализованный текущий этап компонента здесь не подходит.
+    """
+    stage = ModelTaskComponentStage
+    query = db.query(
+        stage.id.label("stage_id"),
+        func.row_number().over(
+            partition_by=stage.task_component_id,
+            order_by=(func.coalesce(stage.stage_num, 0), stage.id)
+        ).label("row_num")
+    ).filter(
+        stage.finish.is_(None),
+        stage.task_component_id.isnot(None),
+        stage.work_subtype_id.in_(list_subtype_id),
+        stage.machine_id.is_(None)
+    )
+    return query.subquery()
+
+
+def get_blank_info(db: Session, set_component_id: set) -> dict:
+    """Габариты изготовленной заготовки по id компонента инструмента (первая по id)"""
+    dict_blank_info = {}
+    if not set_component_id:
+        return dict_blank_info
+    list_row = db.query(
+        ModelBlank.profiletool_component_id,
+        ModelBlank.blank_width, ModelBlank.blank_height, ModelBlank.blank_length,
+        ModelBlank.product_width, ModelBlank.product_height, ModelBlank.product_length,
+        ModelDirBlankMaterial.name
+    ).outerjoin(
+        ModelDirBlankMaterial, ModelBlank.material_id == ModelDirBlankMaterial.id
+    ).filter(
+        ModelBlank.profiletool_component_id.in_(set_component_id),
+        ModelBlank.date_product.isnot(None)
+    ).order_by(ModelBlank.id)
+    for component_id, *list_size, material_name in list_row:
+        if component_id in dict_blank_info:
+            continue
+        blank_size = "×".join(str(value or 0) for value in list_size[:3])
+        product_size = "×".join(str(value or 0) for value in list_size[3:])
+        dict_blank_info[component_id] = SchemaOperatorBlankInfo(
+            blank_size=blank_size, product_size=product_size, material=material_name or "N/A"
+        )
+    return dict_blank_info
+
+
+@router.get("/operator/stage", response_model=list[SchemaOperatorStage],
+            dependencies=[Depends(etag_table("task_component_stage", SET_TABLE_TASK))])
+def get_operator_stage(
+    work_type_id: Optional[int] = Query(None, description="Тип работ этапа"),
+    machine_id: Optional[int] = Query(None, description="Только этапы, назначенные на станок"),
+    quenching: bool = Query(False, description="Этапы закалки без станка (machine_id не учитывается)"),
+    db: Session = Depends(get_db),
+    directory: SnapshotDirectory = Depends(get_directory)
+):
+    """Этапы, которые оператор может взять в работу: по одному на компонент задачи.
+
+    Обычный режим — следующий (первый незавершённый) этап компонента, подходящий
+    по типу работ и станку. quenching — первый незавершённый этап закалки компонента.
+    Названия задачи и компонента присоединяются в том же запросе.
+    """
+    stage = ModelTaskComponentStage
+    work_subtype = aliased(ModelDirWorkSubtype)
+    query = db.query(
+        stage,
+        ModelTask.id,
+        ModelTask.type_id,
+        column_task_name(),
+        func.coalesce(ModelDirProfileToolComponentType.name, ModelProductComponent.name, literal(NAME_COMPONENT_UNKNOWN)),
+        ModelTaskComponent.profiletool_component_id
+    ).join(
+        ModelTaskComponent, stage.task_component_id == ModelTaskComponent.id
+    ).join(
+        ModelTask, ModelTaskComponent.task_id == ModelTask.id
+    ).outerjoin(
+        ModelProfileTool, ModelTask.profiletool_id == ModelProfileTool.id
+    ).outerjoin(
+        ModelProfile, ModelProfileTool.profile_id == ModelProfile.id
+    ).outerjoin(
+        ModelProduct, ModelTask.product_id == ModelProduct.id
+    ).outerjoin(
+        ModelProfileToolComponent, ModelTaskComponent.profiletool_component_id == ModelProfileToolComponent.id
+    ).outerjoin(
+        ModelDirProfileToolComponentType, ModelProfileToolComponent.type_id == ModelDirProfileToolComponentType.id
+    ).outerjoin(
+        ModelProductComponent, ModelTaskComponent.product_component_id == ModelProductComponent.id
+    ).outerjoin(
+        work_subtype, stage.work_subtype_id == work_subtype.id
+    ).options(
+        contains_eager(stage.work_subtype.of_type(work_subtype)).joinedload(work_subtype.work_type),
+        joinedload(stage.machine)
+    )
+    if quenching:
+        list_subtype_id = get_quenching_subtype_id(directory, work_type_id)
+        if not list_subtype_id:
+            return []
+        subquery = query_next_quenching_stage(db, list_subtype_id)
+        query = query.join(subquery, (subquery.c.stage_id == stage.id) & (subquery.c.row_num == 1))
+    else:
+        # Следующий этап компонента поддерживается в task_component (progress.py)
+        query = query.filter(ModelTaskComponent.next_stage_id == stage.id)
+        if work_type_id is not None:
+            query = query.filter(ModelTaskComponent.next_work_type_id == work_type_id)
+        if machine_id is not None:
+            query = query.filter(ModelTaskComponent.next_machine_id == machine_id)
+    list_row = query.order_by(ModelTask.id, ModelTaskComponent.id).all()
+
+    dict_blank_info = get_blank_info(db, {
+        profiletool_component_id for _, _, type_id, _, _, profiletool_component_id in list_row
+        if type_id == TYPE_ID_BLANK and profiletool_component_id is not None
+    })
+    return [
+        SchemaOperatorStage(
+            **SchemaTaskComponentStageResponse.model_validate(item).model_dump(),
+            task_id=task_id,
+            task_name=task_name,
+            task_type_id=type_id,
+            component_id=item.task_component_id,
+            component_name=component_name,
+            is_quenching=quenching,
+            blank_info=dict_blank_info.get(profiletool_component_id) if type_id == TYPE_ID_BLANK else None
+        )
+        for item, task_id, type_id, task_name, component_name, profiletool_component_id in list_row
+    ]
@@ -13,6 +13,8 @@ from ..schemas.plan import (SchemaPlanTaskComponentStageResponse,
                             SchemaPlanTaskComponentStageCreate,
                             SchemaPlanTaskComponentStageUpdate)
 from ..events import notify_clients
+from ..etag import etag_table, SET_TABLE_DIRECTORY
+from ..eager_load import query_schema
 
 router = APIRouter(prefix="/api", tags=["plan"])
 
@@ -20,18 +22,15 @@ router = APIRouter(prefix="/api", tags=["plan"])
 # =============================================================================
 # GET /plan_task_component_stage - Получить все записи плана стадий компонентов задач
 # =============================================================================
-@router.get("/plan_task_component_stage", response_model=List[SchemaPlanTaskComponentStageResponse])
+@router.get("/plan_task_component_stage", response_model=List[SchemaPlanTaskComponentStageResponse],
+            dependencies=[Depends(etag_table("plan_task_component_stage", SET_TABLE_DIRECTORY))])
 def get_plan(
     db: Session = Depends(get_db)
 ):
     """ Получает все записи из плана стадий обработки компонентов. """
     try:
         # Загружаем основные данные + связи сразу (без lazy loading)
-        query = db.query(ModelPlanTaskComponentStage).all()
-
-
-
-        return query
+        return query_schema(db, ModelPlanTaskComponentStage, SchemaPlanTaskComponentStageResponse).all()
 
     except SQLAlchemyError as e:
         # Логируем ошибку базы данных
@@ -1,8 +1,8 @@
 """API routes for products"""
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models.product import ModelProduct, ModelProductComponent
@@ -14,26 +14,52 @@ from ..schemas.product import (
     SchemaProductComponentResponse,
 )
 from ..events import notify_clients
+from ..pagination import ParamPage, paginate, filter_equal
+from ..etag import etag_table, SET_TABLE_PRODUCT
+from ..fieldset import ParamFieldset, get_projection, response_projection
+from ..eager_load import query_schema
 
 router = APIRouter(prefix="/api", tags=["product"])
 
+# Разрешённые поля сортировки списка изделий
+DICT_SORT_PRODUCT = {
+    "id": ModelProduct.id,
+    "name": ModelProduct.name,
+    "department_id": ModelProduct.department_id,
+}
+
 # =============================================================================
 # ROUTER.GET
 # =============================================================================
-@router.get("/product", response_model=List[SchemaProductResponse])
-def get_product(db: Session = Depends(get_db)):
-    """Получить все продукты с загрузкой связанных данных"""
-    return db.query(ModelProduct).options(
-        selectinload(ModelProduct.department),
-        selectinload(ModelProduct.component)
-    ).all()
+def query_product(db: Session):
+    """Запрос продуктов с загрузкой всех связей SchemaProductResponse"""
+    return query_schema(db, ModelProduct, SchemaProductResponse)
 
-@router.get("/product/{product_id}/component", response_model=List[SchemaProductComponentResponse])
+@router.get("/product", response_model=List[SchemaProductResponse],
+            dependencies=[Depends(etag_table("product", SET_TABLE_PRODUCT))])
+def get_product(
+    response: Response,
+    page: ParamPage = Depends(),
+    department_id: Optional[int] = Query(None),
+    fieldset: ParamFieldset = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Получить продукты с загрузкой связанных данных (постранично при limit, частично при fields/include)"""
+    projection = get_projection(SchemaProductResponse, ModelProduct, fieldset)
+    query = query_product(db) if projection is None else projection.apply(db.query(ModelProduct), DICT_SORT_PRODUCT.values())
+    query = filter_equal(query, {ModelProduct.department_id: department_id})
+    list_product = paginate(query, ModelProduct, page, DICT_SORT_PRODUCT, "id", response)
+    if projection is not None:
+        return response_projection(projection, list_product, response)
+    return list_product
+
+@router.get("/product/{product_id}/component", response_model=List[SchemaProductComponentResponse],
+            dependencies=[Depends(etag_table("product_component", SET_TABLE_PRODUCT))])
 def get_product_component(product_id: int, db: Session = Depends(get_db)):
-    """Получить все компоненты для продукта с загрузкой типов"""
-    return db.query(ModelProductComponent).options(
-        selectinload(ModelProductComponent.type)
-    ).filter(ModelProductComponent.product_id == product_id).all()
+    """Получить все компоненты для продукта"""
+    return query_schema(db, ModelProductComponent, SchemaProductComponentResponse).filter(
+        ModelProductComponent.product_id == product_id
+    ).all()
 
 # =============================================================================
 # ROUTER.POST
@@ -1,21 +1,116 @@
 """API routes for profile"""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from ..models.profile import ModelProfile
 from ..schemas.profile import SchemaProfileCreate, SchemaProfileUpdate, SchemaProfileResponse
 from ..events import notify_clients
+from ..sketch_store import save_sketch, get_sketch_path, get_media_type_file
+from ..pagination import ParamPage, paginate
+from ..etag import etag_table, SET_TABLE_PROFILETOOL
+from ..fieldset import ParamFieldset, get_projection, response_projection
+from ..eager_load import query_schema
 
 router = APIRouter(prefix="/api", tags=["profile"])
 
+# Разрешённые поля сортировки списка профилей
+DICT_SORT_PROFILE = {
+    "id": ModelProfile.id,
+    "article": ModelProfile.article,
+}
+
+
+def decode_sketch(sketch_str: str) -> bytes:
+    """Байты эскиза из Base64 строки (с префиксом data URL или без)"""
+    if "," in sketch_str:
+        # Убираем data:image/png;base64,
+        sketch_str = sketch_str.split(",", 1)[1]
+    try:
+        return base64.b64decode(sketch_str, validate=True)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Sketch must be a Base64 string")
+
+
+def set_sketch(db_profile: ModelProfile, sketch_str: Optional[str]):
+    """Сохранить эскиз в хранилище на диске, в профиле — только его хеш"""
+    db_profile.sketch = None
+    if not sketch_str:
+        db_profile.sketch_hash = None
+        return
+    if not isinstance(sketch_str, str):
+        raise HTTPException(status_code=400, detail="Sketch must be a string")
+    db_profile.sketch_hash = save_sketch(decode_sketch(sketch_str))
+
+
 # =============================================================================
 # ROUTER.GET
 # =============================================================================
-@router.get("/profile", response_model=List[SchemaProfileResponse])
-def get_profile(db: Session = Depends(get_db)):
-    return db.query(ModelProfile).all()
+@router.get("/profile", response_model=List[SchemaProfileResponse],
+            dependencies=[Depends(etag_table("profile", SET_TABLE_PROFILETOOL))])
+def get_profile(
+    response: Response,
+    page: ParamPage = Depends(),
+    article: Optional[str] = Query(None, description="Часть артикула"),
+    fieldset: ParamFieldset = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Получить профили (постранично при limit, частично при fields/include)"""
+    projection = get_projection(SchemaProfileResponse, ModelProfile, fieldset)
+    if projection is None:
+        query = query_schema(db, ModelProfile, SchemaProfileResponse)
+    else:
+        query = projection.apply(db.query(ModelProfile), DICT_SORT_PROFILE.values())
+    if article:
+        query = query.filter(ModelProfile.article.contains(article))
+    list_profile = paginate(query, ModelProfile, page, DICT_SORT_PROFILE, "id", response)
+    if projection is not None:
+        return response_projection(projection, list_profile, response)
+    return list_profile
+
+
+@router.get("/profile/{profile_id}/sketch")
+def get_profile_sketch(
+    profile_id: int,
+    size: Optional[Literal["preview", "icon"]] = Query(None, description="Миниатюра; без size — оригинал"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Эскиз профиля файлом из хранилища с сильным ETag (SHA-256 содержимого).
+
+    Клиент сравнивает sketch_hash из списка профилей и запрашивает эскиз
+    только при его изменении; при совпадении If-None-Match отвечаем 304.
+    """
+    row = db.query(ModelProfile.sketch_hash, ModelProfile.sketch).filter(ModelProfile.id == profile_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    sketch_hash = row.sketch_hash
+    path = get_sketch_path(sketch_hash, size) if sketch_hash else None
+    if path is None and row.sketch:
+        # Эскиз ещё в колонке profile.sketch (до миграции 003) — переносим в хранилище,
+        # как миграция: хеш в профиле, колонка очищается, клиенты получают sketch_hash
+        db_profile = db.get(ModelProfile, profile_id)
+        set_sketch(db_profile, row.sketch)
+        db.commit()
+        notify_clients("table", "profile", "updated")
+        sketch_hash = db_profile.sketch_hash
+        path = get_sketch_path(sketch_hash, size)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Sketch not found")
+
+    etag = f'"{sketch_hash}"' if size is None else f'"{sketch_hash}-{size}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if if_none_match:
+        list_etag = [tag.strip() for tag in if_none_match.split(",")]
+        if etag in list_etag or "*" in list_etag:
+            return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type=get_media_type_file(path), headers=headers)
 
 # =============================================================================
 # ROUTER.POST
@@ -23,14 +118,10 @@ def get_profile(db: Session = Depends(get_db)):
 @router.post("/profile", response_model=SchemaProfileResponse)
 def create_profile(profile: SchemaProfileCreate, db: Session = Depends(get_db)):
     profile_data = profile.model_dump()
-    if profile_data["sketch"]:
-        sketch_str = profile_data["sketch"]
-        if isinstance(sketch_str, str) and "," in sketch_str:
-            # Убираем data:image/png;base64,
-            sketch_str = sketch_str.split(",", 1)[1]
-        profile_data["sketch"] = sketch_str  # ← строка
+    sketch_str = profile_data.pop("sketch")
 
     db_profile = ModelProfile(**profile_data)
+    set_sketch(db_profile, sketch_str)
     db.add(db_profile)
     db.commit()
     db.refresh(db_profile)
@@ -50,19 +141,9 @@ def update_profile(profile_id: int, profile: SchemaProfileUpdate, db: Session =
 
     profile_data = profile.model_dump(exclude_unset=True)  # только переданные поля
 
-    # Обработка sketch — сохраняем как Base64 строку
+    # Обработка sketch — сохраняем как Base64 строку вместе с хешем
     if "sketch" in profile_data:
-        sketch_str = profile_data["sketch"]
-        if sketch_str is None:
-            db_profile.sketch = None
-        else:
-            if isinstance(sketch_str, str):
-                # Убираем data URL, если есть
-                if "," in sketch_str:
-                    sketch_str = sketch_str.split(",", 1)[1]
-                db_profile.sketch = sketch_str  # ← сохраняем как строку!
-            else:
-                raise HTTPException(status_code=400, detail="Sketch must be a string")
+        set_sketch(db_profile, profile_data["sketch"])
     # Если sketch не передан — не трогаем
 
     # Обновляем остальные поля
@@ -1,10 +1,10 @@
 """API routes for profile tool"""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
 
 from ..database import get_db
-from ..models.profiletool import ModelProfileTool , ModelProfileToolComponent, ModelProfileToolComponentHistory
+from ..models.profiletool import ModelProfileTool , ModelProfileToolComponent, ModelProfileToolComponentHistory, SET_STATUS_ID_DEVELOPMENT
 from ..schemas.profiletool import (
     SchemaProfileToolCreate,
     SchemaProfileToolResponse,
@@ -16,30 +16,89 @@ from ..schemas.profiletool import (
     ProfileToolComponentUpdate
 )
 from ..events import notify_clients
+from ..pagination import ParamPage, paginate, filter_equal
+from ..etag import etag_table, SET_TABLE_DIRECTORY, SET_TABLE_PROFILETOOL
+from ..fragment_cache import cache_fragment, dump_profiletool_list
+from ..fieldset import ParamFieldset, get_projection, response_projection
+from ..eager_load import query_schema
 
 router = APIRouter(prefix="/api", tags=["profile-tool"])
 
+# Разрешённые поля сортировки списка инструментов
+DICT_SORT_PROFILETOOL = {
+    "id": ModelProfileTool.id,
+    "profile_id": ModelProfileTool.profile_id,
+    "dimension_id": ModelProfileTool.dimension_id,
+}
+
+# Разрешённые поля сортировки истории компонента
+DICT_SORT_HISTORY = {
+    "id": ModelProfileToolComponentHistory.id,
+    "date": ModelProfileToolComponentHistory.date,
+}
+
 # =============================================================================
 # ROUTER.GET
 # =============================================================================
-@router.get("/profile-tool", response_model=List[SchemaProfileToolResponse])
-def get_profiletool(db: Session = Depends(get_db)):
-    """Получить все инструменты профиля с загрузкой связанных данных"""
-    return db.query(ModelProfileTool).options(
-        selectinload(ModelProfileTool.profile),
-        selectinload(ModelProfileTool.dimension),
-        selectinload(ModelProfileTool.component).selectinload(ModelProfileToolComponent.type),
-        selectinload(ModelProfileTool.component).selectinload(ModelProfileToolComponent.history)
-    ).all()
+def query_profiletool(db: Session):
+    """Запрос инструментов профиля с загрузкой всех связей SchemaProfileToolResponse"""
+    return query_schema(db, ModelProfileTool, SchemaProfileToolResponse)
+
+@router.get("/profile-tool", response_model=List[SchemaProfileToolResponse],
+            dependencies=[Depends(etag_table("profiletool", SET_TABLE_PROFILETOOL))])
+def get_profiletool(
+    response: Response,
+    page: ParamPage = Depends(),
+    profile_id: Optional[int] = Query(None),
+    dimension_id: Optional[int] = Query(None),
+    fieldset: ParamFieldset = Depends(),
+    db: Session = Depends(get_db)
+):
+    """Получить инструменты профиля с загрузкой связанных данных (постранично при limit).
+
+    Полные документы склеиваются из фрагментов кеша (fragment_cache),
+    частичные (fields/include) — по проекции; заголовки ETag и X-Next-Cursor
+    переносятся из response.
+    """
+    projection = get_projection(SchemaProfileToolResponse, ModelProfileTool, fieldset)
+    generation = cache_fragment.get_generation()
+    query = db.query(ModelProfileTool)
+    if projection is not None:
+        query = projection.apply(query, DICT_SORT_PROFILETOOL.values())
+    query = filter_equal(query, {
+        ModelProfileTool.profile_id: profile_id,
+        ModelProfileTool.dimension_id: dimension_id,
+    })
+    list_profiletool = paginate(query, ModelProfileTool, page, DICT_SORT_PROFILETOOL, "id", response)
+    if projection is not None:
+        return response_projection(projection, list_profiletool, response)
+    return Response(
+        content=dump_profiletool_list(db, list_profiletool, generation),
+        media_type="application/json", headers=dict(response.headers)
+    )
 
 
-@router.get("/profile-tool/{profiletool_id}/component", response_model=List[SchemaProfileToolComponentResponse])
+@router.get("/profile-tool/{profiletool_id}/component", response_model=List[SchemaProfileToolComponentResponse],
+            dependencies=[Depends(etag_table("profiletool_component", SET_TABLE_PROFILETOOL))])
 def get_profiletool_component(profiletool_id: int, db: Session = Depends(get_db)):
-    """Получить все компоненты инструмента профиля с загрузкой типов и истории"""
-    return db.query(ModelProfileToolComponent).options(
-        selectinload(ModelProfileToolComponent.type),
-        selectinload(ModelProfileToolComponent.history).selectinload(ModelProfileToolComponentHistory.status)
-    ).filter(ModelProfileToolComponent.profiletool_id == profiletool_id).all()
+    """Получить все компоненты инструмента профиля с типами, текущим статусом и заготовками"""
+    return query_schema(db, ModelProfileToolComponent, SchemaProfileToolComponentResponse).filter(
+        ModelProfileToolComponent.profiletool_id == profiletool_id
+    ).all()
+
+
+@router.get("/profile-tool/component/{profiletool_component_id}/history",
+            response_model=List[SchemaProfileToolComponentHistoryResponse],
+            dependencies=[Depends(etag_table("profiletool_component_history", SET_TABLE_DIRECTORY))])
+def get_profiletool_component_history(
+    profiletool_component_id: int,
+    response: Response,
+    page: ParamPage = Depends(),
+    db: Session = Depends(get_db)
+):
+    """История статусов компонента, по умолчанию новые записи первыми (постранично при limit)"""
+    query = query_schema(db, ModelProfileToolComponentHistory, SchemaProfileToolComponentHistoryResponse).filter(ModelProfileToolComponentHistory.profiletool_component_id == profiletool_component_id)
+    return paginate(query, ModelProfileToolComponentHistory, page, DICT_SORT_HISTORY, "-id", response)
 
 
 # =============================================================================
@@ -89,6 +148,9 @@ def create_profiletool_component(profiletool_id: int, component: SchemaProfileTo
 @router.post("/profile-tool/component/{profiletool_component_id}/history", response_model=SchemaProfileToolComponentHistoryResponse)
 def create_profiletool_component_history(profiletool_component_id: int, history_data: SchemaProfileToolComponentHistoryCreate, db: Session = Depends(get_db)):
     """Создание истории изменений компонента инструмента профиля"""
+    db_component = db.get(ModelProfileToolComponent, profiletool_component_id)
+    if not db_component:
+        raise HTTPException(status_code=404, detail="Компонент не найден")
     try:
         db_history = ModelProfileToolComponentHistory(
             profiletool_component_id=profiletool_component_id,
@@ -97,6 +159,11 @@ def create_profiletool_component_history(profiletool_component_id: int, history_
             description=history_data.description
         )
         db.add(db_history)
+        # Новая запись становится текущим статусом компонента — в той же транзакции
+        db_component.current_status_id = history_data.status_id
+        db_component.current_status_date = history_data.date
+        if history_data.status_id in SET_STATUS_ID_DEVELOPMENT:
+            db_component.current_development_status_id = history_data.status_id
         db.commit()
         db.refresh(db_history)
 
@@ -0,0 +1,314 @@
+"""API routes for report"""
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, literal
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..models.task import ModelTask, ModelTaskComponentStage
+from ..models.product import ModelProduct
+from ..models.profile import ModelProfile
+from ..models.profiletool import ModelProfileTool
+from ..models.directory import (
+    ModelDirDepartment, ModelDirTaskStatus, ModelDirTaskType, ModelDirMachine, ModelDirWorkType
+)
+from ..schemas.report import (
+    SchemaReportTaskResponse, SchemaReportTaskRow, SchemaReportGroup,
+    SchemaReportMachineResponse, SchemaReportMachineStat
+)
+from ..cache import CacheVersion
+from .sync import get_version
+
+router = APIRouter(prefix="/api", tags=["report"])
+
+SET_GROUP_BY_TASK = {"status", "department", "month"}
+NAME_UNKNOWN = "Не указано"
+
+
+# =============================================================================
+# ОТЧЁТ ПО ЗАДАЧАМ
+# =============================================================================
+def query_task_report(db: Session, *column):
+    """Задачи с присоединёнными справочниками; отдел — отдел изделия задачи"""
+    return db.query(*column).select_from(ModelTask).outerjoin(
+        ModelProduct, ModelTask.product_id == ModelProduct.id
+    ).outerjoin(
+        ModelDirDepartment, ModelProduct.department_id == ModelDirDepartment.id
+    ).outerjoin(
+        ModelDirTaskStatus, ModelTask.status_id == ModelDirTaskStatus.id
+    ).outerjoin(
+        ModelDirTaskType, ModelTask.type_id == ModelDirTaskType.id
+    )
+
+
+def filter_task_report(query, date_from, date_to, department_id, type_id, status_id):
+    """Период по дате создания и фильтры по справочникам"""
+    if date_from is not None:
+        query = query.filter(ModelTask.created >= date_from)
+    if date_to is not None:
+        query = query.filter(ModelTask.created <= date_to)
+    if department_id is not None:
+        query = query.filter(ModelProduct.department_id == department_id)
+    if type_id is not None:
+        query = query.filter(ModelTask.type_id == type_id)
+    if status_id is not None:
+        query = query.filter(ModelTask.status_id == status_id)
+    return query
+
+
+def column_task_name():
+    """Название задачи в SQL: "Инструмент <артикул>" или "Изделие <имя>".
+
+    Требует присоединённых ModelProfile (через инструмент) и ModelProduct.
+    """
+    return case(
+        (ModelTask.profiletool_id.isnot(None), literal("Инструмент ") + func.coalesce(ModelProfile.article, "N/A")),
+        (ModelTask.product_id.isnot(None), literal("Изделие ") + func.coalesce(ModelProduct.name, "N/A")),
+        else_=literal("Задача N/A")
+    )
+
+
+def build_group(list_row, total: int) -> list[SchemaReportGroup]:
+    """Группы сводки из строк (key, name, count), по убыванию числа задач"""
+    return [
+        SchemaReportGroup(
+            key=str(key) if key is not None else None,
+            name=name or NAME_UNKNOWN,
+            count=count,
+            percent=round(count / total * 100, 1) if total else 0.0
+        )
+        for key, name, count in sorted(list_row, key=lambda row: (-row[2], row[1] or ""))
+    ]
+
+
+@router.get("/report/task", response_model=SchemaReportTaskResponse)
+def get_report_task(
+    date_from: Optional[date] = Query(None, alias="from", description="Создана не раньше"),
+    date_to: Optional[date] = Query(None, alias="to", description="Создана не позже"),
+    department_id: Optional[int] = Query(None),
+    type_id: Optional[int] = Query(None),
+    status_id: Optional[int] = Query(None),
+    group_by: str = Query("status,department", description="Сводки через запятую: status, department, month"),
+    db: Session = Depends(get_db)
+):
+    """Отчёт по задачам за период: строки с названиями и сводки, посчитанные GROUP BY"""
+    list_group_by = [name.strip() for name in group_by.split(",") if name.strip()]
+    set_unknown = set(list_group_by) - SET_GROUP_BY_TASK
+    if set_unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown group_by: {', '.join(sorted(set_unknown))}, allowed: {', '.join(sorted(SET_GROUP_BY_TASK))}"
+        )
+
+    def filtered(*column):
+        return filter_task_report(
+            query_task_report(db, *column), date_from, date_to, department_id, type_id, status_id
+        )
+
+    # Строки отчёта: название задачи — артикул профиля инструмента или имя изделия
+    query_row = filtered(
+        ModelTask.id, column_task_name(), ModelDirTaskType.name, ModelDirDepartment.name, ModelDirTaskStatus.name,
+        ModelTask.created, ModelTask.deadline, ModelTask.completed, ModelTask.description
+    ).outerjoin(
+        ModelProfileTool, ModelTask.profiletool_id == ModelProfileTool.id
+    ).outerjoin(
+        ModelProfile, ModelProfileTool.profile_id == ModelProfile.id
+    ).order_by(ModelTask.created, ModelTask.id)
+    list_task = [
+        SchemaReportTaskRow(
+            id=row[0], name=row[1], type_name=row[2], department_name=row[3], status_name=row[4],
+            created=row[5], deadline=row[6], completed=row[7], description=row[8]
+        )
+        for row in query_row
+    ]
+    total = len(list_task)
+
+    dict_group_column = {
+        "status": (ModelTask.status_id, ModelDirTaskStatus.name),
+        "department": (ModelProduct.department_id, ModelDirDepartment.name),
+        "month": (func.strftime("%Y-%m", ModelTask.created),) * 2,
+    }
+    dict_group = {}
+    for group_name in list_group_by:
+        column_key, column_name = dict_group_column[group_name]
+        list_row = filtered(column_key, column_name, func.count(ModelTask.id)).group_by(column_key, column_name).all()
+        dict_group[group_name] = build_group(list_row, total)
+    if "month" in dict_group:
+        dict_group["month"].sort(key=lambda group: group.key or "")
+
+    return SchemaReportTaskResponse(
+        date_from=date_from, date_to=date_to, total=total, list_task=list_task, group=dict_group
+    )
+
+
+# =============================================================================
+# ОТЧЁТ ПО ЗАГРУЗКЕ СТАНКОВ
+# =============================================================================
+# Отчёт меняется только вместе с данными — кешируется по версии журнала изменений
+cache_report_machine = CacheVersion("report_machine")
+
+
+def get_percentile(list_value: list, percent: float) -> Optional[float]:
+    """Перцентиль отсортированного списка с линейной интерполяцией"""
+    if not list_value:
+        return None
+    position = (len(list_value) - 1) * percent / 100
+    index = int(position)
+    if index + 1 >= len(list_value):
+        return float(list_value[-1])
+    return list_value[index] + (list_value[index + 1] - list_value[index]) * (position - index)
+
+
+def merge_interval(list_interval: list) -> list:
+    """Слить пересекающиеся и соседние интервалы дат, отсортированные по началу"""
+    list_merged = []
+    for start, finish in list_interval:
+        if list_merged and start <= list_merged[-1][1] + timedelta(days=1):
+            if finish > list_merged[-1][1]:
+                list_merged[-1][1] = finish
+        else:
+            list_merged.append([start, finish])
+    return list_merged
+
+
+class AccumulatorMachine:
+    """Накопление статистики станка (или типа работ) по этапам"""
+
+    def __init__(self):
+        self.machine_count = 0
+        self.operation_count = 0
+        self.list_duration = []
+        self.busy_days = 0
+        self.list_gap = []
+
+    def add_machine(self, list_interval: list, list_duration: list, operation_count: int):
+        """Добавить станок: его интервалы занятости (по началу), длительности и число этапов"""
+        self.machine_count += 1
+        self.operation_count += operation_count
+        self.list_duration.extend(list_duration)
+        list_merged = merge_interval(list_interval)
+        self.busy_days += sum((finish - start).days + 1 for start, finish in list_merged)
+        self.list_gap.extend(
+            (list_merged[i + 1][0] - list_merged[i][1]).days - 1 for i in range(len(list_merged) - 1)
+        )
+
+    def build(self, period_days: int, **field) -> SchemaReportMachineStat:
+        list_duration = sorted(self.list_duration)
+        days_total = period_days * max(self.machine_count, 1)
+        return SchemaReportMachineStat(
+            **field,
+            machine_count=self.machine_count,
+            operation_count=self.operation_count,
+            operation_finished_count=len(list_duration),
+            busy_days=self.busy_days,
+            idle_days=days_total - self.busy_days,
+            utilisation=round(self.busy_days / days_total * 100, 1) if days_total else 0.0,
+            duration_avg=round(sum(list_duration) / len(list_duration), 2) if list_duration else None,
+            duration_p50=get_percentile(list_duration, 50),
+            duration_p90=get_percentile(list_duration, 90),
+            duration_max=list_duration[-1] if list_duration else None,
+            gap_count=len(self.list_gap),
+            gap_max_days=max(self.list_gap, default=0),
+            gap_avg_days=round(sum(self.list_gap) / len(self.list_gap), 2) if self.list_gap else None,
+        )
+
+
+def build_report_machine(db: Session, date_from: date, date_to: date,
+                         machine_id: Optional[int], work_type_id: Optional[int], version: int, today: date):
+    """Посчитать отчёт: число этапов — GROUP BY, занятость и простои — одним проходом
+    по этапам в порядке (machine_id, start) по индексу. Незавершённые этапы
+    занимают станок по today"""
+    period_days = (date_to - date_from).days + 1
+    stage = ModelTaskComponentStage
+
+    query_machine = db.query(
+        ModelDirMachine.id, ModelDirMachine.name, ModelDirMachine.work_type_id, ModelDirWorkType.name
+    ).outerjoin(ModelDirWorkType, ModelDirMachine.work_type_id == ModelDirWorkType.id)
+    if machine_id is not None:
+        query_machine = query_machine.filter(ModelDirMachine.id == machine_id)
+    if work_type_id is not None:
+        query_machine = query_machine.filter(ModelDirMachine.work_type_id == work_type_id)
+    list_machine = query_machine.order_by(ModelDirMachine.work_type_id, ModelDirMachine.name).all()
+    set_machine_id = {row[0] for row in list_machine}
+
+    # Этапы, начатые в периоде: число по станку
+    dict_count = dict(
+        db.query(stage.machine_id, func.count(stage.id)).filter(
+            stage.machine_id.in_(set_machine_id), stage.start >= date_from, stage.start <= date_to
+        ).group_by(stage.machine_id).all()
+    )
+
+    # Интервалы занятости, пересекающие период; незавершённый этап занимает станок по сегодня
+    dict_interval = {}
+    dict_duration = {}
+    list_stage = db.query(stage.machine_id, stage.start, stage.finish).filter(
+        stage.machine_id.in_(set_machine_id),
+        stage.start.isnot(None),
+        stage.start <= date_to,
+        (stage.finish.is_(None)) | (stage.finish >= date_from)
+    ).order_by(stage.machine_id, stage.start)
+    for row_machine_id, start, finish in list_stage:
+        if finish is not None and finish < start:
+            continue  # ошибка ввода дат
+        if finish is not None and date_from <= start:
+            dict_duration.setdefault(row_machine_id, []).append((finish - start).days + 1)
+        interval = (max(start, date_from), min(finish or today, date_to))
+        if interval[0] <= interval[1]:
+            dict_interval.setdefault(row_machine_id, []).append(interval)
+
+    list_machine_stat = []
+    dict_work_type = {}
+    for row_machine_id, name, row_work_type_id, work_type_name in list_machine:
+        list_interval = dict_interval.get(row_machine_id, [])
+        list_duration = dict_duration.get(row_machine_id, [])
+        operation_count = dict_count.get(row_machine_id, 0)
+        accumulator = AccumulatorMachine()
+        accumulator.add_machine(list_interval, list_duration, operation_count)
+        list_machine_stat.append(accumulator.build(
+            period_days, id=row_machine_id, name=name,
+            work_type_id=row_work_type_id, work_type_name=work_type_name
+        ))
+        accumulator_work_type, _ = dict_work_type.setdefault(
+            row_work_type_id, (AccumulatorMachine(), work_type_name)
+        )
+        accumulator_work_type.add_machine(list_interval, list_duration, operation_count)
+
+    list_work_type_stat = [
+        accumulator.build(
+            period_days, id=row_work_type_id, name=work_type_name or NAME_UNKNOWN,
+            work_type_id=row_work_type_id, work_type_name=work_type_name
+        )
+        for row_work_type_id, (accumulator, work_type_name) in dict_work_type.items()
+    ]
+    return SchemaReportMachineResponse(
+        date_from=date_from, date_to=date_to, period_days=period_days, version=version,
+        list_machine=list_machine_stat, list_work_type=list_work_type_stat
+    )
+
+
+@router.get("/report/machine", response_model=SchemaReportMachineResponse)
+def get_report_machine(
+    date_from: Optional[date] = Query(None, alias="from", description="Начало периода; по умолчанию — первый этап"),
+    date_to: Optional[date] = Query(None, alias="to", description="Конец периода; по умолчанию — сегодня"),
+    machine_id: Optional[int] = Query(None),
+    work_type_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Загрузка станков и типов работ за период по этапам task_component_stage:
+    занятые дни, число операций, длительность этапов (среднее, p50, p90) и простои"""
+    today = date.today()
+    if date_to is None:
+        date_to = today
+    if date_from is None:
+        date_from = db.query(func.min(ModelTaskComponentStage.start)).scalar() or date_to
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be later than 'to'")
+
+    # Занятость незавершёнными этапами растёт каждый день и без записей: сегодня — часть ключа
+    version = get_version(db)
+    return cache_report_machine.get_or_build(
+        version,
+        (date_from, date_to, machine_id, work_type_id, today),
+        lambda: build_report_machine(db, date_from, date_to, machine_id, work_type_id, version, today)
+    )
@@ -0,0 +1,261 @@
+"""API дельта-синхронизации по журналу изменений"""
+import threading
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .. import database
+from ..database import get_db
+from ..models.change_log import ModelChangeLog, DICT_PARENT
+from ..models.task import ModelTask
+from ..models.profile import ModelProfile
+from ..models.profiletool import ModelProfileTool
+from ..models.product import ModelProduct
+from ..models.blank import ModelBlank
+from ..schemas.sync import SchemaSyncResponse, SchemaSyncChange
+from ..schemas.task import SchemaTaskResponse
+from ..schemas.profile import SchemaProfileResponse
+from ..schemas.profiletool import SchemaProfileToolResponse
+from ..schemas.product import SchemaProductResponse
+from ..schemas.blank import SchemaBlankResponse
+from ..directory_cache import cache_directory
+from .task import query_task, NAME_TYPE_DEVELOPMENT, NAME_STATUS_IN_PROGRESS
+from .profiletool import query_profiletool
+from .product import query_product
+
+router = APIRouter(prefix="/api", tags=["sync"])
+
+# Больше изменённых документов одного ключа — дешевле перезагрузить ключ целиком
+LIMIT_DELTA = 500
+
+LIST_KEY_TASK = [("table", "task"), ("table", "taskdev"), ("table", "queue")]
+LIST_KEY_PROFILETOOL = [("table", "profiletool"), ("table", "profile")] + LIST_KEY_TASK
+LIST_KEY_PRODUCT = [("table", "product")] + LIST_KEY_TASK
+
+# Какие ключи реестра клиента перезагружаются целиком при изменении таблицы
+# без id строки (справочники, планы, массовые UPDATE/DELETE)
+DICT_RESET_KEY = {
+    "profile": LIST_KEY_PROFILETOOL,
+    "profiletool": LIST_KEY_PROFILETOOL,
+    "profiletool_component": LIST_KEY_PROFILETOOL,
+    "profiletool_component_history": LIST_KEY_PROFILETOOL,
+    "product": LIST_KEY_PRODUCT,
+    "product_component": LIST_KEY_PRODUCT,
+    "task": LIST_KEY_TASK,
+    "task_component": LIST_KEY_TASK,
+    "task_component_stage": LIST_KEY_TASK,
+    "blank": [("table", "blank")] + LIST_KEY_PROFILETOOL,
+    "dir_department": [("directory", "department")] + LIST_KEY_PRODUCT,
+    "dir_task_status": [("directory", "task_status")] + LIST_KEY_TASK,
+    "dir_task_type": [("directory", "task_type")] + LIST_KEY_TASK,
+    "dir_profiletool_dimension": [("directory", "profiletool_dimension"), ("directory", "component_type"),
+                                  ("directory", "profiletool_component_type")] + LIST_KEY_PROFILETOOL,
+    "dir_profiletool_component_type": [("directory", "component_type"), ("directory", "profiletool_component_type"),
+                                       ("plan", "task_component_stage")] + LIST_KEY_PROFILETOOL,
+    "dir_profiletool_component_status": [("directory", "component_status")] + LIST_KEY_PROFILETOOL,
+    "dir_machine": [("directory", "machine")] + LIST_KEY_TASK,
+    "dir_work_type": [("directory", "work_type"), ("directory", "work_subtype"),
+                      ("plan", "task_component_stage")] + LIST_KEY_TASK,
+    "dir_work_subtype": [("directory", "work_subtype"), ("plan", "task_component_stage")] + LIST_KEY_TASK,
+    "dir_blank_material": [("directory", "blank_material"), ("directory", "blank_type"),
+                           ("table", "blank")] + LIST_KEY_PROFILETOOL,
+    "dir_blank_type": [("directory", "blank_type")],
+    "plan_task_component_stage": [("plan", "task_component_stage")],
+}
+
+# Таблицы, изменения которых передаются построчно
+SET_TABLE_DELTA = {"profile", "profiletool", "product", "task", "blank"}
+
+
+def get_version(db: Session) -> int:
+    """Текущая версия данных (последняя запись журнала)"""
+    return db.query(func.max(ModelChangeLog.version)).scalar() or 0
+
+
+def get_change_log(db: Session, since: int, version: int) -> tuple[dict, set]:
+    """Собрать изменения в диапазоне (since, version].
+
+    Returns:
+        ({table_name: {row_id: action}}, {table_name изменённых целиком})
+    """
+    dict_change = {}
+    set_reset_table = set()
+    list_row = db.query(ModelChangeLog.table_name, ModelChangeLog.row_id, ModelChangeLog.action).filter(
+        ModelChangeLog.version > since, ModelChangeLog.version <= version
+    ).order_by(ModelChangeLog.version)
+    for table_name, row_id, action in list_row:
+        if row_id is None:
+            set_reset_table.add(table_name)
+        elif table_name in SET_TABLE_DELTA:
+            dict_change.setdefault(table_name, {})[row_id] = action
+        elif table_name not in DICT_PARENT:
+            # Справочники и планы небольшие — перезагружаются целиком.
+            # Дочерние строки уже отражены в журнале записями родителей.
+            set_reset_table.add(table_name)
+    return dict_change, set_reset_table
+
+
+def get_changed_id(dict_change: dict, table_name: str) -> tuple[set, set]:
+    """Разделить изменённые id таблицы на живые и удалённые"""
+    dict_row = dict_change.get(table_name, {})
+    set_alive = {row_id for row_id, action in dict_row.items() if action != "deleted"}
+    set_deleted = {row_id for row_id, action in dict_row.items() if action == "deleted"}
+    return set_alive, set_deleted
+
+
+def build_change(group: str, key: str, query, model, schema, set_alive: set, set_deleted: set,
+                 func_filter=None) -> SchemaSyncChange:
+    """Выгрузить изменённые документы ключа; ненайденные и отфильтрованные — в tombstone"""
+    if len(set_alive) + len(set_deleted) > LIMIT_DELTA:
+        return SchemaSyncChange(group=group, key=key, is_reset=True)
+    list_upsert = []
+    set_found = set()
+    if set_alive:
+        for item in query.filter(model.id.in_(set_alive)).all():
+            if func_filter is None or func_filter(item):
+                list_upsert.append(schema.model_validate(item).model_dump(mode="json"))
+                set_found.add(item.id)
+    return SchemaSyncChange(
+        group=group,
+        key=key,
+        list_upsert=list_upsert,
+        list_delete_id=sorted((set_alive | set_deleted) - set_found)
+    )
+
+
+@router.get("/sync", response_model=SchemaSyncResponse)
+def get_sync(
+    since: Optional[int] = Query(None, description="Версия данных, уже загруженная клиентом"),
+    db: Session = Depends(get_db)
+):
+    """Изменения после версии since, сгруппированные по ключам реестра клиента.
+
+    Без since возвращает только текущую версию — с неё клиент начинает синхронизацию.
+    """
+    version = get_version(db)
+    if since is None:
+        return SchemaSyncResponse(version=version)
+    return build_sync(db, since, version)
+
+
+def build_sync(db: Session, since: int, version: int) -> SchemaSyncResponse:
+    """Собрать изменения в диапазоне (since, version] по ключам реестра клиента"""
+    if since == version:
+        return SchemaSyncResponse(version=version)
+
+    min_version = db.query(func.min(ModelChangeLog.version)).scalar() or 0
+    if since > version or since < min_version - 1:
+        # Журнал очищен или база заменена — клиенту нужна полная загрузка
+        return SchemaSyncResponse(version=version, is_reset=True)
+
+    dict_change, set_reset_table = get_change_log(db, since, version)
+
+    set_reset_key = set()
+    for table_name in set_reset_table:
+        set_reset_key.update(DICT_RESET_KEY.get(table_name, []))
+
+    list_change = [
+        SchemaSyncChange(group=group, key=key, is_reset=True)
+        for group, key in sorted(set_reset_key)
+    ]
+
+    # Профили
+    set_profile, set_profile_deleted = get_changed_id(dict_change, "profile")
+    if ("table", "profile") not in set_reset_key and (set_profile or set_profile_deleted):
+        list_change.append(build_change(
+            "table", "profile", db.query(ModelProfile), ModelProfile, SchemaProfileResponse,
+            set_profile, set_profile_deleted
+        ))
+
+    # Инструменты: вложенный профиль тоже делает документ инструмента устаревшим
+    set_profiletool, set_profiletool_deleted = get_changed_id(dict_change, "profiletool")
+    if set_profile:
+        set_profiletool.update(
+            row_id for row_id, in db.query(ModelProfileTool.id).filter(ModelProfileTool.profile_id.in_(set_profile))
+        )
+    if ("table", "profiletool") not in set_reset_key and (set_profiletool or set_profiletool_deleted):
+        list_change.append(build_change(
+            "table", "profiletool", query_profiletool(db), ModelProfileTool, SchemaProfileToolResponse,
+            set_profiletool, set_profiletool_deleted
+        ))
+
+    # Изделия
+    set_product, set_product_deleted = get_changed_id(dict_change, "product")
+    if ("table", "product") not in set_reset_key and (set_product or set_product_deleted):
+        list_change.append(build_change(
+            "table", "product", query_product(db), ModelProduct, SchemaProductResponse,
+            set_product, set_product_deleted
+        ))
+
+    # Задачи: собственные изменения + изменения вложенных инструментов и изделий
+    set_task, set_task_deleted = get_changed_id(dict_change, "task")
+    if set_profiletool:
+        set_task.update(
+            row_id for row_id, in db.query(ModelTask.id).filter(ModelTask.profiletool_id.in_(set_profiletool))
+        )
+    if set_product:
+        set_task.update(
+            row_id for row_id, in db.query(ModelTask.id).filter(ModelTask.product_id.in_(set_product))
+        )
+    if set_task or set_task_deleted:
+        directory = cache_directory.get(db)
+        type_dev_id = directory.get_id("dir_task_type", NAME_TYPE_DEVELOPMENT)
+        status_in_progress_id = directory.get_id("dir_task_status", NAME_STATUS_IN_PROGRESS)
+        dict_task_filter = {
+            "task": None,
+            "taskdev": lambda t: t.type_id == type_dev_id and t.status_id == status_in_progress_id,
+            "queue": lambda t: t.status_id == status_in_progress_id and t.position is not None,
+        }
+        for key, func_filter in dict_task_filter.items():
+            if ("table", key) in set_reset_key:
+                continue
+            list_change.append(build_change(
+                "table", key, query_task(db), ModelTask, SchemaTaskResponse,
+                set_task, set_task_deleted, func_filter
+            ))
+
+    # Заготовки
+    set_blank, set_blank_deleted = get_changed_id(dict_change, "blank")
+    if ("table", "blank") not in set_reset_key and (set_blank or set_blank_deleted):
+        list_change.append(build_change(
+            "table", "blank", db.query(ModelBlank), ModelBlank, SchemaBlankResponse,
+            set_blank, set_blank_deleted
+        ))
+
+    return SchemaSyncResponse(version=version, change=list_change)
+
+
+# =============================================================================
+# Изменения для вебсокет-событий
+# =============================================================================
+lock_event = threading.Lock()
+version_event = None  # версия, по которую изменения уже разосланы клиентам
+
+
+def build_event_change() -> dict:
+    """Изменения с момента предыдущего события для рассылки вместе с событием.
+
+    События образуют непрерывную цепочку since → version: клиент применяет
+    изменения на месте, только если его версия равна since, иначе
+    дозапрашивает их через GET /api/sync.
+    Вызывается под lock_event вместе с отправкой, чтобы порядок событий
+    совпадал с порядком версий.
+    """
+    global version_event
+    db = database.SessionLocal()  # через модуль: тесты и замеры подменяют базу
+    try:
+        version = get_version(db)
+        if version_event is None:
+            # Первое событие после старта сервера: изменений до него не знаем
+            version_event = version
+            return {"since": None, "version": version}
+        sync = build_sync(db, version_event, version)
+        since, version_event = version_event, version
+        return {
+            "since": since,
+            "version": version,
+            "change": [change.model_dump() for change in sync.change] if not sync.is_reset else None,
+        }
+    finally:
+        db.close()
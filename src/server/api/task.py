@@ -1,13 +1,12 @@
 """API роутеры для задач"""
 import traceback
+from datetime import date
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, Request, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session , selectinload
 from ..database import get_db
 from ..models.task import ModelTask, ModelTaskComponent, ModelTaskComponentStage
-from ..models.profiletool import ModelProfileTool, ModelProfileToolComponent
-from ..models.blank import ModelBlank
-from ..models.directory import ModelDirTaskStatus, ModelDirTaskType
 from ..schemas.task import (
     SchemaTaskCreate,
     SchemaTaskUpdate,
@@ -18,49 +17,132 @@ from ..schemas.task import (
     SchemaTaskComponentStageCreate
 )
 from ..events import notify_clients
+from ..pagination import ParamPage, paginate, filter_equal, filter_range, HEADER_NEXT_CURSOR
+from ..progress import refresh_progress
+from ..directory_cache import SnapshotDirectory, get_directory
+from ..etag import etag_table, SET_TABLE_TASK
+from ..cache import CacheVersion
+from ..fragment_cache import cache_fragment, dump_task_list
+from ..fieldset import ParamFieldset, get_projection
+from ..eager_load import query_schema
 
 router = APIRouter(prefix="/api", tags=["task"])
 
+# Разрешённые поля сортировки списков задач
+DICT_SORT_TASK = {
+    "id": ModelTask.id,
+    "position": ModelTask.position,
+    "deadline": ModelTask.deadline,
+    "created": ModelTask.created,
+    "completed": ModelTask.completed,
+    "status_id": ModelTask.status_id,
+}
+
+# Имена записей справочников, по которым роутеры выбирают задачи
+NAME_TYPE_DEVELOPMENT = "Разработка"
+NAME_STATUS_IN_PROGRESS = "В работе"
+NAME_STATUS_COMPLETED = "Выполнена"
+
+# Списки задач запрашивают все клиенты после каждого события: готовый JSON
+# кешируется по версии таблиц задачи, пути и параметрам запроса
+etag_task = etag_table("task", SET_TABLE_TASK)
+cache_task_list = CacheVersion("task_list")
+
 # =============================================================================
 # ROUTER.GET
 # =============================================================================
 
+def response_task_list(request: Request, response: Response, db: Session, version: int, func_query,
+                       fieldset: ParamFieldset) -> Response:
+    """Ответ со списком задач из кеша; func_query(query, response) — страница строк задач.
+
+    При промахе полный список склеивается из фрагментов (fragment_cache),
+    частичный (fields/include) — по проекции с загрузкой только нужного.
+    Курсор следующей страницы хранится вместе с телом, ETag берётся из response.
+    Тело, собранное во время сброса фрагментов после коммита, не кешируется:
+    версия уже новая, а фрагменты могли остаться прежними.
+    """
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    projection = get_projection(SchemaTaskResponse, ModelTask, fieldset)
+
+    generation = cache_fragment.get_generation()
+
+    def build():
+        response_page = Response()
+        if projection is not None:
+            query = projection.apply(db.query(ModelTask), DICT_SORT_TASK.values())
+            content = projection.dump(func_query(query, response_page))
+        else:
+            content = dump_task_list(db, func_query(db.query(ModelTask), response_page), generation)
+        return content, response_page.headers.get(HEADER_NEXT_CURSOR)
+
+    content, cursor = cache_task_list.get_or_build(
+        version, key, build, lambda: cache_fragment.is_stable(generation)
+    )
+    headers = {"ETag": response.headers["ETag"]}
+    if cursor:
+        headers[HEADER_NEXT_CURSOR] = cursor
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def query_task(db: Session):
+    """Запрос задач с загрузкой всех связей SchemaTaskResponse"""
+    return query_schema(db, ModelTask, SchemaTaskResponse)
+
 @router.get("/task", response_model=List[SchemaTaskResponse])
-def get_task(db: Session = Depends(get_db)):
-    """Получить все задачи с загрузкой связанных данных"""
-    return db.query(ModelTask).options(
-        selectinload(ModelTask.profiletool).selectinload(ModelProfileTool.profile),
-        selectinload(ModelTask.product),
-        selectinload(ModelTask.status),
-        selectinload(ModelTask.type),
-        selectinload(ModelTask.component).selectinload(ModelTaskComponent.stage),
-        selectinload(ModelTask.component).selectinload(ModelTaskComponent.profiletool_component).selectinload(ModelProfileToolComponent.blank).selectinload(ModelBlank.material)
-    ).order_by(ModelTask.id).all()
+def get_task(
+    request: Request,
+    response: Response,
+    page: ParamPage = Depends(),
+    status_id: Optional[int] = Query(None),
+    type_id: Optional[int] = Query(None),
+    profiletool_id: Optional[int] = Query(None),
+    product_id: Optional[int] = Query(None),
+    created_from: Optional[date] = Query(None),
+    created_to: Optional[date] = Query(None),
+    fieldset: ParamFieldset = Depends(),
+    db: Session = Depends(get_db),
+    version: int = Depends(etag_task)
+):
+    """Получить задачи с загрузкой связанных данных (постранично при limit, частично при fields/include)"""
+    def func_query(query, response_page: Response):
+        query = filter_equal(query, {
+            ModelTask.status_id: status_id,
+            ModelTask.type_id: type_id,
+            ModelTask.profiletool_id: profiletool_id,
+            ModelTask.product_id: product_id,
+        })
+        query = filter_range(query, ModelTask.created, created_from, created_to)
+        return paginate(query, ModelTask, page, DICT_SORT_TASK, "id", response_page)
+
+    return response_task_list(request, response, db, version, func_query, fieldset)
 
 @router.get("/taskdev", response_model=List[SchemaTaskResponse])
-def get_taskdev(db: Session = Depends(get_db)):
+def get_taskdev(request: Request, response: Response, page: ParamPage = Depends(), fieldset: ParamFieldset = Depends(),
+                db: Session = Depends(get_db), directory: SnapshotDirectory = Depends(get_directory),
+                version: int = Depends(etag_task)):
     """Получить задачи в разработке с загрузкой связанных данных"""
-    type = db.query(ModelDirTaskType).filter(ModelDirTaskType.name == "Разработка").first()
-    status = db.query(ModelDirTaskStatus).filter(ModelDirTaskStatus.name == "В работе").first()
-    return db.query(ModelTask).options(
-        selectinload(ModelTask.profiletool).selectinload(ModelProfileTool.profile),
-        selectinload(ModelTask.product),
-        selectinload(ModelTask.status),
-        selectinload(ModelTask.type),
-        selectinload(ModelTask.component).selectinload(ModelTaskComponent.stage)
-    ).filter(ModelTask.type_id == type.id, ModelTask.status_id == status.id).order_by(ModelTask.position).all()
+    type_id = directory.get_id("dir_task_type", NAME_TYPE_DEVELOPMENT)
+    status_id = directory.get_id("dir_task_status", NAME_STATUS_IN_PROGRESS)
+
+    def func_query(query, response_page: Response):
+        query = query.filter(ModelTask.type_id == type_id, ModelTask.status_id == status_id)
+        return paginate(query, ModelTask, page, DICT_SORT_TASK, "position", response_page)
+
+    return response_task_list(request, response, db, version, func_query, fieldset)
 
 @router.get("/task/queue", response_model=List[SchemaTaskResponse])
-def get_queue(db: Session = Depends(get_db)):
+def get_queue(request: Request, response: Response, page: ParamPage = Depends(), fieldset: ParamFieldset = Depends(),
+              db: Session = Depends(get_db), directory: SnapshotDirectory = Depends(get_directory),
+              version: int = Depends(etag_task)):
     """Получить очередь задач с загрузкой связанных данных"""
-    status_in_progress = db.query(ModelDirTaskStatus).filter(ModelDirTaskStatus.name == "В работе").first()
-    return db.query(ModelTask).options(
-        selectinload(ModelTask.profiletool).selectinload(ModelProfileTool.profile),
-        selectinload(ModelTask.product),
-        selectinload(ModelTask.status),
-        selectinload(ModelTask.type),
-        selectinload(ModelTask.component).selectinload(ModelTaskComponent.stage)
-    ).filter(ModelTask.status_id == status_in_progress.id, ModelTask.position.isnot(None)).order_by(ModelTask.position).all()
+    status_in_progress_id = directory.get_id("dir_task_status", NAME_STATUS_IN_PROGRESS)
+
+    def func_query(query, response_page: Response):
+        query = query.filter(ModelTask.status_id == status_in_progress_id, ModelTask.position.isnot(None))
+        return paginate(query, ModelTask, page, DICT_SORT_TASK, "position", response_page)
+
+    return response_task_list(request, response, db, version, func_query, fieldset)
 
 
 
@@ -147,6 +229,7 @@ def create_task_component_stage(component_id: int, stage_data: SchemaTaskCompone
     )
 
     db.add(stage)
+    refresh_progress(db, component_id)
     db.commit()
     db.refresh(stage)
     notify_clients("table", "task_component_stage", "created")
@@ -155,14 +238,17 @@ def create_task_component_stage(component_id: int, stage_data: SchemaTaskCompone
 @router.post("/task/queue/reorder", status_code=204)
 def reorder_queue(request: SchemaQueueReorderRequest, db: Session = Depends(get_db)):
     """Изменение порядка задач в очереди"""
-    # 1. Сбросить позиции у задач у всех
-    db.query(ModelTask).update({ModelTask.position: None}, synchronize_session='fetch')
-    # 2. Установить новые позиции для переданных задач
-    for position, task_id in enumerate(request.task_ids, start=1):
-        db.query(ModelTask).filter(ModelTask.id == task_id).update({ModelTask.position: position}, synchronize_session='fetch')
-    notify_clients("table", "task", "updated")
-    notify_clients("table", "queue", "updated")   
+    # Новые позиции для переданных задач, у остальных позиция сбрасывается
+    dict_position = {task_id: position for position, task_id in enumerate(request.task_ids, start=1)}
+    list_task = db.query(ModelTask).filter(
+        or_(ModelTask.position.isnot(None), ModelTask.id.in_(dict_position))
+    ).all()
+    # Меняем через ORM: UPDATE уходит только для задач с изменившейся позицией
+    for task in list_task:
+        task.position = dict_position.get(task.id)
     db.commit()
+    notify_clients("table", "task", "updated")
+    notify_clients("table", "queue", "updated")
 
 # =============================================================================
 # ROUTER.PATCH
@@ -188,13 +274,13 @@ def update_task(task_id: int, task: SchemaTaskUpdate, db: Session = Depends(get_
     return db_task
 
 @router.patch("/task/{task_id}/status", response_model=SchemaTaskResponse)
-def update_task_status( task_id: int, task: SchemaTaskUpdate, db: Session = Depends(get_db)):
+def update_task_status(task_id: int, task: SchemaTaskUpdate, db: Session = Depends(get_db),
+                       directory: SnapshotDirectory = Depends(get_directory)):
     """Обновить статус задачи"""
-    status_completed = db.query(ModelDirTaskStatus).filter(ModelDirTaskStatus.name == "Выполнена").first()
-    print(status_completed)
+    status_completed_id = directory.get_id("dir_task_status", NAME_STATUS_COMPLETED)
     db_task = db.get(ModelTask, task_id)
     db_task.status_id = task.status_id
-    if task.status_id == status_completed.id:
+    if task.status_id == status_completed_id:
         db_task.completed = task.completed
     else:
         db_task.completed = None
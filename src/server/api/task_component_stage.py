@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.task import ModelTaskComponentStage
 from ..schemas.task import SchemaTaskComponentStageUpdate
+from ..progress import refresh_progress
 
 from ..events import notify_clients
 
@@ -34,9 +35,12 @@ def update_stage(
         stage.finish = data.finish
     if data.machine_id is not None:
         stage.machine_id = data.machine_id
-    
-    notify_clients("table", "task", "updated")
-    notify_clients("table", "taskdev", "updated")
+
+    # Текущий этап компонента и готовность задачи — в той же транзакции
+    if stage.task_component_id is not None:
+        refresh_progress(db, stage.task_component_id)
     db.commit()
     db.refresh(stage)
+    notify_clients("table", "task", "updated")
+    notify_clients("table", "taskdev", "updated")
     return stage
\ No newline at end of file
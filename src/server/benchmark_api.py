@@ -0,0 +1,280 @@
+"""Замер всех GET-эндпоинтов и тяжёлых изменений на синтетической базе.
+
+База — файл SQLite во временном каталоге, заполненный dataset.generate(scale)
+с эскизами профилей. Запросы идут через приложение целиком (middleware,
+ETag, сжатие не запрашивается) в том же процессе. Для каждого GET из схемы
+OpenAPI: холодный (кеши сброшены, справочники загружены, как после старта)
+и тёплый повтор — p50/p95 в мс, байты ответа, число SQL-запросов и время SQL.
+Изменения (reorder_queue, delete_profile, create_list_blank) замеряются
+после GET: каждое повторение — на своих строках.
+
+Отчёт — JSON, сравнимый между версиями:
+python -m src.server.benchmark_api --scale 10 --output bench-new.json --compare bench-old.json
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from . import database, sketch_store
+from .main import app
+from .database import Base, get_db
+from .dataset import generate
+from .directory_cache import cache_directory
+from .measure import CounterQuery, clear_cache, percentile
+from .models.blank import ModelBlank
+from .models.product import ModelProduct
+from .models.profile import ModelProfile
+from .models.profiletool import ModelProfileTool, ModelProfileToolComponent
+from .models.task import ModelTask
+
+# Параметр пути → колонка, первое значение которой подставляется в путь
+DICT_PATH_PARAM = {
+    "product_id": ModelProduct.id,
+    "profile_id": ModelProfile.id,
+    "profiletool_id": ModelProfileTool.id,
+    "profiletool_component_id": ModelProfileToolComponent.id,
+    "blank_id": ModelBlank.id,
+    "order": ModelBlank.order,
+}
+# Параметры запроса, без которых эндпоинт отдаёт не то, что читает клиент
+DICT_QUERY_PARAM = {
+    "/api/sync": "since=0",
+}
+# Варианты сверх схемы: частичные документы, как у таблицы задач клиента
+LIST_URL_EXTRA = [
+    "/api/task?fields=id,type.name,status.name,deadline,created,description,display_name",
+    "/api/profile/{profile_id}/sketch?size=preview",
+]
+SET_PATH_SKIP = {"/health/ws"}  # ждёт ответа менеджера WebSocket
+QUANTITY_BLANK = 100  # заготовок за один create_list_blank (предел эндпоинта)
+
+
+class Bench:
+    """Приложение на временной базе и замеры запросов к нему"""
+
+    def __init__(self, path_db: Path, scale: int, seed: int):
+        self.engine = create_engine(f"sqlite:///{path_db}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        with self.Session() as db:
+            self.dict_count = generate(db, scale, seed, is_sketch=True)
+        app.dependency_overrides[get_db] = self.get_db
+        database.SessionLocal = self.Session
+        self.client = TestClient(app)
+
+    def get_db(self):
+        db = self.Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def warm_up(self):
+        """Кеши сброшены, справочники загружены — состояние сервера после старта"""
+        clear_cache()
+        with self.Session() as db:
+            cache_directory.get(db)
+
+    def request(self, method: str, url: str, **kwargs):
+        """(ответ, мс, CounterQuery)"""
+        with CounterQuery(self.engine) as counter:
+            time_start = time.perf_counter()
+            response = self.client.request(method, url, **kwargs)
+            elapsed = (time.perf_counter() - time_start) * 1000
+        return response, elapsed, counter
+
+    # GET ----------------------------------------------------------------------
+
+    def list_url(self) -> list[str]:
+        """GET-эндпоинты схемы с подставленными параметрами пути; пропуски — в stderr"""
+        with self.Session() as db:
+            dict_value = {name: db.query(func.min(column)).scalar() for name, column in DICT_PATH_PARAM.items()}
+        list_url = []
+        for path, dict_method in app.openapi()["paths"].items():
+            if "get" not in dict_method or path in SET_PATH_SKIP:
+                continue
+            list_url.append(path + (f"?{DICT_QUERY_PARAM[path]}" if path in DICT_QUERY_PARAM else ""))
+        list_url += LIST_URL_EXTRA
+        list_result = []
+        for url in list_url:
+            try:
+                list_result.append(url.format(**dict_value))
+            except KeyError as e:
+                print(f"⚠️ {url}: нет значения параметра {e}", file=sys.stderr)
+        return list_result
+
+    def measure_get(self, url: str, repeat: int) -> dict:
+        list_cold = []
+        for _ in range(repeat):
+            self.warm_up()
+            response, elapsed, counter_cold = self.request("GET", url)
+            list_cold.append(elapsed)
+        list_warm = []
+        for _ in range(repeat):
+            response, elapsed, counter_warm = self.request("GET", url)
+            list_warm.append(elapsed)
+        return {
+            "status": response.status_code,
+            "bytes": len(response.content),
+            "query": counter_cold.count,
+            "query_warm": counter_warm.count,
+            "sql_ms": round(counter_cold.elapsed * 1000, 3),
+            "cold": summarize(list_cold),
+            "warm": summarize(list_warm),
+        }
+
+    # Изменения ----------------------------------------------------------------
+
+    def measure_mutation(self, repeat: int) -> dict:
+        """Тяжёлые изменения: у каждого повторения свои строки"""
+        with self.Session() as db:
+            list_queue_id = [
+                task_id for task_id, in db.query(ModelTask.id).filter(ModelTask.position.isnot(None))
+                .order_by(ModelTask.position)
+            ]
+            list_profile_id = [
+                profile_id for profile_id, in db.query(ModelProfile.id).order_by(ModelProfile.id.desc()).limit(repeat)
+            ]
+            blank = db.query(ModelBlank).order_by(ModelBlank.id).first()
+            blank_data = {
+                "material_id": blank.material_id, "profiletool_component_id": blank.profiletool_component_id,
+                "date_order": blank.date_order.isoformat(), "blank_width": blank.blank_width,
+                "blank_height": blank.blank_height, "blank_length": blank.blank_length, "quantity": QUANTITY_BLANK,
+            }
+
+        def reorder_queue(index: int):
+            # Каждое повторение — новый порядок: сдвиг очереди по кругу
+            shift = (index + 1) % max(len(list_queue_id), 1)
+            return "POST", "/api/task/queue/reorder", {"json": {"task_ids": list_queue_id[shift:] + list_queue_id[:shift]}}
+
+        def delete_profile(index: int):
+            return "DELETE", f"/api/profile/{list_profile_id[index]}", {}
+
+        def create_list_blank(index: int):
+            return "POST", "/api/blank/bulk", {"json": {**blank_data, "order": 1_000_000 + index}}
+
+        dict_result = {}
+        for func_request in (reorder_queue, delete_profile, create_list_blank):
+            list_elapsed = []
+            list_query = []
+            status = None
+            for index in range(min(repeat, len(list_profile_id))):
+                self.warm_up()
+                method, url, kwargs = func_request(index)
+                response, elapsed, counter = self.request(method, url, **kwargs)
+                status = response.status_code
+                list_elapsed.append(elapsed)
+                list_query.append(counter.count)
+            dict_result[func_request.__name__] = {
+                "status": status, "query": max(list_query, default=0), **summarize(list_elapsed)
+            }
+        return dict_result
+
+    def close(self):
+        app.dependency_overrides.pop(get_db, None)
+        self.engine.dispose()
+
+
+def summarize(list_elapsed: list) -> dict:
+    return {
+        "p50": round(percentile(list_elapsed, 50), 3),
+        "p95": round(percentile(list_elapsed, 95), 3),
+        "mean": round(sum(list_elapsed) / len(list_elapsed), 3) if list_elapsed else 0.0,
+    }
+
+
+# =============================================================================
+# ОТЧЁТ
+# =============================================================================
+def run(scale: int, seed: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="aditim-bench-") as dir_temp:
+        dir_sketch = sketch_store.DIR_SKETCH
+        sketch_store.DIR_SKETCH = Path(dir_temp) / "sketch"
+        session_local = database.SessionLocal
+        time_start = time.perf_counter()
+        bench = Bench(Path(dir_temp) / "bench.db", scale, seed)
+        time_generate = time.perf_counter() - time_start
+        try:
+            dict_get = {}
+            for url in bench.list_url():
+                dict_get[url] = bench.measure_get(url, repeat)
+                print_get(url, dict_get[url])
+            dict_mutation = bench.measure_mutation(repeat)
+        finally:
+            bench.close()
+            clear_cache()
+            sketch_store.DIR_SKETCH = dir_sketch
+            database.SessionLocal = session_local
+    return {
+        "meta": {
+            "scale": scale, "seed": seed, "repeat": repeat, "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "generate_s": round(time_generate, 2), "count": bench.dict_count,
+        },
+        "get": dict_get,
+        "mutation": dict_mutation,
+    }
+
+
+def print_get(url: str, result: dict):
+    print(
+        f"{url[:60]:<60} {result['status']:>4} {result['cold']['p50']:>9.2f} {result['cold']['p95']:>9.2f} "
+        f"{result['warm']['p50']:>9.2f} {result['bytes']:>10} {result['query']:>4}"
+    )
+
+
+def format_delta(old: float, new: float) -> str:
+    if not old:
+        return f"{new:>10}"
+    return f"{new:>10} ({(new - old) / old * 100:+6.1f}%)"
+
+
+def compare(report_old: dict, report_new: dict):
+    """Разница отчётов: p50 холодного запроса, байты и число запросов"""
+    print(f"\n=== Сравнение: scale {report_old['meta']['scale']} → {report_new['meta']['scale']} ===")
+    print(f"{'эндпоинт':<60} {'p50 cold, мс':>20} {'байты':>20} {'запросы':>20}")
+    for url, new in report_new["get"].items():
+        old = report_old["get"].get(url)
+        if old is None:
+            print(f"{url[:60]:<60} новый")
+            continue
+        print(
+            f"{url[:60]:<60} {format_delta(old['cold']['p50'], new['cold']['p50']):>20} "
+            f"{format_delta(old['bytes'], new['bytes']):>20} {format_delta(old['query'], new['query']):>20}"
+        )
+    for name, new in report_new["mutation"].items():
+        old = report_old["mutation"].get(name)
+        if old is not None:
+            print(f"{name:<60} {format_delta(old['p50'], new['p50']):>20} {'':>20} {format_delta(old['query'], new['query']):>20}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер эндпоинтов API на синтетической базе")
+    parser.add_argument("--scale", type=int, default=10, help="Единиц данных dataset.generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=10, help="Повторов каждого запроса")
+    parser.add_argument("--output", default="bench.json", help="Файл отчёта JSON")
+    parser.add_argument("--compare", help="Отчёт предыдущей версии для сравнения")
+    args = parser.parse_args()
+
+    print(f"{'эндпоинт':<60} {'код':>4} {'p50 cold':>9} {'p95 cold':>9} {'p50 warm':>9} {'байты':>10} {'SQL':>4}")
+    report = run(args.scale, args.seed, args.repeat)
+    for name, result in report["mutation"].items():
+        print(f"{name:<60} {result['status']:>4} {result['p50']:>9.2f} {result['p95']:>9.2f} {'':>9} {'':>10} {result['query']:>4}")
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n✅ Отчёт: {args.output}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Сравнение форматов ответа: время кодирования и размер на проводе.
+
+Списки /api/task и /api/profile кодируются так же, как на сервере, от
+провалидированных схем до байтов: stdlib json и orjson (ResponseORJSON) —
+через dump_python(mode="json"), pydantic dump_json (response_model),
+MessagePack — из готового JSON (MiddlewareEncoding). Каждый вариант — без
+сжатия, deflate, gzip, br; в ячейке «байты / мс сжатия».
+
+Запуск: python -m src.server.benchmark_encoding aditim-db.db [повторов]
+"""
+import json
+import sys
+import time
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from .encoding import compress, encode_msgpack, msgpack, brotli, orjson
+from .api.task import query_task
+from .models.profile import ModelProfile
+from .models import plan  # noqa: F401 — связи справочников ссылаются на модель плана
+from .schemas.task import SchemaTaskResponse
+from .schemas.profile import SchemaProfileResponse
+
+
+def measure(func: Callable, repeat: int):
+    """(результат, среднее время в мс)"""
+    result = func()
+    time_start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return result, (time.perf_counter() - time_start) / repeat * 1000
+
+
+def benchmark(name: str, list_item: list, schema, repeat: int):
+    adapter = TypeAdapter(List[schema])
+    list_model = adapter.validate_python(list_item, from_attributes=True)
+
+    dict_format = {
+        "json": lambda: json.dumps(
+            adapter.dump_python(list_model, mode="json"), ensure_ascii=False, separators=(",", ":")
+        ).encode(),
+        "pydantic": lambda: adapter.dump_json(list_model),
+        "orjson": lambda: orjson.dumps(adapter.dump_python(list_model, mode="json")),
+    }
+    list_encoding = ["identity", "deflate", "gzip"] + (["br"] if brotli is not None else [])
+
+    print(f"\n=== {name}: {len(list_item)} документов ===")
+    print(f"{'формат':<10} {'кодирование, мс':>16} " + " ".join(f"{encoding:>18}" for encoding in list_encoding))
+    body_json = None
+    for format_name, func in dict_format.items():
+        body, time_encode = measure(func, repeat)
+        body_json = body_json or body
+        print_row(format_name, time_encode, body, list_encoding, repeat)
+    if msgpack is not None:
+        body, time_encode = measure(lambda: encode_msgpack(body_json), repeat)
+        print_row("msgpack", time_encode, body, list_encoding, repeat)
+    else:
+        print("msgpack    не установлен")
+
+
+def print_row(format_name: str, time_encode: float, body: bytes, list_encoding: list, repeat: int):
+    """Строка таблицы: время кодирования и «байты / мс сжатия» для каждого сжатия"""
+    list_cell = []
+    for encoding in list_encoding:
+        if encoding == "identity":
+            list_cell.append(f"{len(body):>10} / {0:>5.1f}")
+            continue
+        body_compressed, time_compress = measure(lambda: compress(body, encoding), repeat)
+        list_cell.append(f"{len(body_compressed):>10} / {time_compress:>5.1f}")
+    print(f"{format_name:<10} {time_encode:>16.2f} " + " ".join(f"{cell:>18}" for cell in list_cell))
+
+
+def main(path_db: str, repeat: int = 20):
+    engine = create_engine(f"sqlite:///{path_db}")
+    db = sessionmaker(bind=engine)()
+    try:
+        benchmark("/api/task", query_task(db).all(), SchemaTaskResponse, repeat)
+        benchmark("/api/profile", db.query(ModelProfile).all(), SchemaProfileResponse, repeat)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db", int(sys.argv[2]) if len(sys.argv) > 2 else 20)
@@ -0,0 +1,81 @@
+"""Кеш результатов, действительных для одной версии данных (журнал change_log)"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# Все кеши процесса по имени — для счётчиков /health/cache
+DICT_CACHE: dict = {}
+
+
+class CacheVersion:
+    """Кеш результатов по ключу запроса для текущей версии данных.
+
+    С ростом версии записи прежних версий удаляются. Одновременные промахи
+    по одному ключу ждут единственного построения (single-flight).
+    """
+
+    def __init__(self, name: str, size_max: int = 64):
+        self.name = name
+        self.size_max = size_max
+        self.dict_item: OrderedDict = OrderedDict()
+        self.dict_pending: dict = {}  # {(version, key): threading.Event} — идёт построение
+        self.lock = threading.Lock()
+        self.version = None  # наибольшая версия среди записей
+        self.hit = 0
+        self.miss = 0
+        self.wait = 0  # промахи, дождавшиеся чужого построения
+        DICT_CACHE[name] = self
+
+    def get_or_build(self, version: int, key: Hashable, func_build: Callable, func_is_stored: Callable = None):
+        """Результат для (version, key); при промахе строится func_build().
+
+        func_is_stored() после построения решает, можно ли сохранить результат
+        (False — он мог собраться из данных, ещё не сброшенных после коммита).
+        """
+        cache_key = (version, key)
+        while True:
+            with self.lock:
+                if cache_key in self.dict_item:
+                    self.hit += 1
+                    self.dict_item.move_to_end(cache_key)
+                    return self.dict_item[cache_key]
+                event = self.dict_pending.get(cache_key)
+                if event is None:
+                    self.miss += 1
+                    event = self.dict_pending[cache_key] = threading.Event()
+                    break
+                self.wait += 1
+            # Если построение упало, один из ждущих построит заново
+            event.wait()
+
+        try:
+            value = func_build()
+            if func_is_stored is not None and not func_is_stored():
+                return value
+            with self.lock:
+                if self.version is None or version > self.version:
+                    self.version = version
+                    for item_key in [item_key for item_key in self.dict_item if item_key[0] != version]:
+                        del self.dict_item[item_key]
+                if version == self.version:
+                    self.dict_item[cache_key] = value
+                    while len(self.dict_item) > self.size_max:
+                        self.dict_item.popitem(last=False)
+            return value
+        finally:
+            with self.lock:
+                del self.dict_pending[cache_key]
+            event.set()
+
+    def get_stat(self) -> dict:
+        """Счётчики попаданий и промахов"""
+        with self.lock:
+            return {
+                "size": len(self.dict_item), "version": self.version,
+                "hit": self.hit, "miss": self.miss, "wait": self.wait,
+            }
+
+    def clear(self):
+        with self.lock:
+            self.dict_item.clear()
+            self.version = None
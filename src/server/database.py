@@ -1,10 +1,18 @@
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DATABASE_URL = "sqlite:///aditim-db.db"
 
+# Соединения сверх пула из 5 (по умолчанию 10, как в SQLAlchemy; -1 — без предела).
+# Сессия запроса держит соединение между шагами в пуле потоков (зависимости,
+# роутер, закрытие get_db): при пределе меньше пула потоков (40) и нагрузке на все
+# потоки они ждут соединений, а держащие соединения запросы — потока
+POOL_MAX_OVERFLOW = int(os.getenv("ADITIM_DB_MAX_OVERFLOW", "10"))
+
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+    DATABASE_URL, connect_args={"check_same_thread": False}, max_overflow=POOL_MAX_OVERFLOW
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
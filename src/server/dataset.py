@@ -0,0 +1,346 @@
+"""Синтетические данные для тестов и замеров: граф всех таблиц заданного масштаба.
+
+Справочники и план этапов заполняются один раз (имена — те, по которым
+роутеры ищут записи), остальное — на каждую единицу масштаба: профили
+(с эскизами при is_sketch) и инструменты с компонентами, историей статусов
+и заготовками; изделия с компонентами; задачи по инструментам и изделиям,
+этапы компонентов — по плану для типа компонента, завершённость этапов
+согласована со статусом задачи; заказы заготовок (тысячи строк при
+scale ≥ 10). Генератор детерминирован: одинаковые scale и seed дают
+одинаковую базу.
+
+Файл базы: python -m src.server.dataset aditim-bench.db [scale] [--sketch]
+"""
+import io
+import random
+import sys
+from datetime import date, timedelta
+
+from PIL import Image, ImageDraw
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .database import Base
+from .models.directory import (
+    ModelDirDepartment, ModelDirTaskStatus, ModelDirProfileToolComponentType,
+    ModelDirProfileToolComponentStatus, ModelDirProfileToolDimension, ModelDirMachine,
+    ModelDirWorkType, ModelDirWorkSubtype, ModelDirTaskType, ModelDirBlankMaterial, ModelDirBlankType
+)
+from .models.profile import ModelProfile
+from .models.profiletool import (
+    ModelProfileTool, ModelProfileToolComponent, ModelProfileToolComponentHistory, SET_STATUS_ID_DEVELOPMENT
+)
+from .models.product import ModelProduct, ModelProductComponent
+from .models.task import ModelTask, ModelTaskComponent, ModelTaskComponentStage
+from .models.blank import ModelBlank
+from .models.plan import ModelPlanTaskComponentStage
+from .models import change_log  # noqa: F401 — журнал изменений пишется событиями маппера
+from .progress import refresh_component, refresh_task
+from .sketch_store import save_sketch
+from .api.task import NAME_TYPE_DEVELOPMENT, NAME_STATUS_IN_PROGRESS, NAME_STATUS_COMPLETED
+
+# Строк на единицу масштаба
+COUNT_PROFILE = 10
+COUNT_PRODUCT = 2
+COUNT_COMPONENT_PRODUCT = 3
+COUNT_TASK_PRODUCT = 2
+COUNT_BLANK_ORDER = 20  # заказов заготовок, в заказе 1–10 заготовок
+
+DATE_START = date(2025, 1, 1)
+SIZE_SKETCH = (800, 600)
+
+# Справочники: таблица → имена
+DICT_DIRECTORY_NAME = {
+    "department": ("Инструментальный цех", "Прессовый цех", "Склад"),
+    "task_status": ("Новая", NAME_STATUS_IN_PROGRESS, NAME_STATUS_COMPLETED),
+    "task_type": (NAME_TYPE_DEVELOPMENT, "Изготовление", "Ремонт"),
+    "dimension": ("Малый", "Средний", "Крупный"),
+    "component_status": ("Новая", "В разработке", "Изготовлена"),
+    "blank_material": ("Сталь 4Х5МФС", "Сталь 40Х", "Сталь Х12МФ"),
+}
+# Тип работ → подтипы и число станков
+DICT_WORK_TYPE = {
+    "Фрезерная": (("Черновая фрезеровка", "Чистовая фрезеровка"), 3),
+    "Токарная": (("Токарная обработка",), 2),
+    "Электроэрозионная": (("Проволочная резка", "Прошивка"), 2),
+    "Термообработка": (("Закалка", "Отпуск"), 0),  # закалка — без станка
+}
+# Тип компонента → подтипы работ плана по порядку
+DICT_COMPONENT_PLAN = {
+    "Матрица": ("Черновая фрезеровка", "Закалка", "Отпуск", "Проволочная резка", "Чистовая фрезеровка"),
+    "Подкладка": ("Токарная обработка", "Закалка", "Чистовая фрезеровка"),
+    "Болстер": ("Черновая фрезеровка", "Токарная обработка"),
+}
+
+
+# =============================================================================
+# СПРАВОЧНИКИ И ПЛАН
+# =============================================================================
+def seed_directory(db: Session) -> dict:
+    """Справочники и план этапов; {таблица: [id]}"""
+    dict_row = {
+        "department": [ModelDirDepartment(name=name) for name in DICT_DIRECTORY_NAME["department"]],
+        "task_status": [ModelDirTaskStatus(name=name) for name in DICT_DIRECTORY_NAME["task_status"]],
+        "task_type": [ModelDirTaskType(name=name) for name in DICT_DIRECTORY_NAME["task_type"]],
+        "dimension": [ModelDirProfileToolDimension(name=name) for name in DICT_DIRECTORY_NAME["dimension"]],
+        "component_status": [
+            ModelDirProfileToolComponentStatus(name=name) for name in DICT_DIRECTORY_NAME["component_status"]
+        ],
+        "blank_material": [ModelDirBlankMaterial(name=name) for name in DICT_DIRECTORY_NAME["blank_material"]],
+        "work_type": [ModelDirWorkType(name=name) for name in DICT_WORK_TYPE],
+    }
+    for list_row in dict_row.values():
+        db.add_all(list_row)
+    db.flush()
+
+    dict_row["work_subtype"] = []
+    dict_row["machine"] = []
+    for work_type in dict_row["work_type"]:
+        list_subtype_name, count_machine = DICT_WORK_TYPE[work_type.name]
+        dict_row["work_subtype"] += [
+            ModelDirWorkSubtype(name=name, work_type_id=work_type.id) for name in list_subtype_name
+        ]
+        dict_row["machine"] += [
+            ModelDirMachine(name=f"{work_type.name} {number}", work_type_id=work_type.id)
+            for number in range(1, count_machine + 1)
+        ]
+    dict_row["component_type"] = [
+        ModelDirProfileToolComponentType(
+            name=f"{name} {dimension.name.lower()}", profiletool_dimension_id=dimension.id,
+            width=100 * size, height=40 * size, length=100 * size
+        )
+        for size, dimension in enumerate(dict_row["dimension"], start=1) for name in DICT_COMPONENT_PLAN
+    ]
+    dict_row["blank_type"] = [
+        ModelDirBlankType(name=f"{material.name} {size}", width=size, height=size // 2, length=size,
+                          material_id=material.id)
+        for material in dict_row["blank_material"] for size in (100, 200, 300)
+    ]
+    for key in ("work_subtype", "machine", "component_type", "blank_type"):
+        db.add_all(dict_row[key])
+    db.flush()
+
+    dict_subtype_id = {row.name: row.id for row in dict_row["work_subtype"]}
+    db.add_all([
+        ModelPlanTaskComponentStage(
+            profiletool_component_type_id=component_type.id, work_subtype_id=dict_subtype_id[subtype_name],
+            stage_num=stage_num
+        )
+        for component_type in dict_row["component_type"]
+        for stage_num, subtype_name in enumerate(DICT_COMPONENT_PLAN[component_type.name.split()[0]], start=1)
+    ])
+    db.flush()
+    return {key: [row.id for row in list_row] for key, list_row in dict_row.items()}
+
+
+def build_sketch(rnd: random.Random, article: str) -> bytes:
+    """PNG эскиза профиля: контур со случайными выступами и подпись"""
+    width, height = SIZE_SKETCH
+    image = Image.new("RGB", SIZE_SKETCH, "white")
+    draw = ImageDraw.Draw(image)
+    list_point = []
+    count_point = rnd.randint(8, 24)
+    for index in range(count_point):
+        x = 100 + (width - 200) * index / (count_point - 1)
+        list_point.append((x, height / 2 - rnd.randint(40, 220)))
+    list_point += [(x, height - y) for x, y in reversed(list_point)]
+    draw.polygon(list_point, outline="black", fill=(210, 210, 210), width=3)
+    draw.text((20, 20), article, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+# =============================================================================
+# ГРАФ ДАННЫХ
+# =============================================================================
+class Generator:
+    """Состояние генерации: справочники, план этапов, счётчик заказов заготовок"""
+
+    def __init__(self, db: Session, seed: int, is_sketch: bool):
+        self.db = db
+        self.rnd = random.Random(seed)
+        self.is_sketch = is_sketch
+        self.dict_id = seed_directory(db)
+        self.dict_machine = {}  # тип работ → [id станка]
+        for machine in db.query(ModelDirMachine):
+            self.dict_machine.setdefault(machine.work_type_id, []).append(machine.id)
+        self.dict_subtype_work_type = {row.id: row.work_type_id for row in db.query(ModelDirWorkSubtype)}
+        self.dict_type_dimension = {
+            row.id: row.profiletool_dimension_id for row in db.query(ModelDirProfileToolComponentType)
+        }
+        self.dict_plan = {}  # тип компонента → [id подтипа работ] по stage_num
+        for plan in db.query(ModelPlanTaskComponentStage).order_by(ModelPlanTaskComponentStage.stage_num):
+            self.dict_plan.setdefault(plan.profiletool_component_type_id, []).append(plan.work_subtype_id)
+        self.list_component_id = []  # компоненты инструментов — для заказов заготовок
+        self.list_product_component_id = []
+        self.order = 0
+        self.index_task = 0
+
+    def add_profile(self, index: int):
+        """Профиль, инструмент, компоненты с историей и задача по инструменту"""
+        rnd = self.rnd
+        day = DATE_START + timedelta(days=index % 365)
+        article = f"АП-{index + 1:05d}"
+        profile = ModelProfile(article=article, description=f"Профиль {index + 1}, {rnd.choice(('окно', 'дверь', 'фасад'))}")
+        if self.is_sketch:
+            profile.sketch_hash = save_sketch(build_sketch(rnd, article))
+        self.db.add(profile)
+        self.db.flush()
+        dimension_id = rnd.choice(self.dict_id["dimension"])
+        profiletool = ModelProfileTool(profile_id=profile.id, dimension_id=dimension_id, description="Инструмент")
+        self.db.add(profiletool)
+        self.db.flush()
+
+        list_component = []
+        for type_id in [type_id for type_id, value in self.dict_type_dimension.items() if value == dimension_id]:
+            for variant in range(1, rnd.choice((1, 1, 2)) + 1):
+                component = ModelProfileToolComponent(profiletool_id=profiletool.id, type_id=type_id, variant=variant)
+                self.db.add(component)
+                self.db.flush()
+                self.add_history(component, day)
+                list_component.append(component)
+                self.list_component_id.append(component.id)
+
+        task = self.add_task(day, profiletool_id=profiletool.id)
+        for component in list_component:
+            self.add_task_component(task, day, self.dict_plan[component.type_id], profiletool_component_id=component.id)
+        self.db.flush()
+        refresh_task(self.db, task.id)
+
+    def add_history(self, component: ModelProfileToolComponent, day: date):
+        """История статусов по порядку; текущий статус — последний"""
+        status_date = day
+        for status_id in self.dict_id["component_status"][:self.rnd.randint(1, len(self.dict_id["component_status"]))]:
+            self.db.add(ModelProfileToolComponentHistory(
+                profiletool_component_id=component.id, date=status_date, status_id=status_id
+            ))
+            component.current_status_id = status_id
+            component.current_status_date = status_date
+            if status_id in SET_STATUS_ID_DEVELOPMENT:
+                component.current_development_status_id = status_id
+            status_date += timedelta(days=self.rnd.randint(3, 20))
+
+    def add_task(self, day: date, **dict_link) -> ModelTask:
+        """Задача; статусы и типы по кругу — в каждой единице масштаба есть все сочетания"""
+        list_status = self.dict_id["task_status"]
+        status_id = list_status[self.index_task % len(list_status)]
+        task = ModelTask(
+            status_id=status_id,
+            type_id=self.dict_id["task_type"][self.index_task // len(list_status) % len(self.dict_id["task_type"])],
+            created=day, deadline=day + timedelta(days=self.rnd.randint(14, 60)),
+            completed=day + timedelta(days=self.rnd.randint(10, 50)) if status_id == list_status[2] else None,
+            position=self.index_task + 1 if status_id == list_status[1] else None,
+            description=f"Задача {self.index_task + 1}", **dict_link
+        )
+        self.index_task += 1
+        self.db.add(task)
+        self.db.flush()
+        return task
+
+    def add_task_component(self, task: ModelTask, day: date, list_subtype_id: list, **dict_link):
+        """Компонент задачи и этапы; завершённость этапов — по статусу задачи"""
+        task_component = ModelTaskComponent(task_id=task.id, **dict_link)
+        self.db.add(task_component)
+        self.db.flush()
+        list_status = self.dict_id["task_status"]
+        if task.status_id == list_status[2]:
+            count_done = len(list_subtype_id)
+        elif task.status_id == list_status[1]:
+            count_done = self.rnd.randint(0, len(list_subtype_id) - 1)
+        else:
+            count_done = 0
+        for stage_num, work_subtype_id in enumerate(list_subtype_id, start=1):
+            start = day + timedelta(days=2 * stage_num)
+            list_machine_id = self.dict_machine.get(self.dict_subtype_work_type[work_subtype_id])
+            self.db.add(ModelTaskComponentStage(
+                task_component_id=task_component.id, stage_num=stage_num, work_subtype_id=work_subtype_id,
+                machine_id=self.rnd.choice(list_machine_id) if list_machine_id else None,
+                start=start, finish=start + timedelta(days=1) if stage_num <= count_done else None
+            ))
+        self.db.flush()
+        refresh_component(self.db, task_component)
+
+    def add_product(self, index: int):
+        """Изделие с компонентами и задачами по нему"""
+        day = DATE_START + timedelta(days=index % 365)
+        product = ModelProduct(name=f"Изделие {index + 1}", department_id=self.rnd.choice(self.dict_id["department"]))
+        self.db.add(product)
+        self.db.flush()
+        list_component = [
+            ModelProductComponent(product_id=product.id, name=f"Деталь {number}", quantity=self.rnd.randint(1, 10))
+            for number in range(1, COUNT_COMPONENT_PRODUCT + 1)
+        ]
+        self.db.add_all(list_component)
+        self.db.flush()
+        self.list_product_component_id += [component.id for component in list_component]
+        list_subtype_id = self.dict_id["work_subtype"][:2]
+        for _ in range(COUNT_TASK_PRODUCT // COUNT_PRODUCT):
+            task = self.add_task(day, product_id=product.id)
+            for component in list_component:
+                self.add_task_component(task, day, list_subtype_id, product_component_id=component.id)
+            self.db.flush()
+            refresh_task(self.db, task.id)
+
+    def add_blank_order(self, index: int):
+        """Заказ заготовок одного материала под компоненты инструментов или изделий"""
+        rnd = self.rnd
+        self.order += 1
+        date_order = DATE_START + timedelta(days=index % 365)
+        date_arrival = date_order + timedelta(days=rnd.randint(5, 30)) if rnd.random() < 0.7 else None
+        material_id = rnd.choice(self.dict_id["blank_material"])
+        size = rnd.choice((100, 200, 300))
+        for _ in range(rnd.randint(1, 10)):
+            dict_link = (
+                {"product_component_id": rnd.choice(self.list_product_component_id)}
+                if self.list_product_component_id and rnd.random() < 0.2
+                else {"profiletool_component_id": rnd.choice(self.list_component_id)}
+            )
+            self.db.add(ModelBlank(
+                order=self.order, material_id=material_id, date_order=date_order, date_arrival=date_arrival,
+                date_product=date_arrival + timedelta(days=rnd.randint(1, 20))
+                if date_arrival and rnd.random() < 0.5 else None,
+                blank_width=size, blank_height=size // 2, blank_length=size,
+                product_width=size - 10, product_height=size // 2 - 10, product_length=size - 10, **dict_link
+            ))
+
+
+def generate(db: Session, scale: int = 1, seed: int = 0, is_sketch: bool = False) -> dict:
+    """Заполнить пустую базу: справочники, план и scale единиц данных; возвращает число строк по таблицам"""
+    generator = Generator(db, seed, is_sketch)
+    for index in range(COUNT_PROFILE * scale):
+        generator.add_profile(index)
+    for index in range(COUNT_PRODUCT * scale):
+        generator.add_product(index)
+    for index in range(COUNT_BLANK_ORDER * scale):
+        generator.add_blank_order(index)
+    db.commit()
+    return get_dict_count(db)
+
+
+def get_dict_count(db: Session) -> dict:
+    """Число строк по таблицам"""
+    list_model = [
+        ModelProfile, ModelProfileTool, ModelProfileToolComponent, ModelProfileToolComponentHistory, ModelProduct,
+        ModelProductComponent, ModelTask, ModelTaskComponent, ModelTaskComponentStage, ModelBlank
+    ]
+    return {model.__tablename__: db.query(model).count() for model in list_model}
+
+
+def main(path_db: str, scale: int = 1, is_sketch: bool = False):
+    engine = create_engine(f"sqlite:///{path_db}")
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        if db.query(ModelProfile).first() is not None:
+            print(f"❌ База {path_db} не пустая")
+            return
+        for table_name, count in generate(db, scale, is_sketch=is_sketch).items():
+            print(f"{table_name:<32} {count:>8}")
+
+
+if __name__ == "__main__":
+    list_arg = [arg for arg in sys.argv[1:] if arg != "--sketch"]
+    main(
+        list_arg[0] if list_arg else "aditim-bench.db", int(list_arg[1]) if len(list_arg) > 1 else 1,
+        "--sketch" in sys.argv
+    )
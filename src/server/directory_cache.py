@@ -0,0 +1,108 @@
+"""Кеш справочников ModelDir* в памяти процесса.
+
+Справочники маленькие и меняются редко: загружаются целиком при старте
+(или при первом обращении после сброса), отдаются /api/directory/* без
+запросов к базе и разрешают имя в id за O(1). Сбрасываются роутами записи
+справочников после коммита.
+"""
+import threading
+from typing import Optional
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from .database import get_db
+from .models.directory import (
+    ModelDirDepartment, ModelDirTaskStatus, ModelDirProfileToolComponentType,
+    ModelDirProfileToolComponentStatus, ModelDirProfileToolDimension, ModelDirMachine,
+    ModelDirWorkType, ModelDirWorkSubtype, ModelDirTaskType, ModelDirBlankMaterial, ModelDirBlankType
+)
+from .schemas.directory import (
+    SchemaDirDepartment, SchemaDirTaskStatus, SchemaDirProfiletoolComponentType, SchemaDirComponentStatus,
+    SchemaDirToolDimension, SchemaDirMachine, SchemaDirWorkType, SchemaDirWorkSubtype, SchemaDirTaskType,
+    SchemaDirBlankMaterial, SchemaDirBlankTypeResponse
+)
+
+# Таблица справочника → (модель, схема ответа с вложенными справочниками)
+DICT_DIRECTORY = {
+    "dir_department": (ModelDirDepartment, SchemaDirDepartment),
+    "dir_task_status": (ModelDirTaskStatus, SchemaDirTaskStatus),
+    "dir_task_type": (ModelDirTaskType, SchemaDirTaskType),
+    "dir_profiletool_dimension": (ModelDirProfileToolDimension, SchemaDirToolDimension),
+    "dir_profiletool_component_type": (ModelDirProfileToolComponentType, SchemaDirProfiletoolComponentType),
+    "dir_profiletool_component_status": (ModelDirProfileToolComponentStatus, SchemaDirComponentStatus),
+    "dir_machine": (ModelDirMachine, SchemaDirMachine),
+    "dir_work_type": (ModelDirWorkType, SchemaDirWorkType),
+    "dir_work_subtype": (ModelDirWorkSubtype, SchemaDirWorkSubtype),
+    "dir_blank_material": (ModelDirBlankMaterial, SchemaDirBlankMaterial),
+    "dir_blank_type": (ModelDirBlankType, SchemaDirBlankTypeResponse),
+}
+
+
+class SnapshotDirectory:
+    """Снимок всех справочников: строки по таблице и индекс имя → id.
+
+    Строки хранятся как словари схемы ответа (с вложенными справочниками),
+    поэтому не привязаны к сессии и безопасно читаются из любых потоков.
+    """
+
+    def __init__(self, dict_row: dict):
+        self.dict_row = dict_row  # {table_name: [row]}
+        self.dict_id_by_name = {
+            table_name: {row["name"]: row["id"] for row in list_row if "name" in row}
+            for table_name, list_row in dict_row.items()
+        }
+
+    def get_list(self, table_name: str, **dict_filter) -> list[dict]:
+        """Строки справочника; dict_filter — равенство полей (None не фильтрует)"""
+        list_row = self.dict_row.get(table_name, [])
+        dict_filter = {field: value for field, value in dict_filter.items() if value is not None}
+        if not dict_filter:
+            return list_row
+        return [row for row in list_row if all(row.get(field) == value for field, value in dict_filter.items())]
+
+    def get_id(self, table_name: str, name: str) -> Optional[int]:
+        """id строки справочника по имени"""
+        return self.dict_id_by_name.get(table_name, {}).get(name)
+
+
+class CacheDirectory:
+    """Кеш снимка справочников.
+
+    Сброс очищает все справочники сразу: вложенные документы одних
+    справочников содержат строки других.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot: Optional[SnapshotDirectory] = None
+        self.generation = 0  # растёт при каждом сбросе
+
+    def get(self, db: Session) -> SnapshotDirectory:
+        """Текущий снимок; при пустом кеше загружается из базы"""
+        with self.lock:
+            if self.snapshot is not None:
+                return self.snapshot
+            generation = self.generation
+        snapshot = SnapshotDirectory({
+            table_name: [schema.model_validate(item).model_dump() for item in db.query(model).order_by(model.id)]
+            for table_name, (model, schema) in DICT_DIRECTORY.items()
+        })
+        with self.lock:
+            # Сброс во время загрузки — снимок мог устареть, в кеш его не кладём
+            if generation == self.generation:
+                self.snapshot = snapshot
+        return snapshot
+
+    def invalidate(self):
+        """Сбросить кеш; вызывается после коммита изменений справочника"""
+        with self.lock:
+            self.snapshot = None
+            self.generation += 1
+
+
+cache_directory = CacheDirectory()
+
+
+def get_directory(db: Session = Depends(get_db)) -> SnapshotDirectory:
+    """Зависимость FastAPI: снимок справочников"""
+    return cache_directory.get(db)
@@ -0,0 +1,61 @@
+"""План загрузки связей по схеме ответа.
+
+Вложенное поле-схема соответствует одноимённой связи модели: для неё
+добавляется selectinload, и так до листьев схемы. Опции выводятся из тех же
+схем, что сериализуют ответ, поэтому не расходятся с ними при изменении схем.
+На каждом уровне по умолчанию ставится raiseload("*"): связь, которой нет
+в плане, при чтении падает с ошибкой, а не грузится тихо по запросу на строку.
+"""
+import typing
+from functools import lru_cache
+from typing import Optional
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, raiseload, selectinload
+
+
+def get_schema_model(annotation) -> Optional[type[BaseModel]]:
+    """Вложенная схема поля: Optional[Schema], list[Schema] → Schema"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = get_schema_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+def get_dict_field(schema: type[BaseModel]) -> dict:
+    """Поля схемы с разрешёнными отложенными ссылками ('SchemaX')"""
+    schema.model_rebuild()
+    return schema.model_fields
+
+
+def build_option(model, schema: type[BaseModel], set_exclude: frozenset, is_raise: bool) -> list:
+    """Опции загрузки документа schema из строки model (без полей set_exclude)"""
+    list_option = [raiseload("*")] if is_raise else []
+    mapper = inspect(model)
+    for name, field in get_dict_field(schema).items():
+        schema_nested = get_schema_model(field.annotation)
+        if schema_nested is None or name in set_exclude or name not in mapper.relationships:
+            continue
+        relationship = mapper.relationships[name]
+        list_option.append(
+            selectinload(getattr(model, name)).options(
+                *build_option(relationship.mapper.class_, schema_nested, frozenset(), is_raise)
+            )
+        )
+    return list_option
+
+
+@lru_cache(maxsize=None)
+def get_option_schema(model, schema: type[BaseModel], set_exclude: frozenset = frozenset(),
+                      is_raise: bool = True) -> tuple:
+    """Опции загрузки по схеме ответа (кешируются: схемы и модели не меняются)"""
+    return tuple(build_option(model, schema, set_exclude, is_raise))
+
+
+def query_schema(db: Session, model, schema: type[BaseModel], set_exclude: frozenset = frozenset(),
+                 is_raise: bool = True):
+    """Запрос строк model со всеми связями, которые сериализует schema"""
+    return db.query(model).options(*get_option_schema(model, schema, set_exclude, is_raise))
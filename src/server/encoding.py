@@ -0,0 +1,193 @@
+"""Кодирование ответов: orjson, сжатие по Accept-Encoding и MessagePack по Accept.
+
+brotli и msgpack необязательны: без них сервер отвечает gzip/deflate и JSON.
+"""
+import gzip
+import zlib
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MEDIA_TYPE_JSON = "application/json"
+MEDIA_TYPE_MSGPACK = "application/msgpack"
+SET_MEDIA_TYPE_MSGPACK = {MEDIA_TYPE_MSGPACK, "application/x-msgpack"}
+# Сжимаются только текстовые форматы; эскизы (изображения) уже сжаты
+SET_MEDIA_TYPE_COMPRESS = {MEDIA_TYPE_JSON, MEDIA_TYPE_MSGPACK, "text/plain", "text/html"}
+SIZE_COMPRESS_MIN = 1024  # меньшие ответы сжатие не окупают
+SIZE_THREADPOOL_MIN = 64 * 1024  # большие тела кодируются в пуле потоков, не задерживая цикл событий
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # выше — заметно дольше на ответах в сотни килобайт
+
+
+class ResponseORJSON(JSONResponse):
+    """JSON-ответ через orjson.
+
+    Ответы с response_model FastAPI сериализует pydantic сразу в байты,
+    этот класс кодирует остальные: словари без схемы, ошибки, старые FastAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def get_dict_quality(header: str) -> dict:
+    """{значение: q} заголовка Accept / Accept-Encoding, только q > 0"""
+    dict_quality = {}
+    for part in header.split(","):
+        value, *list_param = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in list_param:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if value and quality > 0:
+            dict_quality[value.lower()] = quality
+    return dict_quality
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Сжатие с наибольшим q из Accept-Encoding; при равных q — br, gzip, deflate"""
+    dict_quality = get_dict_quality(accept_encoding)
+    list_encoding = [
+        encoding for encoding in ("br", "gzip", "deflate")
+        if encoding in dict_quality and (encoding != "br" or brotli is not None)
+    ]
+    return max(list_encoding, key=dict_quality.get, default=None)
+
+
+def is_msgpack_accepted(accept: str) -> bool:
+    """Клиент явно запросил MessagePack не ниже JSON по q"""
+    if msgpack is None:
+        return False
+    dict_quality = get_dict_quality(accept)
+    quality_msgpack = max((dict_quality.get(media_type, 0) for media_type in SET_MEDIA_TYPE_MSGPACK), default=0)
+    return quality_msgpack > 0 and quality_msgpack >= dict_quality.get(MEDIA_TYPE_JSON, 0)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return zlib.compress(body, GZIP_LEVEL)
+
+
+def encode_msgpack(body: bytes) -> bytes:
+    """JSON → MessagePack (даты остаются ISO-строками, как в JSON)"""
+    return msgpack.packb(orjson.loads(body), use_bin_type=True)
+
+
+def encode_body(body: bytes, content_type: bytes, is_msgpack: bool, encoding: Optional[str]) -> tuple:
+    """(тело, Content-Type, Content-Encoding или None) после перекодирования"""
+    content_encoding = None
+    if is_msgpack and content_type.split(b";")[0].strip() == MEDIA_TYPE_JSON.encode() and body:
+        body = encode_msgpack(body)
+        content_type = MEDIA_TYPE_MSGPACK.encode()
+    if encoding is not None and len(body) >= SIZE_COMPRESS_MIN:
+        body = compress(body, encoding)
+        content_encoding = encoding.encode()
+    return body, content_type, content_encoding
+
+
+def get_list_vary(media_type: str) -> list:
+    """Заголовки Vary ответа, вид которого зависит от Accept / Accept-Encoding запроса"""
+    list_vary = [(b"vary", b"Accept-Encoding")]
+    if msgpack is not None and media_type in (MEDIA_TYPE_JSON, ""):
+        list_vary.append((b"vary", b"Accept"))
+    return list_vary
+
+
+class MiddlewareEncoding:
+    """ASGI middleware: JSON → MessagePack по Accept и сжатие по Accept-Encoding.
+
+    Тело ответа подходящего типа собирается целиком (списки отдаются одним
+    куском), остальные ответы — файлы, 304, потоковые — проходят без изменений.
+    ETag перекодированного ответа становится слабым (W/), If-None-Match его принимает.
+    Vary ставится на все ответы, которые могли быть перекодированы (и на 304),
+    в том числе отданные как есть: иначе кеш между клиентом и сервером отдаст
+    сжатое тело клиенту без сжатия. Тела больше SIZE_THREADPOOL_MIN кодируются
+    в пуле потоков: сжатие списков задач не задерживает вебсокет и пинги.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        dict_header = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        is_msgpack = is_msgpack_accepted(dict_header.get("accept", ""))
+        encoding = choose_encoding(dict_header.get("accept-encoding", ""))
+        is_negotiated = is_msgpack or encoding is not None
+
+        state = {"start": None, "body": [], "passthrough": False}
+
+        async def send_encoded(message):
+            if state["passthrough"]:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in message["headers"]}
+                media_type = headers.get("content-type", "").split(";")[0].strip()
+                is_not_modified = message["status"] == 304 and not media_type
+                if "content-encoding" in headers or (media_type not in SET_MEDIA_TYPE_COMPRESS and not is_not_modified):
+                    state["passthrough"] = True
+                    await send(message)
+                    return
+                if not is_negotiated or is_not_modified:
+                    # Перекодировать нечего, но вид ответа зависит от заголовков запроса
+                    state["passthrough"] = True
+                    await send({**message, "headers": list(message["headers"]) + get_list_vary(media_type)})
+                    return
+                state["start"] = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            state["body"].append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await send_body(state["start"], b"".join(state["body"]))
+
+        async def send_body(start: dict, body: bytes):
+            list_header = [
+                (key, value) for key, value in start["headers"]
+                if key.lower() not in (b"content-length", b"content-type", b"etag")
+            ]
+            dict_start = {key.lower(): value for key, value in start["headers"]}
+            content_type_source = dict_start[b"content-type"]
+            etag = dict_start.get(b"etag")
+            if len(body) >= SIZE_THREADPOOL_MIN:
+                body, content_type, content_encoding = await run_in_threadpool(
+                    encode_body, body, content_type_source, is_msgpack, encoding
+                )
+            else:
+                body, content_type, content_encoding = encode_body(body, content_type_source, is_msgpack, encoding)
+            is_encoded = content_encoding is not None or content_type != content_type_source
+            list_header.extend(get_list_vary(content_type_source.split(b";")[0].strip().decode("latin-1")))
+            if content_encoding is not None:
+                list_header.append((b"content-encoding", content_encoding))
+            if etag is not None:
+                list_header.append((b"etag", b"W/" + etag if is_encoded and not etag.startswith(b"W/") else etag))
+            list_header.append((b"content-type", content_type))
+            list_header.append((b"content-length", str(len(body)).encode()))
+            await send({**start, "headers": list_header})
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_encoded)
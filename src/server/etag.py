@@ -0,0 +1,107 @@
+"""Условные GET по версиям таблиц: ETag и 304 Not Modified.
+
+Версия таблицы — последняя запись журнала change_log по этой таблице.
+Журнал пишут те же хуки сессии, после которых рассылается notify_clients,
+и он хранится в базе, поэтому версии не сбрасываются при перезапуске
+сервера: клиенты, переподключившиеся после рестарта, получают 304.
+
+Список отдаёт вложенные документы других таблиц, поэтому версия списка —
+максимум версий всех таблиц, из которых собран ответ.
+"""
+import threading
+from typing import Callable
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .database import get_db
+from .models.change_log import ModelChangeLog
+
+# Справочники вложены почти во все документы
+SET_TABLE_DIRECTORY = {
+    "dir_department", "dir_task_status", "dir_task_type", "dir_profiletool_dimension",
+    "dir_profiletool_component_type", "dir_profiletool_component_status", "dir_machine",
+    "dir_work_type", "dir_work_subtype", "dir_blank_material", "dir_blank_type",
+}
+SET_TABLE_BLANK = {"blank"} | SET_TABLE_DIRECTORY
+SET_TABLE_PROFILETOOL = {
+    "profile", "profiletool", "profiletool_component", "profiletool_component_history",
+} | SET_TABLE_BLANK
+SET_TABLE_PRODUCT = {"product", "product_component"} | SET_TABLE_BLANK
+SET_TABLE_TASK = {"task", "task_component", "task_component_stage"} | SET_TABLE_PROFILETOOL | SET_TABLE_PRODUCT
+
+
+class VersionTable:
+    """Версии таблиц по журналу изменений.
+
+    Полный GROUP BY по журналу выполняется один раз; дальше при росте
+    общей версии дочитываются только новые записи журнала.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None  # общая версия, по которую прочитан журнал
+        self.dict_version: dict = {}
+
+    def get(self, db: Session) -> dict:
+        """{table_name: version} на текущий момент"""
+        version = db.query(func.max(ModelChangeLog.version)).scalar() or 0
+        with self.lock:
+            if version == self.version:
+                return self.dict_version
+            since = self.version if self.version is not None and version > self.version else None
+        query = db.query(ModelChangeLog.table_name, func.max(ModelChangeLog.version))
+        if since is not None:
+            query = query.filter(ModelChangeLog.version > since)
+        dict_new = dict(query.group_by(ModelChangeLog.table_name).all())
+        with self.lock:
+            dict_version = dict(self.dict_version) if since is not None else {}
+            dict_version.update(dict_new)
+            if self.version is None or version >= self.version:
+                self.version = version
+                self.dict_version = dict_version
+        return dict_version
+
+    def clear(self):
+        with self.lock:
+            self.version = None
+            self.dict_version = {}
+
+    def get_max(self, db: Session, set_table: set) -> int:
+        """Версия данных, собранных из таблиц set_table"""
+        dict_version = self.get(db)
+        return max((dict_version.get(table_name, 0) for table_name in set_table), default=0)
+
+
+version_table = VersionTable()
+
+
+def is_etag_match(if_none_match: str, etag: str) -> bool:
+    """Совпадает ли ETag с заголовком If-None-Match (список, W/ и *)"""
+    for value in if_none_match.split(","):
+        value = value.strip()
+        if value == "*" or value.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def etag_table(name: str, set_table: set = frozenset()) -> Callable:
+    """Зависимость для списка: ставит ETag "<name>-<version>", на совпадающий
+    If-None-Match отвечает 304 до выполнения запроса роутера. Возвращает версию.
+
+    :param name: основная таблица списка (часть ETag)
+    :param set_table: таблицы вложенных документов, кроме основной
+    """
+    set_table = {name} | set(set_table)
+
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)):
+        # Версия берётся до запроса данных: тело может оказаться новее ETag, но не старее
+        version = version_table.get_max(db, set_table)
+        etag = f'"{name}-{version}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and is_etag_match(if_none_match, etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return version
+
+    return dependency
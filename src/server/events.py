@@ -1,63 +1,280 @@
 # src/server/events.py
 import asyncio
+import json
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
 from fastapi import WebSocket
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+# Размер исходящей очереди одного клиента
+SIZE_QUEUE = int(os.getenv("ADITIM_WS_QUEUE_SIZE", "100"))
+# Что делать с медленным клиентом, чья очередь переполнена:
+# drop — отбросить событие, resync — заменить очередь одним событием resync,
+# disconnect — отключить клиента
+POLICY_SLOW = os.getenv("ADITIM_WS_POLICY_SLOW", "resync")
+# Таймаут отправки одного сообщения, сек
+TIMEOUT_SEND = float(os.getenv("ADITIM_WS_TIMEOUT_SEND", "10"))
+# Период пинга и время без ответа, после которого соединение считается мёртвым, сек
+INTERVAL_HEARTBEAT = float(os.getenv("ADITIM_WS_INTERVAL_HEARTBEAT", "20"))
+TIMEOUT_HEARTBEAT = float(os.getenv("ADITIM_WS_TIMEOUT_HEARTBEAT", "60"))
+
+
+class Connection:
+    """Клиентское соединение с собственной очередью и задачей-писателем"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SIZE_QUEUE)
+        self.task_writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+        self.has_pong = False  # клиент отвечает на ping — можно проверять таймаут
+        self.count_sent = 0
+        self.count_dropped = 0
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: dict[WebSocket, Connection] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.task_heartbeat: Optional[asyncio.Task] = None
+        self.stat = {
+            "count_broadcast": 0,
+            "count_sent": 0,
+            "count_dropped": 0,
+            "count_resync": 0,
+            "count_disconnected": 0,
+        }
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        # Запоминаем цикл сервера: в него рассылки ставятся из потоков роутеров
+        self.loop = asyncio.get_running_loop()
+        connection = Connection(websocket)
+        connection.task_writer = asyncio.create_task(self.write(connection))
+        self.active_connections[websocket] = connection
+        if self.task_heartbeat is None or self.task_heartbeat.done():
+            self.task_heartbeat = asyncio.create_task(self.heartbeat())
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        connection = self.active_connections.pop(websocket, None)
+        if connection is None:
+            return
+        self.stat["count_disconnected"] += 1
+        if connection.task_writer and connection.task_writer is not asyncio.current_task():
+            connection.task_writer.cancel()
+
+    def receive(self, websocket: WebSocket, text: str):
+        """Отметить входящее сообщение клиента (ответ на ping и любые другие)"""
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return
+        connection.last_seen = time.monotonic()
+        if text == "pong":
+            connection.has_pong = True
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections[:]:
-            try:
-                await connection.send_json(message)
-            except RuntimeError:
-                self.disconnect(connection)
+    def broadcast(self, message: dict):
+        """Поставить сообщение в очереди всех клиентов, не дожидаясь отправки"""
+        text = json.dumps(message, ensure_ascii=False)
+        self.stat["count_broadcast"] += 1
+        for connection in list(self.active_connections.values()):
+            self.enqueue(connection, text)
+
+    def enqueue(self, connection: Connection, text: str):
+        """Положить сообщение в очередь клиента с учётом политики медленных клиентов"""
+        try:
+            connection.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+        connection.count_dropped += 1
+        self.stat["count_dropped"] += 1
+        if POLICY_SLOW == "disconnect":
+            self.disconnect(connection.websocket)
+            asyncio.create_task(self.close(connection.websocket))
+        elif POLICY_SLOW == "resync":
+            # Пропущенные события клиент добирает по журналу через GET /api/sync
+            while not connection.queue.empty():
+                connection.queue.get_nowait()
+            connection.queue.put_nowait(json.dumps({"event": "resync"}))
+            self.stat["count_resync"] += 1
+
+    async def write(self, connection: Connection):
+        """Задача-писатель: отправляет очередь клиента по одному сообщению"""
+        try:
+            while True:
+                text = await connection.queue.get()
+                await asyncio.wait_for(connection.websocket.send_text(text), TIMEOUT_SEND)
+                connection.count_sent += 1
+                self.stat["count_sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Таймаут или разрыв соединения — клиента отключаем
+            self.disconnect(connection.websocket)
+            await self.close(connection.websocket)
+
+    async def close(self, websocket: WebSocket):
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    async def heartbeat(self):
+        """Периодический ping; соединения без ответа дольше таймаута закрываются"""
+        while self.active_connections:
+            await asyncio.sleep(INTERVAL_HEARTBEAT)
+            now = time.monotonic()
+            for connection in list(self.active_connections.values()):
+                if connection.has_pong and now - connection.last_seen > TIMEOUT_HEARTBEAT:
+                    self.disconnect(connection.websocket)
+                    await self.close(connection.websocket)
+                else:
+                    self.enqueue(connection, json.dumps({"event": "ping"}))
+
+    def get_stat(self) -> dict:
+        """Счётчики рассылки и глубина очередей клиентов"""
+        list_depth = [connection.queue.qsize() for connection in self.active_connections.values()]
+        return {
+            **self.stat,
+            "count_connection": len(list_depth),
+            "queue_depth_max": max(list_depth, default=0),
+            "queue_depth_total": sum(list_depth),
+        }
 
 
 manager = ConnectionManager()
 
 
-# === ГЛОБАЛЬНАЯ ССЫЛКА НА ЦИКЛ ===
-_loop = None
+# Буфер событий текущего HTTP-запроса: {(group, key): action}.
+# Заполняется notify_clients, рассылается одним сообщением после коммита.
+buffer_event: ContextVar[Optional[dict]] = ContextVar("buffer_event", default=None)
 
-def get_event_loop():
-    """Получает или создаёт event loop для фоновых задач"""
-    global _loop
-    if _loop is None or _loop.is_closed():
-        try:
-            _loop = asyncio.get_running_loop()
-        except RuntimeError:
-            # Если нет running loop — создаём новый (например, в отдельном потоке)
-            _loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(_loop)
-    return _loop
+# Если ключ изменён несколькими способами — в событие идёт самое сильное действие
+DICT_ACTION_PRIORITY = {"updated": 0, "created": 1, "deleted": 2}
 
 
 def notify_clients(group: str, key: str, action: str = "updated"):
     """
     Отправить уведомление всем клиентам.
     Работает из синхронного контекста (роутеры).
+
+    Внутри HTTP-запроса событие только попадает в буфер запроса:
+    повторы (group, key) схлопываются, рассылка происходит один раз
+    после фактического коммита транзакции (или в конце успешного запроса),
+    при откате буфер отбрасывается.
+    """
+    buffer = buffer_event.get()
+    if buffer is None:
+        broadcast_event({(group, key): action})
+        return
+    current = buffer.get((group, key))
+    if current is None or DICT_ACTION_PRIORITY.get(action, 0) > DICT_ACTION_PRIORITY.get(current, 0):
+        buffer[(group, key)] = action
+
+
+def broadcast_event(dict_key: dict):
+    """
+    Разослать одно событие по всем изменённым ключам.
+
+    К событию прикладываются изменённые документы (since, version, change —
+    как в GET /api/sync), чтобы клиенты обновили данные на месте без
+    повторного запроса. group/key/action первого ключа сохранены для
+    клиентов, которые не читают list_key.
     """
+    list_key = [
+        {"group": group, "key": key, "action": action}
+        for (group, key), action in dict_key.items()
+    ]
     message = {
         "event": "data_updated",
-        "group": group,
-        "key": key,
-        "action": action,
+        **list_key[0],
+        "list_key": list_key,
         "timestamp": __import__('datetime').datetime.utcnow().isoformat() + 'Z'
     }
 
-    loop = get_event_loop()
-    if loop.is_running():
-        # Если цикл уже работает — отправляем через threadsafe
-        asyncio.run_coroutine_threadsafe(manager.broadcast(message), loop)
+    from .api.sync import build_event_change, lock_event
+    with lock_event:
+        try:
+            message.update(build_event_change())
+        except Exception as e:
+            # Без журнала изменений клиенты перезагрузят ключи целиком
+            print(f"❌ Не удалось приложить изменения к событию: {e}")
+        send_message(message)
+
+
+def flush_event(buffer: Optional[dict]):
+    """Разослать накопленные события буфера и очистить его"""
+    if not buffer:
+        return
+    dict_key = dict(buffer)
+    buffer.clear()
+    broadcast_event(dict_key)
+
+
+@event.listens_for(Session, "after_commit")
+def on_session_commit(session: Session):
+    """После коммита рассылаем события, накопленные до него"""
+    flush_event(buffer_event.get())
+
+
+@event.listens_for(Session, "after_rollback")
+def on_session_rollback(session: Session):
+    """Откат — изменений не было, события отбрасываются"""
+    buffer = buffer_event.get()
+    if buffer:
+        buffer.clear()
+
+
+class MiddlewareEventBuffer:
+    """ASGI middleware: заводит буфер событий на каждый HTTP-запрос.
+
+    События, добавленные после последнего коммита, рассылаются по окончании
+    запроса, если он завершился успешно; при ошибке — отбрасываются.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        buffer = {}
+        dict_status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                dict_status["code"] = message["status"]
+            await send(message)
+
+        token = buffer_event.set(buffer)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            buffer_event.reset(token)
+        if buffer and dict_status["code"] < 400:
+            await run_in_threadpool(flush_event, buffer)
+
+
+def send_message(message: dict):
+    """Поставить рассылку сообщения в цикл событий сервера.
+
+    Рассылка только раскладывает сообщение по очередям клиентов,
+    поэтому не блокирует вызывающий поток.
+    """
+    loop = manager.loop
+    if loop is None or loop.is_closed():
+        return  # Ещё никто не подключался — рассылать некому
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        manager.broadcast(message)
     else:
-        # Для тестов или standalone-вызовов
-        loop.run_until_complete(manager.broadcast(message))
\ No newline at end of file
+        loop.call_soon_threadsafe(manager.broadcast, message)
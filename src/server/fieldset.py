@@ -0,0 +1,213 @@
+"""Частичные документы списков: параметры fields= и include=.
+
+fields — поля документа через запятую, вложенные через точку:
+"id,type.name,status.name,deadline". Связь без подполей — её скалярные поля.
+include — раскрываемые связи: пути ("profiletool.profile") или глубина ("1");
+на каждом уровне пути отдаются скалярные поля. Без fields в документе
+скалярные поля верхнего уровня и связи из include. Без обоих параметров
+роутеры отдают полный документ обычным путём.
+
+По тем же путям строятся проекция (pydantic-модель только с выбранными
+полями) и план загрузки: selectinload только нужных связей и load_only
+только нужных колонок.
+"""
+from functools import lru_cache
+from typing import List, Optional
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, raiseload, selectinload
+
+from .eager_load import get_schema_model, get_dict_field
+from .schemas.task import SchemaTaskResponse
+
+# Поля, которых нет в полной схеме: имя → (тип, пути полей для вычисления).
+# Значение читается одноимённым свойством модели
+DICT_FIELD_EXTRA = {
+    SchemaTaskResponse: {
+        "display_name": (str, ("profiletool.profile.article", "product.name")),
+    },
+}
+
+
+class ParamFieldset:
+    """Параметры частичного документа (зависимость FastAPI): fields, include"""
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Поля через запятую, вложенные через точку: id,type.name"),
+        include: Optional[str] = Query(None, description="Раскрываемые связи через запятую или глубина раскрытия"),
+    ):
+        self.fields = fields
+        self.include = include
+
+
+def split_path(text: str) -> list[list[str]]:
+    """"a,b.c" → [["a"], ["b", "c"]]"""
+    list_path = []
+    for item in text.split(","):
+        path = [name.strip() for name in item.split(".")]
+        if not all(path):
+            raise HTTPException(status_code=400, detail=f"Invalid field path '{item.strip()}'")
+        list_path.append(path)
+    return list_path
+
+
+# =============================================================================
+# ДЕРЕВО ПОЛЕЙ
+# =============================================================================
+
+class NodeFieldset:
+    """Узел дерева полей: документ schema из строк model"""
+
+    def __init__(self, schema: type[BaseModel], model, is_many: bool = False):
+        self.schema = schema
+        self.model = model
+        self.mapper = inspect(model)
+        self.is_many = is_many
+        self.is_output = False
+        self.set_output = set()  # скалярные и дополнительные поля в ответе
+        self.set_load = set()  # скалярные поля, которые читаются из базы
+        self.dict_nested = {}  # связь → узел
+
+    def get_nested(self, name: str, schema_nested: type[BaseModel]) -> "NodeFieldset":
+        if name not in self.dict_nested:
+            relationship = self.mapper.relationships[name]
+            self.dict_nested[name] = NodeFieldset(schema_nested, relationship.mapper.class_, relationship.uselist)
+        return self.dict_nested[name]
+
+    def add_scalar(self, is_output: bool):
+        """Все скалярные поля схемы"""
+        for name, field in get_dict_field(self.schema).items():
+            if get_schema_model(field.annotation) is None:
+                self.set_load.add(name)
+                if is_output:
+                    self.set_output.add(name)
+
+    def add_path(self, path: list[str], is_output: bool = True):
+        """Поле по пути; is_output=False — только загрузка (для вычисляемых полей)"""
+        name, path_rest = path[0], path[1:]
+        dict_extra = DICT_FIELD_EXTRA.get(self.schema, {})
+        dict_field = get_dict_field(self.schema)
+        if name in dict_extra and not path_rest:
+            if is_output:
+                self.set_output.add(name)
+            for path_dependency in dict_extra[name][1]:
+                self.add_path(path_dependency.split("."), is_output=False)
+            return
+        if name not in dict_field:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field '{name}', allowed: {', '.join(sorted(set(dict_field) | set(dict_extra)))}"
+            )
+        schema_nested = get_schema_model(dict_field[name].annotation)
+        if schema_nested is None:
+            if path_rest:
+                raise HTTPException(status_code=400, detail=f"Field '{name}' has no nested fields")
+            self.set_load.add(name)
+            if is_output:
+                self.set_output.add(name)
+            return
+        node = self.get_nested(name, schema_nested)
+        node.is_output = node.is_output or is_output
+        if path_rest:
+            node.add_path(path_rest, is_output)
+        else:
+            node.add_scalar(is_output)
+
+    def add_depth(self, depth: int):
+        """Связи схемы до глубины depth со скалярными полями"""
+        if depth <= 0:
+            return
+        for name, field in get_dict_field(self.schema).items():
+            schema_nested = get_schema_model(field.annotation)
+            if schema_nested is None:
+                continue
+            node = self.get_nested(name, schema_nested)
+            node.is_output = True
+            node.add_scalar(is_output=True)
+            node.add_depth(depth - 1)
+
+    # Загрузка -----------------------------------------------------------------
+
+    def get_list_option(self, set_extra: frozenset = frozenset()) -> list:
+        """Опции запроса: load_only колонок узла, selectinload связей, остальные связи — raiseload.
+
+        set_extra — колонки, нужные сверх полей: ключи связи с родителем, сортировка.
+        """
+        set_key = self.set_load | set(set_extra) | {column.key for column in self.mapper.primary_key}
+        list_option = [raiseload("*")]
+        for name, node in self.dict_nested.items():
+            relationship = self.mapper.relationships[name]
+            set_key |= {self.mapper.get_property_by_column(local).key for local, _ in relationship.local_remote_pairs}
+            set_remote = frozenset(
+                node.mapper.get_property_by_column(remote).key for _, remote in relationship.local_remote_pairs
+            )
+            list_option.append(selectinload(getattr(self.model, name)).options(*node.get_list_option(set_remote)))
+        set_column = {prop.key for prop in self.mapper.column_attrs}
+        # Поле схемы не колонка (свойство модели) — колонки узла читаются целиком
+        if set_key <= set_column:
+            list_option.append(load_only(*[getattr(self.model, key) for key in sorted(set_key)]))
+        return list_option
+
+    # Проекция -----------------------------------------------------------------
+
+    def build_projection(self) -> type[BaseModel]:
+        """pydantic-модель только с выбранными полями, порядок полей — как в схеме"""
+        dict_definition = {}
+        for name, field in get_dict_field(self.schema).items():
+            node = self.dict_nested.get(name)
+            if name in self.set_output:
+                dict_definition[name] = (field.annotation, field)
+            elif node is not None and node.is_output:
+                projection = node.build_projection()
+                dict_definition[name] = (List[projection], []) if node.is_many else (Optional[projection], None)
+        for name, (annotation, _) in DICT_FIELD_EXTRA.get(self.schema, {}).items():
+            if name in self.set_output:
+                dict_definition[name] = (annotation, ...)
+        return create_model(
+            f"{self.schema.__name__}Fieldset", __config__=ConfigDict(from_attributes=True), **dict_definition
+        )
+
+
+class Projection:
+    """Разобранные fields/include для схемы списка: план загрузки и сериализация"""
+
+    def __init__(self, schema: type[BaseModel], model, fields: Optional[str], include: Optional[str]):
+        self.root = NodeFieldset(schema, model)
+        if fields is None:
+            self.root.add_scalar(is_output=True)
+        else:
+            for path in split_path(fields):
+                self.root.add_path(path)
+        if include is not None and include.strip().isdigit():
+            self.root.add_depth(int(include))
+        elif include is not None:
+            for path in split_path(include):
+                for index in range(1, len(path) + 1):
+                    self.root.add_path(path[:index])
+        self.adapter = TypeAdapter(List[self.root.build_projection()])
+
+    def apply(self, query, list_column_extra=()):
+        """Опции загрузки к запросу; list_column_extra — колонки модели сверх полей (сортировка)"""
+        return query.options(*self.root.get_list_option(frozenset(column.key for column in list_column_extra)))
+
+    def dump(self, list_item: list) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(list_item, from_attributes=True))
+
+
+@lru_cache(maxsize=128)
+def compile_projection(schema: type[BaseModel], model, fields: Optional[str], include: Optional[str]) -> Projection:
+    return Projection(schema, model, fields, include)
+
+
+def get_projection(schema: type[BaseModel], model, fieldset: ParamFieldset) -> Optional[Projection]:
+    """Проекция по параметрам запроса; None — полный документ"""
+    if fieldset.fields is None and fieldset.include is None:
+        return None
+    return compile_projection(schema, model, fieldset.fields, fieldset.include)
+
+
+def response_projection(projection: Projection, list_item: list, response: Response) -> Response:
+    """Ответ с частичными документами; заголовки ETag и X-Next-Cursor переносятся из response"""
+    return Response(content=projection.dump(list_item), media_type="application/json", headers=dict(response.headers))
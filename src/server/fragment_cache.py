@@ -0,0 +1,318 @@
+"""Кеш сериализованных JSON-фрагментов документов: задача, компонент задачи, инструмент.
+
+Списки собираются склейкой готовых фрагментов, заново сериализуются только
+затронутые документы. Фрагмент помнит строки всех таблиц, из которых собран
+(обход схемы ответа по ORM-объекту). События маппера after_insert /
+after_update / after_delete копят изменённые строки и их прямых родителей
+(DICT_PARENT), после коммита зависящие от них фрагменты сбрасываются:
+изменение этапа пересобирает один компонент задачи, а не весь список.
+"""
+import threading
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .database import Base
+from .models.change_log import DICT_PARENT
+from .models.task import ModelTask, ModelTaskComponent
+from .models.profiletool import ModelProfileTool
+from .eager_load import get_schema_model, get_dict_field, query_schema
+from .schemas.task import SchemaTaskResponse, SchemaTaskComponentResponse
+from .schemas.profiletool import SchemaProfileToolResponse
+
+SESSION_KEY = "fragment_cache"
+
+# Поля задачи, которые склеиваются из своих фрагментов
+SET_FIELD_TASK_JOINED = frozenset({"profiletool", "component"})
+
+
+# =============================================================================
+# ЗАВИСИМОСТИ ФРАГМЕНТА
+# =============================================================================
+def collect_entity(obj, schema: type[BaseModel], set_entity: set, set_exclude: frozenset = frozenset()):
+    """Строки (таблица, id), из которых schema собирает документ obj"""
+    set_entity.add((obj.__table__.name, obj.id))
+    for name, field in get_dict_field(schema).items():
+        model = get_schema_model(field.annotation)
+        if model is None or name in set_exclude:
+            continue
+        value = getattr(obj, name, None)
+        for item in (value if isinstance(value, list) else [value]):
+            if item is not None:
+                collect_entity(item, model, set_entity)
+
+
+def build_fragment(obj, schema: type[BaseModel], set_exclude: frozenset = frozenset()) -> tuple[bytes, set]:
+    """JSON документа obj по schema без полей set_exclude и его зависимости"""
+    value = {name: getattr(obj, name) for name in get_dict_field(schema) if name not in set_exclude}
+    item = schema.model_validate(value, from_attributes=True)
+    set_entity = set()
+    collect_entity(obj, schema, set_entity, set_exclude)
+    return item.model_dump_json(by_alias=True, exclude=set_exclude or None).encode(), set_entity
+
+
+# =============================================================================
+# КЕШ
+# =============================================================================
+class CacheFragment:
+    """Фрагменты {(вид, id): JSON} с обратным индексом строка → фрагменты.
+
+    Поколение растёт с каждым сбросом. Фрагмент, построенный по данным,
+    прочитанным до сброса одной из его строк, в кеш не кладётся.
+    count_change — транзакции с изменениями, ещё не сбросившие фрагменты:
+    после коммита новая версия уже видна, а фрагменты ещё прежние.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dict_fragment: dict = {}  # {(kind, id): (content, set_entity)}
+        self.dict_dependent: dict = {}  # {(table_name, id): {(kind, id)}}
+        # Поколение последнего сброса строки и таблицы целиком (массовые update/delete);
+        # растёт с числом изменённых строк, как и журнал change_log
+        self.dict_entity_generation: dict = {}
+        self.dict_table_generation: dict = {}
+        self.generation = 0
+        self.count_change = 0
+        self.hit = 0
+        self.miss = 0
+
+    def get_generation(self) -> int:
+        """Поколение; берётся до чтения данных, из которых строятся фрагменты"""
+        with self.lock:
+            return self.generation
+
+    def is_stable(self, generation: int) -> bool:
+        """Нет несброшенных изменений и сбросов после generation: собранное можно кешировать"""
+        with self.lock:
+            return self.count_change == 0 and self.generation == generation
+
+    def begin_change(self):
+        with self.lock:
+            self.count_change += 1
+
+    def end_change(self):
+        with self.lock:
+            self.count_change -= 1
+
+    def get(self, kind: str, list_id) -> dict:
+        """{id: JSON} найденных фрагментов"""
+        dict_content = {}
+        with self.lock:
+            for row_id in list_id:
+                item = self.dict_fragment.get((kind, row_id))
+                if item is not None:
+                    dict_content[row_id] = item[0]
+            self.hit += len(dict_content)
+            self.miss += len(set(list_id)) - len(dict_content)
+        return dict_content
+
+    def put(self, kind: str, row_id: int, content: bytes, set_entity: set, generation: int):
+        """Сохранить фрагмент, если его строки не сбрасывались после generation"""
+        with self.lock:
+            for entity in set_entity:
+                if (self.dict_entity_generation.get(entity, 0) > generation
+                        or self.dict_table_generation.get(entity[0], 0) > generation):
+                    return
+            key = (kind, row_id)
+            self.remove(key)
+            self.dict_fragment[key] = (content, set_entity)
+            for entity in set_entity:
+                self.dict_dependent.setdefault(entity, set()).add(key)
+
+    def remove(self, key: tuple):
+        """Удалить фрагмент и его записи в обратном индексе (под lock)"""
+        _, set_entity = self.dict_fragment.pop(key, (None, ()))
+        for entity in set_entity:
+            set_key = self.dict_dependent.get(entity)
+            if set_key is not None:
+                set_key.discard(key)
+                if not set_key:
+                    del self.dict_dependent[entity]
+
+    def invalidate(self, set_entity: set, set_table: set = frozenset()):
+        """Сбросить фрагменты, собранные из строк set_entity или таблиц set_table"""
+        with self.lock:
+            self.generation += 1
+            for entity in set_entity:
+                self.dict_entity_generation[entity] = self.generation
+                for key in list(self.dict_dependent.get(entity, ())):
+                    self.remove(key)
+            for table_name in set_table:
+                self.dict_table_generation[table_name] = self.generation
+                list_key = [
+                    key for key, (_, set_key_entity) in self.dict_fragment.items()
+                    if any(entity[0] == table_name for entity in set_key_entity)
+                ]
+                for key in list_key:
+                    self.remove(key)
+
+    def get_stat(self) -> dict:
+        """Счётчики попаданий и промахов по фрагментам"""
+        with self.lock:
+            return {"size": len(self.dict_fragment), "generation": self.generation,
+                    "change": self.count_change, "hit": self.hit, "miss": self.miss}
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.dict_fragment.clear()
+            self.dict_dependent.clear()
+
+
+cache_fragment = CacheFragment()
+
+
+# =============================================================================
+# СБРОС ПО СОБЫТИЯМ МАППЕРА
+# =============================================================================
+def get_changed(session: Session) -> dict:
+    """Изменения транзакции: {"entity": {(table_name, id)}, "table": {table_name}}"""
+    changed = session.info.get(SESSION_KEY)
+    if changed is None:
+        cache_fragment.begin_change()
+        changed = session.info[SESSION_KEY] = {"entity": set(), "table": set()}
+    return changed
+
+
+def on_change(mapper, connection, target):
+    """Запомнить строку и её прямых родителей (в том числе прежних при переносе)"""
+    session = Session.object_session(target)
+    if session is None:
+        return
+    table_name = mapper.local_table.name
+    set_entity = get_changed(session)["entity"]
+    set_entity.add((table_name, mapper.primary_key_from_instance(target)[0]))
+    state = target._sa_instance_state
+    for column_name, parent_table in DICT_PARENT.get(table_name, {}).items():
+        list_value = [getattr(target, column_name, None)]
+        list_value.extend(state.attrs[column_name].history.deleted or [])
+        for value in list_value:
+            if value is not None:
+                set_entity.add((parent_table, value))
+
+
+for name_event in ("after_insert", "after_update", "after_delete"):
+    event.listen(Base, name_event, on_change, propagate=True)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def on_bulk_change(orm_execute_state):
+    """Массовые query.update()/delete() сбрасывают таблицу целиком"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        get_changed(orm_execute_state.session)["table"].add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def on_commit(session: Session):
+    changed = session.info.pop(SESSION_KEY, None)
+    if changed is not None:
+        cache_fragment.invalidate(changed["entity"], changed["table"])
+        cache_fragment.end_change()
+
+
+@event.listens_for(Session, "after_rollback")
+def on_rollback(session: Session):
+    if session.info.pop(SESSION_KEY, None) is not None:
+        cache_fragment.end_change()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def on_transaction_end(session: Session, transaction):
+    """close() без коммита откатывает транзакцию без after_rollback"""
+    if transaction.parent is None:
+        on_rollback(session)
+
+
+# =============================================================================
+# СБОРКА СПИСКОВ
+# =============================================================================
+def dump_profiletool(db: Session, set_id: set, generation: int) -> dict:
+    """{id: JSON} инструментов; недостающие загружаются одним запросом с вложенными данными"""
+    dict_content = cache_fragment.get("profiletool", set_id)
+    set_missing = set_id - dict_content.keys()
+    if set_missing:
+        list_profiletool = query_schema(db, ModelProfileTool, SchemaProfileToolResponse).filter(
+            ModelProfileTool.id.in_(set_missing)
+        )
+        for profiletool in list_profiletool:
+            content, set_entity = build_fragment(profiletool, SchemaProfileToolResponse)
+            cache_fragment.put("profiletool", profiletool.id, content, set_entity, generation)
+            dict_content[profiletool.id] = content
+    return dict_content
+
+
+def dump_profiletool_list(db: Session, list_profiletool: list, generation: int) -> bytes:
+    """JSON списка инструментов из фрагментов.
+
+    Строки, удалённые между чтением страницы и загрузкой фрагментов, пропускаются.
+    """
+    dict_content = dump_profiletool(db, {profiletool.id for profiletool in list_profiletool}, generation)
+    return b"[" + b",".join(
+        dict_content[profiletool.id] for profiletool in list_profiletool if profiletool.id in dict_content
+    ) + b"]"
+
+
+def dump_task_component(db: Session, set_id: set, generation: int) -> dict:
+    """{id: JSON} компонентов задач; недостающие загружаются одним запросом с вложенными данными"""
+    dict_content = cache_fragment.get("task_component", set_id)
+    set_missing = set_id - dict_content.keys()
+    if set_missing:
+        list_component = query_schema(db, ModelTaskComponent, SchemaTaskComponentResponse).filter(
+            ModelTaskComponent.id.in_(set_missing)
+        )
+        for component in list_component:
+            content, set_entity = build_fragment(component, SchemaTaskComponentResponse)
+            cache_fragment.put("task_component", component.id, content, set_entity, generation)
+            dict_content[component.id] = content
+    return dict_content
+
+
+def dump_task_list(db: Session, list_task: list, generation: int) -> bytes:
+    """JSON списка задач: заголовок задачи + фрагмент инструмента + фрагменты компонентов.
+
+    list_task — строки задач без загрузки связей, прочитанные после get_generation().
+    Запросы идут без общего снимка: задачи и компоненты, удалённые после чтения
+    страницы, пропускаются (тело с ними не кешируется — поколение уже другое).
+    """
+    list_id = [task.id for task in list_task]
+    dict_head = cache_fragment.get("task", list_id)
+    list_missing = [task.id for task in list_task if task.id not in dict_head]
+    if list_missing:
+        list_task_missing = query_schema(db, ModelTask, SchemaTaskResponse, SET_FIELD_TASK_JOINED).filter(
+            ModelTask.id.in_(list_missing)
+        )
+        for task in list_task_missing:
+            content, set_entity = build_fragment(task, SchemaTaskResponse, SET_FIELD_TASK_JOINED)
+            cache_fragment.put("task", task.id, content, set_entity, generation)
+            dict_head[task.id] = content
+
+    dict_profiletool = dump_profiletool(
+        db, {task.profiletool_id for task in list_task if task.profiletool_id is not None}, generation
+    )
+    dict_component_id = {task_id: [] for task_id in list_id}
+    if list_id:
+        list_row = db.query(ModelTaskComponent.id, ModelTaskComponent.task_id).filter(
+            ModelTaskComponent.task_id.in_(list_id)
+        ).order_by(ModelTaskComponent.id)
+        for component_id, task_id in list_row:
+            dict_component_id[task_id].append(component_id)
+    dict_component = dump_task_component(
+        db, {component_id for list_component_id in dict_component_id.values() for component_id in list_component_id},
+        generation
+    )
+
+    list_content = []
+    for task in list_task:
+        if task.id not in dict_head:
+            continue
+        profiletool = dict_profiletool.get(task.profiletool_id, b"null")
+        component = b",".join(
+            dict_component[component_id] for component_id in dict_component_id[task.id] if component_id in dict_component
+        )
+        list_content.append(
+            dict_head[task.id][:-1] + b',"profiletool":' + profiletool + b',"component":[' + component + b"]}"
+        )
+    return b"[" + b",".join(list_content) + b"]"
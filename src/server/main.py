@@ -2,11 +2,18 @@
 ADITIM Monitor Server - FastAPI application for task management
 """
 
+import os
+import time
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI, WebSocket, HTTPException
+from fastapi.datastructures import Default
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # === ВАЖНО: Импортируем manager ДО объявления app ===
-from .events import manager
+from .events import manager, MiddlewareEventBuffer
 
 # Подключаем роутеры (все импорты после создания app)
 from .api.task import router as tasks_router
@@ -17,13 +24,45 @@ from .api.profiletool import router as profiletool_router
 from .api.plan import router as plan_router
 from .api.task_component_stage import router as task_component_stage_router
 from .api.blank import router as blank_router
+from .api.sync import router as sync_router
+from .api.report import router as report_router
+from .api.operator import router as operator_router
+from .api.bootstrap import router as bootstrap_router
+from .database import SessionLocal
+from .directory_cache import cache_directory
+from .cache import DICT_CACHE
+from .fragment_cache import cache_fragment
+from .encoding import ResponseORJSON, MiddlewareEncoding
+from .record import MiddlewareRecord
+
+
+def load_directory():
+    """Загрузить кеш справочников при старте"""
+    db = SessionLocal()
+    try:
+        cache_directory.get(db)
+    except Exception as e:
+        # Без кеша справочники загрузятся при первом запросе
+        print(f"❌ Не удалось загрузить справочники: {e}")
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(load_directory)
+    yield
+
 
 app = FastAPI(
     title="ADITIM Monitor API",
     description="Task management system for metalworking workshop",
     version="1.0.0",
     redirect_slashes=False,
-    debug=True
+    debug=True,
+    lifespan=lifespan,
+    # Default: роуты с response_model остаются на сериализации pydantic в байты
+    default_response_class=Default(ResponseORJSON)
 )
 
 # CORS
@@ -33,8 +72,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Буфер событий: одна рассылка на запрос, только после коммита
+app.add_middleware(MiddlewareEventBuffer)
+
+# Сжатие и MessagePack — внешний слой, кодирует уже готовый ответ
+app.add_middleware(MiddlewareEncoding)
+
+# Запись трафика для replay.py — самый внешний слой: время и размер, как у клиента
+if os.getenv("ADITIM_RECORD"):
+    app.add_middleware(MiddlewareRecord, path=os.getenv("ADITIM_RECORD"))
+
 
 
 app.include_router(tasks_router)
@@ -45,6 +95,10 @@ app.include_router(profiletool_router)
 app.include_router(plan_router)
 app.include_router(task_component_stage_router)
 app.include_router(blank_router)
+app.include_router(sync_router)
+app.include_router(report_router)
+app.include_router(operator_router)
+app.include_router(bootstrap_router)
 
 # === Вебсокет эндпоинт ===
 @app.websocket("/ws/updates")
@@ -56,8 +110,8 @@ async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
     try:
         while True:
-            # Можно принимать пинг или команды (не обязательно)
-            await websocket.receive_text()
+            # Ответы клиента на ping продлевают жизнь соединения
+            manager.receive(websocket, await websocket.receive_text())
     except Exception as e:
         pass
     finally:
@@ -72,4 +126,37 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "service": "ADITIM Monitor API"}
\ No newline at end of file
+    return {"status": "healthy", "service": "ADITIM Monitor API"}
+
+
+@app.get("/health/ws")
+async def health_websocket():
+    """Счётчики рассылки вебсокета: соединения, глубина очередей, отброшенные события.
+
+    async — соединения и очереди менеджера читаются в цикле событий, где их меняют.
+    """
+    return manager.get_stat()
+
+
+@app.get("/health/cache")
+def health_cache():
+    """Счётчики кешей ответов: попадания, промахи, ожидания построения"""
+    dict_stat = {name: cache.get_stat() for name, cache in DICT_CACHE.items()}
+    dict_stat["fragment"] = cache_fragment.get_stat()
+    return dict_stat
+
+
+@app.get("/health/threadpool")
+async def health_threadpool():
+    """Пул потоков синхронных роутеров и процессорное время сервера.
+
+    async — отвечает из цикла событий и тогда, когда все потоки пула заняты.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return {
+        "total": limiter.total_tokens,
+        "borrowed": limiter.borrowed_tokens,
+        "waiting": limiter.statistics().tasks_waiting,
+        "cpu_s": time.process_time(),
+        "time_s": time.monotonic(),
+    }
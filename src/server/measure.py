@@ -0,0 +1,73 @@
+"""Замеры запросов к API: счётчик SQL-запросов, сброс кешей, перцентили.
+
+Общие для тестов числа запросов (tests/) и замеров (benchmark_api).
+"""
+import time
+
+from sqlalchemy import event
+
+from .api import sync
+from .cache import DICT_CACHE
+from .directory_cache import cache_directory
+from .etag import version_table
+from .fragment_cache import cache_fragment
+
+
+class CounterQuery:
+    """SQL-запросы движка внутри with: число, суммарное время, тексты"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.list_statement = []  # (SQL, секунды)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self.before_execute)
+        event.listen(self.engine, "after_cursor_execute", self.after_execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self.before_execute)
+        event.remove(self.engine, "after_cursor_execute", self.after_execute)
+
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.list_statement.append((statement, time.perf_counter() - conn.info["query_start"].pop()))
+
+    @property
+    def count(self) -> int:
+        return len(self.list_statement)
+
+    @property
+    def elapsed(self) -> float:
+        """Суммарное время SQL, секунды"""
+        return sum(elapsed for _, elapsed in self.list_statement)
+
+    def format(self) -> str:
+        """Запросы для сообщения об ошибке"""
+        return "\n".join(
+            f"{elapsed * 1000:7.2f} мс  {' '.join(statement.split())[:160]}" for statement, elapsed in self.list_statement
+        )
+
+
+def clear_cache():
+    """Сбросить кеши процесса и цепочку версий событий (база могла смениться)"""
+    cache_directory.invalidate()
+    cache_fragment.clear()
+    version_table.clear()
+    for cache in DICT_CACHE.values():
+        cache.clear()
+    sync.version_event = None
+
+
+def percentile(list_value: list, rank: float) -> float:
+    """Перцентиль rank (0–100) с линейной интерполяцией между соседними значениями"""
+    list_sorted = sorted(list_value)
+    if not list_sorted:
+        return 0.0
+    position = (len(list_sorted) - 1) * rank / 100
+    index = int(position)
+    if index + 1 >= len(list_sorted):
+        return list_sorted[-1]
+    return list_sorted[index] + (list_sorted[index + 1] - list_sorted[index]) * (position - index)
@@ -0,0 +1,10 @@
+-- Журнал изменений для дельта-синхронизации клиентов (GET /api/sync)
+-- Применяется вручную: sqlite3 aditim-db.db < src/server/migration/001_change_log.sql
+CREATE TABLE IF NOT EXISTS change_log (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name VARCHAR(100) NOT NULL,
+    row_id INTEGER,
+    action VARCHAR(20) NOT NULL,
+    created_at DATETIME DEFAULT (CURRENT_TIMESTAMP)
+);
+CREATE INDEX IF NOT EXISTS ix_change_log_table_name ON change_log (table_name);
@@ -0,0 +1,43 @@
+"""Колонка profile.sketch_hash (SHA-256 эскиза) и её заполнение для существующих профилей.
+
+Применяется вручную: python src/server/migration/002_profile_sketch_hash.py aditim-db.db
+"""
+import base64
+import binascii
+import hashlib
+import sqlite3
+import sys
+
+
+def main(path_db: str):
+    connection = sqlite3.connect(path_db)
+    try:
+        list_column = [row[1] for row in connection.execute("PRAGMA table_info(profile)")]
+        if "sketch_hash" not in list_column:
+            connection.execute("ALTER TABLE profile ADD COLUMN sketch_hash VARCHAR(64)")
+
+        count = 0
+        list_row = connection.execute(
+            "SELECT id, sketch FROM profile WHERE sketch IS NOT NULL AND sketch != '' AND sketch_hash IS NULL"
+        ).fetchall()
+        for profile_id, sketch in list_row:
+            if "," in sketch:
+                sketch = sketch.split(",", 1)[1]
+            try:
+                image_data = base64.b64decode(sketch, validate=True)
+            except (binascii.Error, ValueError):
+                print(f"⚠️ Профиль {profile_id}: эскиз не является Base64, пропущен")
+                continue
+            connection.execute(
+                "UPDATE profile SET sketch = ?, sketch_hash = ? WHERE id = ?",
+                (base64.b64encode(image_data).decode("ascii"), hashlib.sha256(image_data).hexdigest(), profile_id)
+            )
+            count += 1
+        connection.commit()
+        print(f"✅ sketch_hash заполнен для {count} профилей")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db")
@@ -0,0 +1,45 @@
+"""Перенос эскизов из колонки profile.sketch в хранилище на диске (src/server/sketch_store.py).
+
+Эскиз и миниатюры сохраняются в ADITIM_SKETCH_DIR, в профиле остаётся sketch_hash,
+колонка sketch очищается. После переноса база сжимается (VACUUM).
+Требует миграции 002. Применяется вручную из корня репозитория:
+    python -m src.server.migration.003_sketch_blob_store aditim-db.db
+"""
+import base64
+import binascii
+import sqlite3
+import sys
+
+from ..sketch_store import save_sketch
+
+
+def main(path_db: str):
+    connection = sqlite3.connect(path_db)
+    try:
+        count = 0
+        list_row = connection.execute(
+            "SELECT id, sketch FROM profile WHERE sketch IS NOT NULL AND sketch != ''"
+        ).fetchall()
+        for profile_id, sketch in list_row:
+            if "," in sketch:
+                sketch = sketch.split(",", 1)[1]
+            try:
+                image_data = base64.b64decode(sketch, validate=True)
+            except (binascii.Error, ValueError):
+                print(f"⚠️ Профиль {profile_id}: эскиз не является Base64, пропущен")
+                continue
+            sketch_hash = save_sketch(image_data)
+            connection.execute(
+                "UPDATE profile SET sketch = NULL, sketch_hash = ? WHERE id = ?",
+                (sketch_hash, profile_id)
+            )
+            count += 1
+        connection.commit()
+        connection.execute("VACUUM")
+        print(f"✅ Перенесено эскизов: {count}")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db")
@@ -0,0 +1,3 @@
+-- Индекс для отчёта по загрузке станков (GET /api/report/machine)
+-- Применяется вручную: sqlite3 aditim-db.db < src/server/migration/004_stage_machine_start_index.sql
+CREATE INDEX IF NOT EXISTS ix_task_component_stage_machine_start ON task_component_stage (machine_id, start);
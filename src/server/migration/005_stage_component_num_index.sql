@@ -0,0 +1,3 @@
+-- Индекс для очереди оператора (GET /api/operator/stage)
+-- Применяется вручную: sqlite3 aditim-db.db < src/server/migration/005_stage_component_num_index.sql
+CREATE INDEX IF NOT EXISTS ix_task_component_stage_component_num ON task_component_stage (task_component_id, stage_num);
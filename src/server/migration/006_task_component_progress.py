@@ -0,0 +1,71 @@
+"""Текущий этап и счётчики этапов task_component, готовность task; заполнение по этапам.
+
+Применяется вручную: python src/server/migration/006_task_component_progress.py aditim-db.db
+"""
+import sqlite3
+import sys
+
+DICT_COLUMN = {
+    "task_component": {
+        "current_stage_id": "INTEGER",
+        "current_work_type_id": "INTEGER",
+        "current_machine_id": "INTEGER",
+        "stages_done": "INTEGER NOT NULL DEFAULT 0",
+        "stages_total": "INTEGER NOT NULL DEFAULT 0",
+    },
+    "task": {
+        "progress": "FLOAT",
+    },
+}
+
+# Текущий этап — первый незавершённый по (stage_num, id); 008 делит его на текущий и следующий
+SQL_COMPONENT = """
+UPDATE task_component SET
+    stages_total = (SELECT count(*) FROM task_component_stage s WHERE s.task_component_id = task_component.id),
+    stages_done = (SELECT count(*) FROM task_component_stage s
+                   WHERE s.task_component_id = task_component.id AND s.finish IS NOT NULL),
+    current_stage_id = (SELECT s.id FROM task_component_stage s
+                        WHERE s.task_component_id = task_component.id AND s.finish IS NULL
+                        ORDER BY coalesce(s.stage_num, 0), s.id LIMIT 1)
+"""
+
+SQL_COMPONENT_CURRENT = """
+UPDATE task_component SET
+    current_machine_id = (SELECT s.machine_id FROM task_component_stage s WHERE s.id = current_stage_id),
+    current_work_type_id = (SELECT w.work_type_id FROM task_component_stage s
+                            JOIN dir_work_subtype w ON w.id = s.work_subtype_id
+                            WHERE s.id = current_stage_id)
+"""
+
+SQL_TASK = """
+UPDATE task SET progress = (
+    SELECT CASE WHEN sum(c.stages_total) > 0
+                THEN round(sum(c.stages_done) * 100.0 / sum(c.stages_total), 1) END
+    FROM task_component c WHERE c.task_id = task.id
+)
+"""
+
+
+def main(path_db: str):
+    connection = sqlite3.connect(path_db)
+    try:
+        for table_name, dict_column in DICT_COLUMN.items():
+            list_column = [row[1] for row in connection.execute(f"PRAGMA table_info({table_name})")]
+            for column_name, column_type in dict_column.items():
+                if column_name not in list_column:
+                    connection.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_task_component_current_work_type_machine "
+            "ON task_component (current_work_type_id, current_machine_id)"
+        )
+        connection.execute(SQL_COMPONENT)
+        connection.execute(SQL_COMPONENT_CURRENT)
+        count = connection.execute(SQL_TASK).rowcount
+        connection.commit()
+        print(f"✅ Текущий этап и готовность заполнены для {count} задач")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db")
@@ -0,0 +1,43 @@
+"""Текущий статус компонента инструмента (последняя запись истории) и его заполнение.
+
+Применяется вручную: python src/server/migration/007_profiletool_component_current_status.py aditim-db.db
+"""
+import sqlite3
+import sys
+
+# Текущий статус — последняя по id запись истории компонента
+SQL_CURRENT_STATUS = """
+UPDATE profiletool_component SET
+    current_status_id = (SELECT h.status_id FROM profiletool_component_history h
+                         WHERE h.profiletool_component_id = profiletool_component.id
+                         ORDER BY h.id DESC LIMIT 1),
+    current_status_date = (SELECT h.date FROM profiletool_component_history h
+                           WHERE h.profiletool_component_id = profiletool_component.id
+                           ORDER BY h.id DESC LIMIT 1)
+"""
+
+
+def main(path_db: str):
+    connection = sqlite3.connect(path_db)
+    try:
+        list_column = [row[1] for row in connection.execute("PRAGMA table_info(profiletool_component)")]
+        if "current_status_id" not in list_column:
+            connection.execute(
+                "ALTER TABLE profiletool_component ADD COLUMN current_status_id INTEGER "
+                "REFERENCES dir_profiletool_component_status (id)"
+            )
+        if "current_status_date" not in list_column:
+            connection.execute("ALTER TABLE profiletool_component ADD COLUMN current_status_date DATE")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_profiletool_component_history_component "
+            "ON profiletool_component_history (profiletool_component_id, id)"
+        )
+        count = connection.execute(SQL_CURRENT_STATUS).rowcount
+        connection.commit()
+        print(f"✅ Текущий статус заполнен для {count} компонентов")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db")
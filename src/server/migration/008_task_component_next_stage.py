@@ -0,0 +1,62 @@
+"""Следующий этап task_component (очередь оператора) отдельно от текущего (окно задач).
+
+Станок и тип работ из 006 описывают следующий этап и переименовываются;
+текущий этап пересчитывается по правилу окна задач (progress.get_current_stage).
+Применяется вручную после 006: python src/server/migration/008_task_component_next_stage.py aditim-db.db
+"""
+import sqlite3
+import sys
+
+DICT_RENAME = {
+    "current_work_type_id": "next_work_type_id",
+    "current_machine_id": "next_machine_id",
+}
+
+# Следующий этап — первый незавершённый по (stage_num, id), как прежний текущий
+SQL_NEXT_STAGE = """
+UPDATE task_component SET
+    next_stage_id = (SELECT s.id FROM task_component_stage s
+                     WHERE s.task_component_id = task_component.id AND s.finish IS NULL
+                     ORDER BY coalesce(s.stage_num, 0), s.id LIMIT 1)
+"""
+
+# Текущий этап — последний начатый, если он не завершён, иначе первый незавершённый
+SQL_CURRENT_STAGE = """
+UPDATE task_component SET current_stage_id = coalesce(
+    (SELECT s.id FROM task_component_stage s
+     WHERE s.task_component_id = task_component.id AND s.finish IS NULL AND s.id = (
+         SELECT l.id FROM task_component_stage l
+         WHERE l.task_component_id = task_component.id AND l.start IS NOT NULL
+         ORDER BY coalesce(l.stage_num, 0) DESC, l.id DESC LIMIT 1
+     )),
+    (SELECT s.id FROM task_component_stage s
+     WHERE s.task_component_id = task_component.id AND (s.start IS NULL OR s.finish IS NULL)
+     ORDER BY coalesce(s.stage_num, 0), s.id LIMIT 1)
+)
+"""
+
+
+def main(path_db: str):
+    connection = sqlite3.connect(path_db)
+    try:
+        list_column = [row[1] for row in connection.execute("PRAGMA table_info(task_component)")]
+        for column_name, column_name_new in DICT_RENAME.items():
+            if column_name in list_column and column_name_new not in list_column:
+                connection.execute(f"ALTER TABLE task_component RENAME COLUMN {column_name} TO {column_name_new}")
+        if "next_stage_id" not in list_column:
+            connection.execute("ALTER TABLE task_component ADD COLUMN next_stage_id INTEGER")
+        connection.execute("DROP INDEX IF EXISTS ix_task_component_current_work_type_machine")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_task_component_next_work_type_machine "
+            "ON task_component (next_work_type_id, next_machine_id)"
+        )
+        connection.execute(SQL_NEXT_STAGE)
+        count = connection.execute(SQL_CURRENT_STAGE).rowcount
+        connection.commit()
+        print(f"✅ Текущий и следующий этап заполнены для {count} компонентов")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db")
@@ -0,0 +1,36 @@
+"""Текущий статус разработки компонента инструмента (последняя запись истории со статусом
+разработки) и его заполнение; статусы изготовления его не меняют.
+
+Применяется вручную: python src/server/migration/009_profiletool_component_development_status.py aditim-db.db
+"""
+import sqlite3
+import sys
+
+# Статусы разработки, как SET_STATUS_ID_DEVELOPMENT в models/profiletool.py
+SQL_DEVELOPMENT_STATUS = """
+UPDATE profiletool_component SET
+    current_development_status_id = (SELECT h.status_id FROM profiletool_component_history h
+                                     WHERE h.profiletool_component_id = profiletool_component.id
+                                       AND h.status_id IN (1, 2, 3)
+                                     ORDER BY h.id DESC LIMIT 1)
+"""
+
+
+def main(path_db: str):
+    connection = sqlite3.connect(path_db)
+    try:
+        list_column = [row[1] for row in connection.execute("PRAGMA table_info(profiletool_component)")]
+        if "current_development_status_id" not in list_column:
+            connection.execute(
+                "ALTER TABLE profiletool_component ADD COLUMN current_development_status_id INTEGER "
+                "REFERENCES dir_profiletool_component_status (id)"
+            )
+        count = connection.execute(SQL_DEVELOPMENT_STATUS).rowcount
+        connection.commit()
+        print(f"✅ Статус разработки заполнен для {count} компонентов")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "aditim-db.db")
@@ -0,0 +1,151 @@
+"""Журнал изменений данных для дельта-синхронизации клиентов"""
+from sqlalchemy import Column, Integer, String, DateTime, event, inspect, select, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ModelChangeLog(Base):
+    """Журнал изменений: одна запись на изменённую строку любой таблицы.
+
+    version монотонно растёт и служит версией данных сервера.
+    row_id = None означает, что изменена вся таблица (массовый UPDATE/DELETE).
+    """
+    __tablename__ = "change_log"
+    __table_args__ = {"sqlite_autoincrement": True}  # версии не переиспользуются
+
+    version = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(100), nullable=False, index=True)
+    row_id = Column(Integer, nullable=True)
+    action = Column(String(20), nullable=False)  # created / updated / deleted
+    created_at = Column(DateTime, server_default=func.now())
+
+
+# Связи "дочерняя таблица → родительская": изменение дочерней строки
+# меняет вложенный документ родителя, поэтому родитель тоже попадает в журнал
+DICT_PARENT = {
+    "task_component_stage": {"task_component_id": "task_component"},
+    "task_component": {"task_id": "task"},
+    "profiletool_component_history": {"profiletool_component_id": "profiletool_component"},
+    "profiletool_component": {"profiletool_id": "profiletool"},
+    "profiletool": {"profile_id": "profile"},
+    "product_component": {"product_id": "product"},
+    "blank": {"profiletool_component_id": "profiletool_component",
+              "product_component_id": "product_component"},
+}
+
+SESSION_KEY = "change_log"
+
+
+def get_pending(session: Session) -> dict:
+    """Изменения текущего flush: {(table_name, row_id): action}"""
+    return session.info.setdefault(SESSION_KEY, {})
+
+
+def add_pending(session: Session, table_name: str, row_id, action: str):
+    """Добавить изменение; created/deleted важнее updated"""
+    dict_pending = get_pending(session)
+    key = (table_name, row_id)
+    if dict_pending.get(key) in ("created", "deleted") and action == "updated":
+        return
+    dict_pending[key] = action
+
+
+def add_parent(session: Session, target, table_name: str):
+    """Пометить родителей строки как изменённые (текущих и прежних)"""
+    state = inspect(target)
+    for column_name, parent_table in DICT_PARENT.get(table_name, {}).items():
+        list_value = [getattr(target, column_name)]
+        if column_name in state.attrs:
+            list_value.extend(state.attrs[column_name].history.deleted or [])
+        for value in list_value:
+            if value is not None:
+                add_pending(session, parent_table, value, "updated")
+
+
+def on_change(action: str):
+    """Фабрика обработчиков after_insert / after_update / after_delete"""
+    def listener(mapper, connection, target):
+        table_name = mapper.local_table.name
+        if table_name == ModelChangeLog.__tablename__:
+            return
+        session = Session.object_session(target)
+        if session is None:
+            return
+        if action == "updated" and not session.is_modified(target, include_collections=False):
+            return
+        add_pending(session, table_name, mapper.primary_key_from_instance(target)[0], action)
+        add_parent(session, target, table_name)
+    return listener
+
+
+event.listen(Base, "after_insert", on_change("created"), propagate=True)
+event.listen(Base, "after_update", on_change("updated"), propagate=True)
+event.listen(Base, "after_delete", on_change("deleted"), propagate=True)
+
+
+def resolve_parent(session: Session, dict_pending: dict):
+    """Дописать в журнал предков родителей (например, этап → компонент → задача)"""
+    table_metadata = Base.metadata.tables
+    dict_checked = {}
+    while True:
+        dict_unresolved = {}
+        for (table_name, row_id), action in dict_pending.items():
+            if row_id is None or action == "deleted" or table_name not in DICT_PARENT:
+                continue
+            if row_id in dict_checked.setdefault(table_name, set()):
+                continue
+            dict_checked[table_name].add(row_id)
+            dict_unresolved.setdefault(table_name, set()).add(row_id)
+        if not dict_unresolved:
+            return
+        for table_name, set_row_id in dict_unresolved.items():
+            table = table_metadata[table_name]
+            list_column = [table.c[name] for name in DICT_PARENT[table_name]]
+            query = select(*list_column).where(table.c.id.in_(set_row_id))
+            for row in session.connection().execute(query):
+                for column_name, value in zip(DICT_PARENT[table_name], row):
+                    if value is not None:
+                        parent_table = DICT_PARENT[table_name][column_name]
+                        if (parent_table, value) not in dict_pending:
+                            dict_pending[(parent_table, value)] = "updated"
+
+
+@event.listens_for(Session, "after_flush")
+def write_change_log(session: Session, flush_context):
+    """Записать накопленные за flush изменения в журнал одной вставкой"""
+    dict_pending = session.info.pop(SESSION_KEY, None)
+    if not dict_pending:
+        return
+    resolve_parent(session, dict_pending)
+    session.connection().execute(
+        insert(ModelChangeLog.__table__),
+        [
+            {"table_name": table_name, "row_id": row_id, "action": action}
+            for (table_name, row_id), action in dict_pending.items()
+        ]
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def log_bulk_change(orm_execute_state):
+    """Массовые query.update()/delete() не вызывают событий маппера —
+    помечаем всю таблицу изменённой"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    orm_execute_state.session.connection().execute(
+        insert(ModelChangeLog.__table__).values(
+            table_name=mapper.local_table.name,
+            row_id=None,
+            action="deleted" if orm_execute_state.is_delete else "updated"
+        )
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def discard_change_log(session: Session):
+    """Отбросить незаписанные изменения при откате"""
+    session.info.pop(SESSION_KEY, None)
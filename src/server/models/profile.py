@@ -1,7 +1,7 @@
 """Profile models for ADITIM Monitor"""
 
 from sqlalchemy import Column, Integer, String, LargeBinary, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from ..database import Base
 
 class ModelProfile(Base):
@@ -11,6 +11,8 @@ class ModelProfile(Base):
     id = Column(Integer, primary_key=True, index=True)
     article = Column(String, nullable=False, unique=True)
     description = Column(String, nullable=True)
-    sketch = Column(Text)  # ← хранить как строку (Base64)
+    # Base64 эскиза до переноса в хранилище на диске (миграция 003), новые эскизы сюда не пишутся
+    sketch = deferred(Column(Text))
+    sketch_hash = Column(String(64), nullable=True)  # SHA-256 байтов эскиза: имя файла в хранилище и ETag
     # Связи
     profiletool = relationship("ModelProfileTool", back_populates="profile", cascade="all, delete")
@@ -1,8 +1,12 @@
 """Модели для инструментов профилей"""
-from sqlalchemy import Column, Integer, Text, ForeignKey, Date
+from sqlalchemy import Column, Integer, Text, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
+# Статусы разработки компонента: 1 - Новая, 2 - В разработке, 3 - Разработан;
+# остальные относятся к изготовлению и испытаниям
+SET_STATUS_ID_DEVELOPMENT = frozenset({1, 2, 3})
+
 class ModelProfileTool(Base):
     """Инструмент для изготовления профиля"""
     __tablename__ = "profiletool"
@@ -29,17 +33,31 @@ class ModelProfileToolComponent(Base):
     type_id = Column(Integer, ForeignKey("dir_profiletool_component_type.id"), nullable=False)
     variant = Column(Integer, nullable=True)
     description = Column(Text)
+
+    # Текущий статус — последняя запись истории; обновляется при её создании
+    current_status_id = Column(Integer, ForeignKey("dir_profiletool_component_status.id"), nullable=True)
+    current_status_date = Column(Date, nullable=True)
+    # Текущий статус разработки — последняя запись истории из SET_STATUS_ID_DEVELOPMENT
+    current_development_status_id = Column(Integer, ForeignKey("dir_profiletool_component_status.id"), nullable=True)
     
     # Связи
     profiletool = relationship("ModelProfileTool", back_populates="component")
     type = relationship("ModelDirProfileToolComponentType", back_populates="component")
     task_component = relationship("ModelTaskComponent", back_populates="profiletool_component")
     history = relationship("ModelProfileToolComponentHistory", back_populates="component", cascade="all, delete-orphan")
+    current_status = relationship("ModelDirProfileToolComponentStatus", foreign_keys=[current_status_id])
+    current_development_status = relationship(
+        "ModelDirProfileToolComponentStatus", foreign_keys=[current_development_status_id]
+    )
     blank = relationship("ModelBlank", back_populates="profiletool_component")
 
 class ModelProfileToolComponentHistory(Base):
     """История изменений компонента инструмента для профиля"""
     __tablename__ = "profiletool_component_history"
+    __table_args__ = (
+        # История компонента выдаётся постранично по id
+        Index("ix_profiletool_component_history_component", "profiletool_component_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     profiletool_component_id = Column(Integer, ForeignKey("profiletool_component.id", ondelete="CASCADE"), nullable=False)
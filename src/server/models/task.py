@@ -1,6 +1,6 @@
 """Task models for ADITIM Monitor"""
 
-from sqlalchemy import Column, Integer, ForeignKey, Text, Date
+from sqlalchemy import Column, Integer, Float, ForeignKey, Text, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -21,6 +21,9 @@ class ModelTask(Base):
 
     description = Column(Text, nullable=True)
 
+    # Готовность задачи, % завершённых этапов всех компонентов (см. progress.py)
+    progress = Column(Float, nullable=True)
+
     # Relationships
     product = relationship("ModelProduct", back_populates="task")
     profiletool = relationship("ModelProfileTool", back_populates="task")
@@ -28,9 +31,23 @@ class ModelTask(Base):
     type = relationship("ModelDirTaskType", back_populates="task")
     component = relationship("ModelTaskComponent", back_populates="task", cascade="all, delete-orphan")
 
+    @property
+    def display_name(self) -> str:
+        """Название задачи для таблиц: артикул профиля инструмента или имя изделия"""
+        if self.profiletool_id is not None:
+            profile = self.profiletool.profile if self.profiletool else None
+            return f"Инструмент {profile.article}" if profile else "Инструмент N/A"
+        if self.product_id is not None:
+            return f"Изделие {self.product.name}" if self.product else "Изделие N/A"
+        return "Задача N/A"
+
 class ModelTaskComponent(Base):
     """Компонент задачи - связь между задачей и конкретными компонентами"""
     __tablename__ = "task_component"
+    __table_args__ = (
+        # "Что дальше" для типа работ и станка — поиск по индексу, без обхода этапов
+        Index("ix_task_component_next_work_type_machine", "next_work_type_id", "next_machine_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -40,6 +57,16 @@ class ModelTaskComponent(Base):
 
     description = Column(Text, nullable=True)
 
+    # Текущий этап (окно задач), следующий этап (первый незавершённый, очередь
+    # оператора) и счётчики этапов. Пересчитываются в той же транзакции,
+    # что и изменение этапов (см. progress.py). Без FK: иначе у связей компонент↔этап два пути
+    current_stage_id = Column(Integer, nullable=True)
+    next_stage_id = Column(Integer, nullable=True)
+    next_work_type_id = Column(Integer, nullable=True)
+    next_machine_id = Column(Integer, nullable=True)
+    stages_done = Column(Integer, nullable=False, default=0, server_default="0")
+    stages_total = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Relationships
     task = relationship("ModelTask", back_populates="component")
     profiletool_component = relationship("ModelProfileToolComponent", back_populates="task_component")
@@ -48,6 +75,12 @@ class ModelTaskComponent(Base):
 
 class ModelTaskComponentStage(Base):
     __tablename__ = "task_component_stage"
+    __table_args__ = (
+        # Отчёт по загрузке станков читает этапы по станку в порядке начала
+        Index("ix_task_component_stage_machine_start", "machine_id", "start"),
+        # Очередь оператора ищет первый незавершённый этап компонента по номеру
+        Index("ix_task_component_stage_component_num", "task_component_id", "stage_num"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     stage_num = Column(Integer, nullable=True)
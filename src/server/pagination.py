@@ -0,0 +1,128 @@
+"""Постраничная выдача списков по ключу (keyset), сортировка и фильтры.
+
+Страница задаётся limit и непрозрачным cursor, следующий курсор
+возвращается в заголовке X-Next-Cursor (тело ответа остаётся списком).
+Курсор хранит значение поля сортировки и id последней строки страницы,
+поэтому следующая страница выбирается по индексу без OFFSET и не
+сдвигается при вставке новых строк. Без limit возвращается весь список.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, or_
+
+HEADER_NEXT_CURSOR = "X-Next-Cursor"
+LIMIT_MAX = 1000
+
+
+class ParamPage:
+    """Параметры страницы (зависимость FastAPI): limit, cursor, sort"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=LIMIT_MAX, description="Размер страницы; без limit — весь список"),
+        cursor: Optional[str] = Query(None, description="Курсор из заголовка X-Next-Cursor предыдущей страницы"),
+        sort: Optional[str] = Query(None, description="Поле сортировки, '-' в начале — по убыванию"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
+
+
+def encode_cursor(sort: str, value, row_id: int) -> str:
+    """Курсор: сортировка, значение поля сортировки и id последней строки"""
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, row_id], separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, column) -> tuple:
+    """Разобрать курсор, проверив, что он выдан для той же сортировки"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_cursor, value, row_id = json.loads(raw)
+        if value is not None:
+            python_type = column.type.python_type
+            if python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+    except (binascii.Error, ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if sort_cursor != sort:
+        raise HTTPException(status_code=400, detail="Cursor does not match sort")
+    return value, row_id
+
+
+def condition_after(column, column_id, value, row_id: int, is_desc: bool):
+    """Условие "строка после курсора" для порядка (column IS NULL, column, id).
+
+    NULL в поле сортировки всегда идут в конце списка.
+    """
+    if value is None:
+        return and_(column.is_(None), column_id < row_id if is_desc else column_id > row_id)
+    if is_desc:
+        return or_(column.is_(None), column < value, and_(column == value, column_id < row_id))
+    return or_(column.is_(None), column > value, and_(column == value, column_id > row_id))
+
+
+def paginate(query, model, page: ParamPage, dict_sort: dict, default_sort: str, response: Response) -> list:
+    """Отсортировать запрос, применить курсор и лимит.
+
+    :param dict_sort: разрешённые поля сортировки {имя: колонка модели}
+    :param default_sort: сортировка без параметра sort, например "-order"
+    """
+    sort = page.sort or default_sort
+    name = sort.lstrip("-")
+    is_desc = sort.startswith("-")
+    if name not in dict_sort:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sort '{sort}', allowed: {', '.join(sorted(dict_sort))}"
+        )
+    column = dict_sort[name]
+    column_id = model.id
+
+    if page.cursor:
+        value, row_id = decode_cursor(page.cursor, sort, column)
+        query = query.filter(condition_after(column, column_id, value, row_id, is_desc))
+    query = query.order_by(
+        column.is_(None),
+        column.desc() if is_desc else column,
+        column_id.desc() if is_desc else column_id
+    )
+
+    if page.limit is None:
+        return query.all()
+    list_item = query.limit(page.limit + 1).all()
+    if len(list_item) > page.limit:
+        list_item = list_item[:page.limit]
+        last = list_item[-1]
+        response.headers[HEADER_NEXT_CURSOR] = encode_cursor(sort, getattr(last, column.key), last.id)
+    return list_item
+
+
+def filter_equal(query, dict_filter: dict):
+    """Фильтры на равенство {колонка: значение}; None — фильтр не задан"""
+    for column, value in dict_filter.items():
+        if value is not None:
+            query = query.filter(column == value)
+    return query
+
+
+def filter_range(query, column, value_from=None, value_to=None):
+    """Фильтр по диапазону [value_from, value_to], границы включительно"""
+    if value_from is not None:
+        query = query.filter(column >= value_from)
+    if value_to is not None:
+        query = query.filter(column <= value_to)
+    return query
+
+
+def filter_null(query, column, has_value: Optional[bool]):
+    """Фильтр по наличию значения (has_arrival и т.п.)"""
+    if has_value is None:
+        return query
+    return query.filter(column.isnot(None) if has_value else column.is_(None))
@@ -0,0 +1,70 @@
+"""Денормализованный текущий и следующий этап, готовность компонентов и задач.
+
+Этапы компонента упорядочены по (stage_num, id):
+- текущий этап (окно задач) — последний начатый, если он не завершён, иначе
+  первый незавершённый: этап, начатый не по порядку, показывается в работе;
+- следующий этап (очередь оператора) — первый незавершённый.
+Счётчики пересчитываются по этапам одного компонента (индекс task_component_id,
+stage_num) в той же транзакции, что и изменение этапа, поэтому "что дальше"
+читается из task_component без обхода этапов.
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models.task import ModelTask, ModelTaskComponent, ModelTaskComponentStage
+from .models.directory import ModelDirWorkSubtype
+
+
+def get_current_stage(list_stage: list):
+    """Текущий этап из этапов в порядке (stage_num, id); None — все завершены"""
+    last_started = next((row for row in reversed(list_stage) if row.start is not None), None)
+    if last_started is not None and last_started.finish is None:
+        return last_started
+    return next((row for row in list_stage if row.start is None or row.finish is None), None)
+
+
+def refresh_component(db: Session, component: ModelTaskComponent):
+    """Пересчитать текущий и следующий этап и счётчики компонента"""
+    stage = ModelTaskComponentStage
+    list_stage = db.query(
+        stage.id, stage.start, stage.finish, stage.machine_id, ModelDirWorkSubtype.work_type_id
+    ).outerjoin(
+        ModelDirWorkSubtype, stage.work_subtype_id == ModelDirWorkSubtype.id
+    ).filter(
+        stage.task_component_id == component.id
+    ).order_by(func.coalesce(stage.stage_num, 0), stage.id).all()
+
+    current = get_current_stage(list_stage)
+    next_stage = next((row for row in list_stage if row.finish is None), None)
+    component.stages_total = len(list_stage)
+    component.stages_done = sum(1 for row in list_stage if row.finish is not None)
+    component.current_stage_id = current.id if current else None
+    component.next_stage_id = next_stage.id if next_stage else None
+    component.next_machine_id = next_stage.machine_id if next_stage else None
+    component.next_work_type_id = next_stage.work_type_id if next_stage else None
+
+
+def refresh_task(db: Session, task_id: int):
+    """Пересчитать готовность задачи по счётчикам её компонентов"""
+    done, total = db.query(
+        func.coalesce(func.sum(ModelTaskComponent.stages_done), 0),
+        func.coalesce(func.sum(ModelTaskComponent.stages_total), 0)
+    ).filter(ModelTaskComponent.task_id == task_id).one()
+    task = db.get(ModelTask, task_id)
+    if task is not None:
+        task.progress = round(done / total * 100, 1) if total else None
+
+
+def refresh_progress(db: Session, component_id: int):
+    """Пересчитать компонент и его задачу после изменения этапов компонента.
+
+    Вызывается до commit: изменения этапов сбрасываются в базу, пересчёт
+    попадает в ту же транзакцию.
+    """
+    component = db.get(ModelTaskComponent, component_id)
+    if component is None:
+        return
+    db.flush()
+    refresh_component(db, component)
+    db.flush()
+    refresh_task(db, component.task_id)
@@ -0,0 +1,153 @@
+"""Запись трафика сервера для нагрузочных тестов (воспроизведение — replay.py).
+
+Включается переменной ADITIM_RECORD=путь к журналу. Журнал — JSON Lines,
+по строке на событие, ключи короткие:
+  t — секунды от начала записи, k — вид события:
+  http — запрос: m метод, p путь, q строка запроса, r шаблон маршрута,
+         h заголовки, влияющие на разбор и ответ (Content-Type, Accept, Accept-Encoding),
+         b тело (текст) или b64 (двоичное, base64), s код ответа,
+         n байты ответа, d длительность в мс;
+  ws_open / ws_close — соединение c вебсокета;
+  ws_send — сообщение сервера клиенту c: e событие, n байты;
+  ws_receive — сообщение клиента серверу c: n байты.
+Пинги вебсокета не пишутся. Тело больше SIZE_BODY_MAX не сохраняется (tb — размер),
+такие запросы replay пропускает.
+"""
+import base64
+import itertools
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import orjson
+
+SIZE_BODY_MAX = 1024 * 1024
+SET_HEADER_RECORD = {"accept", "accept-encoding", "content-type"}
+SET_TEXT_SKIP = {"pong", '{"event": "ping"}'}
+
+
+class RecorderTraffic:
+    """Журнал трафика: строки пишутся сразу, из цикла событий и из потоков"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.path.open("ab")
+        self.lock = threading.Lock()
+        self.time_start = time.monotonic()
+        self.write({"k": "start", "created": datetime.now().isoformat(timespec="seconds")})
+
+    def get_offset(self) -> float:
+        return round(time.monotonic() - self.time_start, 4)
+
+    def write(self, item: dict):
+        line = orjson.dumps({"t": self.get_offset(), **item}) + b"\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def encode_body(body: bytes) -> dict:
+    """Поля тела запроса в журнале: b — текст, b64 — двоичное, tb — размер несохранённого"""
+    if not body:
+        return {}
+    if len(body) > SIZE_BODY_MAX:
+        return {"tb": len(body)}
+    try:
+        return {"b": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(body).decode("ascii")}
+
+
+def get_event_name(text: str) -> Optional[str]:
+    try:
+        return orjson.loads(text).get("event")
+    except (orjson.JSONDecodeError, AttributeError):
+        return None
+
+
+class MiddlewareRecord:
+    """ASGI middleware: пишет HTTP-запросы и события вебсокета в журнал трафика.
+
+    Внешний слой: длительность и размер — те, что видит клиент (после сжатия).
+    """
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.recorder = RecorderTraffic(path)
+        self.counter_connection = itertools.count(1)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            await self.record_http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self.record_websocket(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def record_http(self, scope, receive, send):
+        time_start = time.perf_counter()
+        offset = self.recorder.get_offset()
+        list_body = []
+        state = {"status": 500, "size": 0}
+
+        async def receive_recorded():
+            message = await receive()
+            if message["type"] == "http.request":
+                list_body.append(message.get("body", b""))
+            return message
+
+        async def send_recorded(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_recorded, send_recorded)
+        finally:
+            route = scope.get("route")
+            dict_header = {
+                key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]
+                if key.decode("latin-1").lower() in SET_HEADER_RECORD
+            }
+            item = {
+                "t": offset, "k": "http", "m": scope["method"], "p": scope["path"],
+                "q": scope["query_string"].decode("latin-1"), "r": getattr(route, "path", None),
+                "h": dict_header, **encode_body(b"".join(list_body)),
+                "s": state["status"], "n": state["size"], "d": round((time.perf_counter() - time_start) * 1000, 3),
+            }
+            self.recorder.write({key: value for key, value in item.items() if value not in ("", None, {})})
+
+    async def record_websocket(self, scope, receive, send):
+        connection_id = next(self.counter_connection)
+        self.recorder.write({"k": "ws_open", "c": connection_id, "p": scope["path"]})
+
+        async def receive_recorded():
+            message = await receive()
+            if message["type"] == "websocket.receive":
+                text = message.get("text") or ""
+                if text not in SET_TEXT_SKIP:
+                    self.recorder.write({"k": "ws_receive", "c": connection_id, "n": len(text)})
+            return message
+
+        async def send_recorded(message):
+            if message["type"] == "websocket.send":
+                text = message.get("text") or ""
+                if text not in SET_TEXT_SKIP:
+                    self.recorder.write({
+                        "k": "ws_send", "c": connection_id, "e": get_event_name(text), "n": len(text)
+                    })
+            await send(message)
+
+        try:
+            await self.app(scope, receive_recorded, send_recorded)
+        finally:
+            self.recorder.write({"k": "ws_close", "c": connection_id})
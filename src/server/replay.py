@@ -0,0 +1,225 @@
+"""Воспроизведение журнала трафика (record.py) против локального сервера.
+
+Запросы уходят в записанные моменты, сжатые в speed раз (1×, 10×, 100×),
+не дожидаясь ответов предыдущих; соединения вебсокета открываются и
+закрываются в моменты записи и читают рассылки, как клиенты. Отчёт по
+каждой скорости — перцентили задержки по маршрутам (шаблон пути из
+журнала), коды ответов, отставание отправки от расписания (если растёт —
+не успевает сам воспроизводитель) и число полученных сообщений вебсокета.
+
+Изменения из журнала применяются к базе сервера: воспроизводить против
+копии базы, на которой шла запись; повторы скоростей идут по уже
+изменённым данным (удаления отвечают 404 — это видно в кодах).
+
+python -m src.server.replay traffic.jsonl --speed 1 10 100 --output replay.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import websockets
+
+from .measure import percentile
+
+LIMIT_CONNECTION = 200  # одновременных HTTP-соединений воспроизводителя
+TIMEOUT_WEBSOCKET_TAIL = 1.0  # сек после последнего ответа до закрытия оставшихся соединений
+
+
+def load_log(path: Path) -> list[dict]:
+    """События журнала по времени; запросы с несохранённым телом пропускаются.
+
+    Номера соединений вебсокета начинаются с 1 в каждой сессии записи:
+    c заменяется на (номер сессии, c).
+    """
+    list_item = []
+    count_skip = 0
+    index_session = 0
+    offset_session = 0.0  # журнал дописывается после перезапуска сервера: сессии идут друг за другом
+    offset_last = 0.0
+    with path.open("rb") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if item["k"] == "start":
+                index_session += 1
+                offset_session = offset_last
+                continue
+            item["t"] += offset_session
+            if "c" in item:
+                item["c"] = (index_session, item["c"])
+            offset_last = max(offset_last, item["t"])
+            if item["k"] == "http" and "tb" in item:
+                count_skip += 1
+                continue
+            if item["k"] in ("http", "ws_open", "ws_close"):
+                list_item.append(item)
+    if count_skip:
+        print(f"⚠️ Пропущено запросов с телом больше предела записи: {count_skip}", file=sys.stderr)
+    return sorted(list_item, key=lambda item: item["t"])
+
+
+def get_route(item: dict) -> str:
+    """Маршрут для группировки: шаблон из журнала, без него — путь с числами, заменёнными на {id}"""
+    path = item.get("r") or re.sub(r"/\d+(?=/|$)", "/{id}", item["p"])
+    return f"{item['m']} {path}"
+
+
+def get_body(item: dict) -> bytes:
+    if "b" in item:
+        return item["b"].encode("utf-8")
+    if "b64" in item:
+        return base64.b64decode(item["b64"])
+    return b""
+
+
+class Replay:
+    """Одно воспроизведение журнала со скоростью speed"""
+
+    def __init__(self, url: str, speed: float):
+        self.url = url.rstrip("/")
+        self.url_ws = re.sub(r"^http", "ws", self.url)
+        self.speed = speed
+        self.dict_route = {}  # маршрут → {"elapsed": [мс], "recorded": [мс], "status": {код: число}}
+        self.list_lag = []  # отставание отправки от расписания, мс
+        self.dict_event_close = {}  # соединение → asyncio.Event закрытия
+        self.count_ws_message = 0
+        self.count_ws_error = 0
+
+    async def wait_until(self, time_start: float, offset: float) -> float:
+        """Дождаться момента offset / speed от начала; возвращает отставание в мс"""
+        delay = time_start + offset / self.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return max(0.0, -delay) * 1000
+
+    async def send_http(self, client: httpx.AsyncClient, item: dict):
+        route = self.dict_route.setdefault(get_route(item), {"elapsed": [], "recorded": [], "status": {}})
+        time_start = time.perf_counter()
+        try:
+            response = await client.request(
+                item["m"], item["p"] + (f"?{item['q']}" if item.get("q") else ""),
+                content=get_body(item) or None, headers=item.get("h", {})
+            )
+            await response.aread()
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        route["elapsed"].append((time.perf_counter() - time_start) * 1000)
+        if "d" in item:
+            route["recorded"].append(item["d"])
+        route["status"][status] = route["status"].get(status, 0) + 1
+
+    async def listen_websocket(self, item: dict):
+        """Соединение вебсокета до записанного закрытия: читает рассылки, отвечает на ping"""
+        event_close = self.dict_event_close.setdefault(item["c"], asyncio.Event())
+        try:
+            async with websockets.connect(self.url_ws + item["p"], max_size=None) as websocket:
+                task_close = asyncio.create_task(event_close.wait())
+                while not event_close.is_set():
+                    task_receive = asyncio.create_task(websocket.recv())
+                    await asyncio.wait({task_receive, task_close}, return_when=asyncio.FIRST_COMPLETED)
+                    if not task_receive.done():
+                        task_receive.cancel()
+                        break
+                    text = task_receive.result()
+                    if json.loads(text).get("event") == "ping":
+                        await websocket.send("pong")
+                    else:
+                        self.count_ws_message += 1
+                task_close.cancel()
+        except (OSError, websockets.WebSocketException):
+            self.count_ws_error += 1
+
+    async def run(self, list_item: list[dict]) -> dict:
+        limits = httpx.Limits(max_connections=LIMIT_CONNECTION, max_keepalive_connections=LIMIT_CONNECTION)
+        async with httpx.AsyncClient(base_url=self.url, limits=limits, timeout=60) as client:
+            list_task_http = []
+            list_task_websocket = []
+            time_start = time.perf_counter()
+            offset_start = list_item[0]["t"] if list_item else 0
+            for item in list_item:
+                self.list_lag.append(await self.wait_until(time_start, item["t"] - offset_start))
+                if item["k"] == "http":
+                    list_task_http.append(asyncio.create_task(self.send_http(client, item)))
+                elif item["k"] == "ws_open":
+                    list_task_websocket.append(asyncio.create_task(self.listen_websocket(item)))
+                else:
+                    self.dict_event_close.setdefault(item["c"], asyncio.Event()).set()
+            await asyncio.gather(*list_task_http)
+            elapsed = time.perf_counter() - time_start
+            # Соединения, закрытие которых не попало в журнал, дослушивают рассылки последних запросов
+            await asyncio.sleep(TIMEOUT_WEBSOCKET_TAIL)
+            for event_close in self.dict_event_close.values():
+                event_close.set()
+            await asyncio.gather(*list_task_websocket)
+        return self.build_report(elapsed)
+
+    def build_report(self, elapsed: float) -> dict:
+        dict_route = {}
+        for route, data in sorted(self.dict_route.items()):
+            list_elapsed = data["elapsed"]
+            dict_route[route] = {
+                "count": len(list_elapsed),
+                "status": data["status"],
+                "p50": round(percentile(list_elapsed, 50), 3),
+                "p95": round(percentile(list_elapsed, 95), 3),
+                "p99": round(percentile(list_elapsed, 99), 3),
+                "max": round(max(list_elapsed, default=0.0), 3),
+                "recorded_p50": round(percentile(data["recorded"], 50), 3),
+            }
+        count_request = sum(route["count"] for route in dict_route.values())
+        return {
+            "speed": self.speed,
+            "elapsed_s": round(elapsed, 3),
+            "count_request": count_request,
+            "rps": round(count_request / elapsed, 1) if elapsed else 0.0,
+            "lag_p95": round(percentile(self.list_lag, 95), 3),
+            "ws_message": self.count_ws_message,
+            "ws_error": self.count_ws_error,
+            "route": dict_route,
+        }
+
+
+def print_report(report: dict):
+    print(
+        f"\n=== {report['speed']:g}×: {report['count_request']} запросов за {report['elapsed_s']} с "
+        f"({report['rps']}/с), отставание p95 {report['lag_p95']} мс, "
+        f"вебсокет: {report['ws_message']} сообщений, {report['ws_error']} ошибок ==="
+    )
+    print(f"{'маршрут':<60} {'число':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'запись p50':>11}  коды")
+    for route, data in report["route"].items():
+        status = " ".join(f"{code}:{count}" for code, count in sorted(data["status"].items()))
+        print(
+            f"{route[:60]:<60} {data['count']:>6} {data['p50']:>9.2f} {data['p95']:>9.2f} {data['p99']:>9.2f} "
+            f"{data['recorded_p50']:>11.2f}  {status}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение журнала трафика против сервера")
+    parser.add_argument("log", help="Журнал ADITIM_RECORD")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес сервера")
+    parser.add_argument("--speed", type=float, nargs="+", default=[1, 10, 100], help="Ускорение времени журнала")
+    parser.add_argument("--output", help="Файл отчёта JSON")
+    args = parser.parse_args()
+
+    list_item = load_log(Path(args.log))
+    list_report = []
+    for speed in args.speed:
+        report = asyncio.run(Replay(args.url, speed).run(list_item))
+        print_report(report)
+        list_report.append(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(list_report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n✅ Отчёт: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
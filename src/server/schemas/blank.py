@@ -1,7 +1,7 @@
 """Схемы для заготовок"""
 from pydantic import BaseModel, ConfigDict
 from datetime import date
-from typing import Optional
+from typing import Optional, List
 from .directory import SchemaDirBlankMaterial
 
 
@@ -42,4 +42,30 @@ class SchemaBlankUpdate(SchemaBlankBase):
 class SchemaBlankResponse(SchemaBlankBase):
     """Схема ответа с заготовкой"""
     id: int
-    material: Optional[SchemaDirBlankMaterial] = None
\ No newline at end of file
+    material: Optional[SchemaDirBlankMaterial] = None
+
+
+class SchemaBlankGroup(BaseModel):
+    """Группа заготовок одного материала и размера (остатки или группа заказа)"""
+    material_id: Optional[int] = None
+    material_name: str
+    blank_width: Optional[int] = None
+    blank_height: Optional[int] = None
+    blank_length: Optional[int] = None
+    size: str  # ширина×высота×длина, "—" — размер не задан
+    count_total: int
+    count_arrived: int
+    count_free: int  # прибыли и ещё не пошли в производство
+    list_blank_id: List[int] = []
+
+
+class SchemaBlankOrder(BaseModel):
+    """Сводка заказа заготовок"""
+    order: int  # 0 — заготовки без номера заказа
+    date_order: Optional[date] = None
+    date_arrival: Optional[date] = None
+    count_total: int
+    count_arrived: int
+    count_free: int
+    list_material_name: List[str] = []
+    list_size: List[str] = []
@@ -0,0 +1,22 @@
+"""Pydantic schemas for operator"""
+from typing import Optional
+from pydantic import BaseModel
+from .task import SchemaTaskComponentStageResponse
+
+
+class SchemaOperatorBlankInfo(BaseModel):
+    """Габариты заготовки компонента для задач изготовления заготовок"""
+    blank_size: str  # "Ш×В×Д" заготовки
+    product_size: str  # "Ш×В×Д" детали
+    material: str
+
+
+class SchemaOperatorStage(SchemaTaskComponentStageResponse):
+    """Этап, доступный оператору, с уже подставленными названиями задачи и компонента"""
+    task_id: int
+    task_name: str
+    task_type_id: Optional[int] = None
+    component_id: int
+    component_name: str
+    is_quenching: bool = False
+    blank_info: Optional[SchemaOperatorBlankInfo] = None
@@ -6,12 +6,11 @@ class SchemaProfileBase(BaseModel):
     """Базовая модель профиля"""
     article: str
     description: Optional[str] = None
-    sketch: Optional[str] = None  # Base64 строка
     model_config = ConfigDict(from_attributes=True)
 
 class SchemaProfileCreate(SchemaProfileBase):
-    """Создание профиля — все поля из Base"""
-    pass
+    """Создание профиля — эскиз передаётся Base64 строкой"""
+    sketch: Optional[str] = None  # Base64 строка
 
 class SchemaProfileUpdate(BaseModel):
     """Частичное обновление профиля — все поля опциональны"""
@@ -19,9 +18,13 @@ class SchemaProfileUpdate(BaseModel):
     description: Optional[str] = None
     sketch: Optional[str] = None
 
-class SchemaProfileResponse(SchemaProfileBase):
-    """Ответ API — включает id и поддержку ORM"""
+class SchemaProfileShort(SchemaProfileBase):
+    """Профиль без эскиза: сам эскиз отдаётся GET /api/profile/{id}/sketch"""
     id: int
+    sketch_hash: Optional[str] = None  # SHA-256 эскиза, None — эскиза нет
+
+class SchemaProfileResponse(SchemaProfileShort):
+    """Ответ API — включает id и поддержку ORM"""
     profiletool: List[SchemaProfileToolResponse] = []
 
 
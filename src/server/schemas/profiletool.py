@@ -22,7 +22,7 @@ class SchemaProfileToolUpdate(BaseModel):
 
 class SchemaProfileToolResponse(SchemaProfileToolBase):
     id: int
-    profile: Optional["SchemaProfileBase"] = None
+    profile: Optional["SchemaProfileShort"] = None
     dimension: Optional[SchemaDirToolDimension] = None
     component: List["SchemaProfileToolComponentResponse"] = []
 
@@ -51,7 +51,13 @@ class SchemaProfileToolComponentResponse(ProfileToolComponentBase):
     id: int
     profiletool_id: int
     type: Optional[SchemaDirProfiletoolComponentType] = None
-    history: List["SchemaProfileToolComponentHistoryResponse"] = []
+    # Историю целиком отдаёт GET /api/profile-tool/component/{id}/history
+    current_status_id: Optional[int] = None
+    current_status_date: Optional[date] = None
+    current_status: Optional[SchemaDirComponentStatus] = None
+    # Последний статус разработки (окно разработок), без статусов изготовления
+    current_development_status_id: Optional[int] = None
+    current_development_status: Optional[SchemaDirComponentStatus] = None
     blank: List[SchemaBlankResponse] = []
 
 class SchemaProfileToolComponentHistoryCreate(BaseModel):
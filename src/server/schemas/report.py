@@ -0,0 +1,65 @@
+"""Pydantic schemas for report"""
+from datetime import date
+from typing import Optional, List, Dict
+from pydantic import BaseModel
+
+
+class SchemaReportTaskRow(BaseModel):
+    """Строка отчёта по задачам с уже подставленными названиями"""
+    id: int
+    name: str
+    type_name: Optional[str] = None
+    department_name: Optional[str] = None
+    status_name: Optional[str] = None
+    created: Optional[date] = None
+    deadline: Optional[date] = None
+    completed: Optional[date] = None
+    description: Optional[str] = None
+
+
+class SchemaReportGroup(BaseModel):
+    """Одна группа сводки: число задач и доля от итога"""
+    key: Optional[str] = None  # id справочника или месяц YYYY-MM; None — значение не задано
+    name: str
+    count: int
+    percent: float
+
+
+class SchemaReportTaskResponse(BaseModel):
+    """Отчёт по задачам за период"""
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    total: int
+    list_task: List[SchemaReportTaskRow] = []
+    group: Dict[str, List[SchemaReportGroup]] = {}  # status / department / month
+
+
+class SchemaReportMachineStat(BaseModel):
+    """Загрузка станка или типа работ за период"""
+    id: int
+    name: str
+    work_type_id: Optional[int] = None
+    work_type_name: Optional[str] = None
+    machine_count: int = 1
+    operation_count: int  # этапы, начатые в периоде
+    operation_finished_count: int
+    busy_days: int  # дни, когда станок занят хотя бы одним этапом (для типа работ — станко-дни)
+    idle_days: int
+    utilisation: float  # доля занятых дней периода, %
+    duration_avg: Optional[float] = None  # длительность завершённого этапа, дней
+    duration_p50: Optional[float] = None
+    duration_p90: Optional[float] = None
+    duration_max: Optional[int] = None
+    gap_count: int = 0  # простои между занятыми интервалами
+    gap_max_days: int = 0
+    gap_avg_days: Optional[float] = None
+
+
+class SchemaReportMachineResponse(BaseModel):
+    """Отчёт по загрузке станков"""
+    date_from: date
+    date_to: date
+    period_days: int
+    version: int  # версия данных, по которой посчитан отчёт
+    list_machine: List[SchemaReportMachineStat] = []
+    list_work_type: List[SchemaReportMachineStat] = []
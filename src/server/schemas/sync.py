@@ -0,0 +1,19 @@
+"""Pydantic schemas for sync"""
+from typing import List
+from pydantic import BaseModel
+
+
+class SchemaSyncChange(BaseModel):
+    """Изменения одного ключа реестра клиента (group/key как в notify_clients)"""
+    group: str
+    key: str
+    is_reset: bool = False  # ключ нужно перезагрузить целиком
+    list_upsert: List[dict] = []  # созданные и изменённые документы
+    list_delete_id: List[int] = []  # id удалённых документов (tombstone)
+
+
+class SchemaSyncResponse(BaseModel):
+    """Ответ дельта-синхронизации"""
+    version: int
+    is_reset: bool = False  # журнал не покрывает since — нужна полная загрузка
+    change: List[SchemaSyncChange] = []
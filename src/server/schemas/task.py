@@ -47,6 +47,7 @@ class SchemaTaskResponse(TaskBase):
     type: Optional['SchemaDirTaskType'] = None
     component: Optional[list['SchemaTaskComponentResponse']] = None
     position: Optional[int] = None
+    progress: Optional[float] = None  # % завершённых этапов; None — этапов нет
 
 # === TASK COMPONENT SCHEMAS ===
 
@@ -73,6 +74,9 @@ class SchemaTaskComponentResponse(TaskComponentBase):
     profiletool_component: Optional[SchemaProfileToolComponentResponse] = None
     product_component: Optional[SchemaProductComponentResponse] = None
     stage: Optional[list["SchemaTaskComponentStageResponse"]] = None
+    current_stage_id: Optional[int] = None  # этап в работе или ожидающий (progress.py); None — все завершены
+    stages_done: int = 0
+    stages_total: int = 0
 
 
 class SchemaQueueReorderRequest(BaseModel):
@@ -0,0 +1,498 @@
+"""Нагрузочная модель цеха: N клиентов ApiManager и M планшетов операторов.
+
+Клиент повторяет ApiManager без Qt: начальная загрузка /api/bootstrap
+(при ошибке — версия и ключи реестра по отдельности), вебсокет с ответом
+на ping, применение изменений из data_updated на месте, дельта-синхронизация
+при разрыве цепочки версий, перезагрузка ключа при is_reset, полная
+синхронизация на resync. HTTP идёт через те же классы src/client/api
+(с ETag и постраничной загрузкой) в пуле потоков, как run_async; кеш ETag —
+свой у каждого клиента, как у отдельного процесса.
+
+Планшет повторяет цикл operator_app через его api_client: справочник видов
+работ и этапы вида работ (get_all_stages_by_work_type), затем начало этапа
+со станком или завершение (update_stage_dates) и повторная загрузка этапов.
+После PATCH планшет запрашивает версию данных сервера (единственный запрос
+сверх operator_app) — клиент свежий, когда применил эту версию и не ждёт
+перезагрузок. Распространение — от отправки PATCH до момента, когда
+свежими стали все клиенты.
+
+Пока идёт замер, раз в INTERVAL_SAMPLE сек читается /health/threadpool:
+занятость пула потоков сервера и его процессорное время. При десятках
+клиентов пул соединений сервера (5 + ADITIM_DB_MAX_OVERFLOW) меньше пула
+потоков и запросы встают в ожидании соединений — для таких прогонов сервер
+запускается с ADITIM_DB_MAX_OVERFLOW=-1 (см. database.py).
+
+Несколько значений --client прогоняются по очереди — видно, при каком
+числе экранов растёт распространение и насыщается пул:
+python -m src.server.simulate_load --client 10 20 40 --tablet 5 --duration 60 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+import websockets
+
+from ..client.api.api_profile import ApiProfile
+from ..client.api.api_profiletool import ApiProfileTool
+from ..client.api.api_product import ApiProduct
+from ..client.api.api_task import ApiTask
+from ..client.api.api_directory import ApiDirectory
+from ..client.api.api_plan import ApiPlanTaskComponentStage
+from ..client.api.api_blank import APIBlank
+from ..client.api.api_sync import ApiSync
+from ..client.api.api_bootstrap import ApiBootstrap, build_storage
+from ..operator_app import api_client as api_operator
+from .measure import percentile
+
+INTERVAL_SAMPLE = 0.5  # сек между замерами пула потоков сервера
+TIMEOUT_DRAIN = 30.0  # сек после последнего PATCH на то, чтобы клиенты стали свежими
+DELAY_RECONNECT = 1.0  # сек до переподключения вебсокета (в ApiManager — 5)
+
+
+# =============================================================================
+# КЛИЕНТ
+# =============================================================================
+class ManagerSimulated:
+    """ApiManager без Qt: хранилища, вебсокет и дельта-синхронизация"""
+
+    def __init__(self, index: int, url: str, executor: ThreadPoolExecutor):
+        self.index = index
+        self.url_ws = url.replace("http", "ws", 1).rstrip("/") + "/ws/updates"
+        self.executor = executor
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.api_profile = ApiProfile(url)
+        self.api_profiletool = ApiProfileTool(url)
+        self.api_product = ApiProduct(url)
+        self.api_task = ApiTask(url)
+        self.api_directory = ApiDirectory(url)
+        self.api_plan_task_component_stage = ApiPlanTaskComponentStage(url)
+        self.api_blank = APIBlank(url)
+        self.api_sync = ApiSync(url)
+        self.api_bootstrap = ApiBootstrap(url)
+        # Кеш ETag общий для клиентов процесса — у каждого симулированного клиента свой
+        dict_etag = {}
+        lock_etag = threading.Lock()
+        for api in (
+            self.api_profile, self.api_profiletool, self.api_product, self.api_task, self.api_directory,
+            self.api_plan_task_component_stage, self.api_blank, self.api_sync, self.api_bootstrap
+        ):
+            api._dict_etag = dict_etag
+            api._lock_etag = lock_etag
+
+        self.table = {}
+        self.directory = {}
+        self.plan = {}
+        # Реестр — как в ApiManager
+        self.registry = [
+            ("profile", "table", self.api_profile.get_profile),
+            ("profiletool", "table", self.api_profiletool.get_profiletool),
+            ("product", "table", self.api_product.get_product),
+            ("task", "table", self.api_task.get_task),
+            ("taskdev", "table", self.api_task.get_taskdev),
+            ("queue", "table", self.api_task.get_queue),
+            ("department", "directory", self.api_directory.get_department),
+            ("component_type", "directory", self.api_directory.get_component_type),
+            ("profiletool_component_type", "directory", self.api_directory.get_component_type),
+            ("component_status", "directory", self.api_directory.get_component_status),
+            ("task_status", "directory", self.api_directory.get_task_status),
+            ("profiletool_dimension", "directory", self.api_directory.get_tool_dimension),
+            ("machine", "directory", self.api_directory.get_machine),
+            ("work_type", "directory", self.api_directory.get_work_type),
+            ("work_subtype", "directory", self.api_directory.get_work_subtype),
+            ("task_type", "directory", self.api_directory.get_task_type),
+            ("blank_material", "directory", self.api_directory.get_blank_material),
+            ("blank_type", "directory", self.api_directory.get_blank_type),
+            ("task_component_stage", "plan", self.api_plan_task_component_stage.get_plan_task_component_stage),
+            ("blank", "table", self.api_blank.get_list_blank),
+        ]
+        self.dict_sort = {
+            "taskdev": lambda item: (item.get('position') is None, item.get('position') or 0),
+            "queue": lambda item: (item.get('position') is None, item.get('position') or 0),
+            "blank": lambda item: (-(item.get('order') or 0), -item['id']),
+        }
+        for key, group, _ in self.registry:
+            getattr(self, group)[key] = []
+
+        self.version = None
+        self.lock_sync = threading.Lock()
+        self.count_pending = 0  # загрузок в пуле потоков
+        self.list_settled = []  # (время, версия): клиент без незавершённых загрузок
+        self.stat = {"message": 0, "sync": 0, "load": 0, "error": 0, "reconnect": 0}
+
+    # Пул потоков -------------------------------------------------------------
+
+    def run_async(self, func: Callable):
+        """Аналог run_async клиента: функция в пуле потоков, учёт незавершённых загрузок"""
+        self.count_pending += 1
+        future = self.loop.run_in_executor(self.executor, func)
+        future.add_done_callback(self.on_done)
+
+    def on_done(self, future: asyncio.Future):
+        self.count_pending -= 1
+        if future.exception() is not None:
+            self.stat["error"] += 1
+        self.mark_settled()
+
+    def mark_settled(self):
+        if self.count_pending == 0 and self.version is not None:
+            self.list_settled.append((time.perf_counter(), self.version))
+
+    # Загрузка -----------------------------------------------------------------
+
+    async def load_all(self) -> float:
+        """Начальная загрузка (load_all_async); возвращает длительность в сек"""
+        self.loop = asyncio.get_running_loop()
+        time_start = time.perf_counter()
+        try:
+            await self.loop.run_in_executor(self.executor, self.load_bootstrap)
+        except Exception:
+            self.stat["error"] += 1
+            await self.loop.run_in_executor(self.executor, self.load_version)
+            for key, group, loader in self.registry:
+                self.refresh_async(key, group, loader)
+        while self.count_pending:
+            await asyncio.sleep(0.05)
+        self.mark_settled()
+        return time.perf_counter() - time_start
+
+    def load_bootstrap(self):
+        data = self.api_bootstrap.get_bootstrap()
+        dict_storage = build_storage(data)
+        self.version = data["version"]
+        for key, group, loader in self.registry:
+            if (group, key) not in dict_storage:
+                self.loop.call_soon_threadsafe(self.refresh_async, key, group, loader)
+                continue
+            getattr(self, group)[key] = dict_storage[(group, key)]
+
+    def load_version(self):
+        try:
+            self.version = self.api_sync.get_version()["version"]
+        except Exception:
+            self.version = None
+
+    def load_data(self, key: str, group: str, loader_func):
+        self.stat["load"] += 1
+        getattr(self, group)[key] = loader_func()
+
+    def refresh_async(self, key: str, group: str, loader_func):
+        self.run_async(lambda: self.load_data(key, group, loader_func))
+
+    def refresh(self, key: str):
+        """Из потока синхронизации: загрузка ставится в цикл клиента"""
+        for k, group, loader in self.registry:
+            if k == key:
+                self.loop.call_soon_threadsafe(self.refresh_async, k, group, loader)
+                return
+
+    # Вебсокет -----------------------------------------------------------------
+
+    async def listen_loop(self):
+        while True:
+            try:
+                async with websockets.connect(self.url_ws, max_size=None) as ws:
+                    await self.listen_to_connection(ws)
+            except (OSError, websockets.WebSocketException):
+                pass
+            self.stat["reconnect"] += 1
+            await asyncio.sleep(DELAY_RECONNECT)
+
+    async def listen_to_connection(self, ws):
+        async for message in ws:
+            data = json.loads(message)
+            event = data.get("event")
+            if event == "ping":
+                await ws.send("pong")
+            elif event == "resync":
+                self.stat["message"] += 1
+                self.sync_async([key for key, group, loader in self.registry])
+            elif event == "data_updated":
+                self.stat["message"] += 1
+                self.apply_event(data)
+
+    # Синхронизация (как в ApiManager) ----------------------------------------
+
+    def sync_async(self, list_key: list):
+        self.run_async(lambda: self.sync(list_key))
+
+    def sync(self, list_key: list):
+        with self.lock_sync:
+            self.stat["sync"] += 1
+            if self.version is None:
+                for key in list_key:
+                    self.refresh(key)
+                return
+            try:
+                data = self.api_sync.get_sync(self.version)
+            except Exception:
+                self.stat["error"] += 1
+                for key in list_key:
+                    self.refresh(key)
+                return
+            if data["is_reset"]:
+                self.version = data["version"]
+                for key, group, loader in self.registry:
+                    self.loop.call_soon_threadsafe(self.refresh_async, key, group, loader)
+                return
+            for change in data["change"]:
+                self.apply_change(change)
+            self.version = data["version"]
+
+    def apply_event(self, data: dict):
+        list_key = [item["key"] for item in data.get("list_key", [data])]
+        if data.get("change") is None or self.version is None:
+            self.sync_async(list_key)
+            return
+        if not self.lock_sync.acquire(blocking=False):
+            self.sync_async(list_key)
+            return
+        try:
+            if data["version"] <= self.version:
+                return
+            if data["since"] != self.version:
+                self.sync_async(list_key)
+                return
+            for change in data["change"]:
+                self.apply_change(change)
+            self.version = data["version"]
+        finally:
+            self.lock_sync.release()
+            self.mark_settled()
+
+    def apply_change(self, change: dict):
+        group, key = change["group"], change["key"]
+        if change["is_reset"]:
+            self.refresh(key)
+            return
+        storage = getattr(self, group)
+        if key not in storage:
+            return
+        dict_item = {item['id']: item for item in storage[key]}
+        for item_id in change["list_delete_id"]:
+            dict_item.pop(item_id, None)
+        for item in change["list_upsert"]:
+            dict_item[item['id']] = item
+        storage[key] = sorted(dict_item.values(), key=self.dict_sort.get(key, lambda item: item['id']))
+
+    def get_time_fresh(self, time_start: float, version: int) -> Optional[float]:
+        """Первый момент после time_start, когда клиент применил version и не ждал загрузок"""
+        for time_settled, version_settled in self.list_settled:
+            if time_settled >= time_start and version_settled >= version:
+                return time_settled
+        return None
+
+
+# =============================================================================
+# ПЛАНШЕТ ОПЕРАТОРА
+# =============================================================================
+class TabletSimulated:
+    """Планшет operator_app: этапы вида работ → начало или завершение этапа"""
+
+    def __init__(self, index: int, url: str, list_work_type_id: list[int], think: float):
+        self.index = index
+        self.api_sync = ApiSync(url)
+        self.api_sync._dict_etag = {}
+        self.list_work_type_id = list_work_type_id
+        self.work_type_id = list_work_type_id[index % len(list_work_type_id)]
+        self.think = think
+        self.rnd = random.Random(index)
+        self.dict_machine = {}  # вид работ → [id станка]
+        self.list_patch = []  # (время отправки, версия после PATCH, мс ответа)
+        self.stat = {"load": 0, "error": 0, "idle": 0}
+
+    def load_stage(self) -> list:
+        """_load_stage operator_app: справочник видов работ и этапы выбранного вида"""
+        api_operator.get_work_types()
+        self.stat["load"] += 1
+        return api_operator.get_all_stages_by_work_type(self.work_type_id)
+
+    def step(self):
+        """Одно действие оператора; без этапов — переход к следующему виду работ"""
+        list_stage = self.load_stage()
+        if not list_stage:
+            self.stat["idle"] += 1
+            index = self.list_work_type_id.index(self.work_type_id)
+            self.work_type_id = self.list_work_type_id[(index + 1) % len(self.list_work_type_id)]
+            return
+        stage = self.rnd.choice(list_stage)
+        time_start = time.perf_counter()
+        if stage["start"] is None:
+            if self.work_type_id not in self.dict_machine:
+                self.dict_machine[self.work_type_id] = [
+                    machine["id"] for machine in api_operator.get_machines_by_work_type(self.work_type_id) or []
+                ]
+            list_machine_id = self.dict_machine[self.work_type_id]
+            if not list_machine_id:
+                self.stat["idle"] += 1
+                return
+            api_operator.update_stage_dates(stage["id"], start=date.today(), machine_id=self.rnd.choice(list_machine_id))
+        else:
+            api_operator.update_stage_dates(stage["id"], finish=date.today())
+        elapsed = (time.perf_counter() - time_start) * 1000
+        self.list_patch.append((time_start, self.api_sync.get_version()["version"], elapsed))
+        self.load_stage()
+
+    async def run(self, executor: ThreadPoolExecutor, time_stop: float):
+        loop = asyncio.get_running_loop()
+        while time.perf_counter() < time_stop:
+            try:
+                await loop.run_in_executor(executor, self.step)
+            except Exception:
+                self.stat["error"] += 1
+            await asyncio.sleep(self.think * self.rnd.uniform(0.5, 1.5))
+
+
+# =============================================================================
+# ЗАМЕР
+# =============================================================================
+async def sample_server(client: httpx.AsyncClient, list_sample: list, event_stop: asyncio.Event):
+    """Занятость пула потоков и загрузка процессора сервера раз в INTERVAL_SAMPLE"""
+    previous = None
+    while not event_stop.is_set():
+        try:
+            data = (await client.get("/health/threadpool")).json()
+        except httpx.HTTPError:
+            data = None
+        if data is not None:
+            if previous is not None and data["time_s"] > previous["time_s"]:
+                data["cpu_percent"] = (data["cpu_s"] - previous["cpu_s"]) / (data["time_s"] - previous["time_s"]) * 100
+                list_sample.append(data)
+            previous = data
+        try:
+            await asyncio.wait_for(event_stop.wait(), INTERVAL_SAMPLE)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(url: str, count_client: int, count_tablet: int, duration: float, think: float) -> dict:
+    api_operator.BASE_URL = url.rstrip("/") + "/api"
+    executor = ThreadPoolExecutor(max_workers=count_client * 4 + count_tablet + 4)
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    list_manager = [ManagerSimulated(index, url, executor) for index in range(count_client)]
+    list_time_load = await asyncio.gather(*(manager.load_all() for manager in list_manager))
+    list_task_listen = [asyncio.create_task(manager.listen_loop()) for manager in list_manager]
+    await asyncio.sleep(1)  # вебсокеты подключены до первых изменений
+
+    list_work_type_id = sorted({machine["work_type_id"] for machine in list_manager[0].directory["machine"]}) \
+        if list_manager else [row["id"] for row in api_operator.get_work_types()]
+    list_tablet = [TabletSimulated(index, url, list_work_type_id, think) for index in range(count_tablet)]
+
+    list_sample = []
+    event_stop = asyncio.Event()
+    async with httpx.AsyncClient(base_url=url, timeout=10) as client:
+        task_sample = asyncio.create_task(sample_server(client, list_sample, event_stop))
+        time_stop = time.perf_counter() + duration
+        await asyncio.gather(*(tablet.run(executor, time_stop) for tablet in list_tablet))
+        # Дослушать рассылки последних изменений
+        list_patch = [patch for tablet in list_tablet for patch in tablet.list_patch]
+        version_last = max((version for _, version, _ in list_patch), default=0)
+        time_drain = time.perf_counter() + TIMEOUT_DRAIN
+        while time.perf_counter() < time_drain and not all(
+            manager.get_time_fresh(0, version_last) for manager in list_manager
+        ):
+            await asyncio.sleep(0.1)
+        event_stop.set()
+        await task_sample
+    for task in list_task_listen:
+        task.cancel()
+    await asyncio.gather(*list_task_listen, return_exceptions=True)
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    list_propagation = []
+    count_stale = 0
+    for time_start, version, _ in list_patch:
+        list_time_fresh = [manager.get_time_fresh(time_start, version) for manager in list_manager]
+        if None in list_time_fresh:
+            count_stale += 1
+        elif list_time_fresh:
+            list_propagation.append((max(list_time_fresh) - time_start) * 1000)
+    list_borrowed = [sample["borrowed"] for sample in list_sample]
+    list_cpu = [sample["cpu_percent"] for sample in list_sample]
+    return {
+        "client": count_client,
+        "tablet": count_tablet,
+        "duration_s": duration,
+        "load_s": summarize([value * 1000 for value in list_time_load], 1000),
+        "patch": {
+            "count": len(list_patch),
+            "ms": summarize([elapsed for _, _, elapsed in list_patch]),
+        },
+        "propagation": {"ms": summarize(list_propagation), "stale": count_stale},
+        "client_stat": sum_stat(manager.stat for manager in list_manager),
+        "tablet_stat": sum_stat(tablet.stat for tablet in list_tablet),
+        "server": {
+            "threadpool_total": list_sample[0]["total"] if list_sample else None,
+            "borrowed": summarize(list_borrowed),
+            "waiting_max": max((sample["waiting"] for sample in list_sample), default=0),
+            "saturated_share": round(
+                sum(sample["borrowed"] >= sample["total"] for sample in list_sample) / len(list_sample), 3
+            ) if list_sample else 0.0,
+            "cpu_percent": summarize(list_cpu),
+        },
+    }
+
+
+def summarize(list_value: list, scale: float = 1) -> dict:
+    """p50/p95/max; scale — делитель (мс → сек для длительности загрузки)"""
+    return {
+        "p50": round(percentile(list_value, 50) / scale, 3),
+        "p95": round(percentile(list_value, 95) / scale, 3),
+        "max": round(max(list_value, default=0.0) / scale, 3),
+    }
+
+
+def sum_stat(iterable_stat) -> dict:
+    dict_sum = {}
+    for stat in iterable_stat:
+        for name, value in stat.items():
+            dict_sum[name] = dict_sum.get(name, 0) + value
+    return dict_sum
+
+
+def print_report(report: dict):
+    server = report["server"]
+    print(
+        f"{report['client']:>7} {report['tablet']:>7} {report['load_s']['p95']:>9.2f} {report['patch']['count']:>6} "
+        f"{report['patch']['ms']['p95']:>9.1f} {report['propagation']['ms']['p50']:>9.1f} "
+        f"{report['propagation']['ms']['p95']:>9.1f} {report['propagation']['stale']:>6} "
+        f"{server['cpu_percent']['p50']:>7.0f} {server['cpu_percent']['max']:>7.0f} "
+        f"{server['borrowed']['max']:>5.0f}/{server['threadpool_total'] or 0:<4} {server['saturated_share']:>6.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузка от клиентов и планшетов операторов на локальный сервер")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес сервера")
+    parser.add_argument("--client", type=int, nargs="+", default=[10], help="Число клиентов ApiManager (прогоны)")
+    parser.add_argument("--tablet", type=int, default=3, help="Число планшетов операторов")
+    parser.add_argument("--duration", type=float, default=30, help="Длительность работы планшетов, сек")
+    parser.add_argument("--think", type=float, default=2, help="Пауза оператора между действиями, сек")
+    parser.add_argument("--output", help="Файл отчёта JSON")
+    args = parser.parse_args()
+
+    print(
+        f"{'клиенты':>7} {'планшеты':>7} {'загр. p95':>9} {'PATCH':>6} {'PATCH p95':>9} {'расп. p50':>9} "
+        f"{'расп. p95':>9} {'не дош.':>6} {'CPU p50':>7} {'CPU max':>7} {'пул':>10} {'насыщ.':>6}"
+    )
+    list_report = []
+    for count_client in args.client:
+        report = asyncio.run(run(args.url, count_client, args.tablet, args.duration, args.think))
+        print_report(report)
+        list_report.append(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(list_report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n✅ Отчёт: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
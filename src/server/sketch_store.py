@@ -0,0 +1,97 @@
+"""Хранилище эскизов профилей на диске с адресацией по содержимому.
+
+Файл эскиза называется SHA-256 своих байтов, поэтому одинаковые эскизы
+разных профилей хранятся один раз. Миниатюры строятся один раз при загрузке.
+Структура каталога: <ADITIM_SKETCH_DIR>/<hash[:2]>/<hash> и <hash>_<size>.png
+"""
+import hashlib
+import io
+import os
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+DIR_SKETCH = Path(os.getenv("ADITIM_SKETCH_DIR", "sketch"))
+
+# Размеры миниатюр: имя → (ширина, высота), пропорции сохраняются
+DICT_THUMBNAIL_SIZE = {
+    "preview": (200, 150),  # панели WindowProfile / WindowDevelopment и диалоги
+    "icon": (64, 64),
+}
+
+# Сигнатуры форматов изображений эскиза
+DICT_MEDIA_TYPE = {
+    b"\x89PNG": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+    b"GIF8": "image/gif",
+    b"BM": "image/bmp",
+}
+
+
+def get_path(sketch_hash: str, size: Optional[str] = None) -> Path:
+    """Путь к оригиналу эскиза или его миниатюре"""
+    name = sketch_hash if size is None else f"{sketch_hash}_{size}.png"
+    return DIR_SKETCH / sketch_hash[:2] / name
+
+
+def get_media_type(image_data: bytes) -> str:
+    """MIME-тип эскиза по сигнатуре файла"""
+    for signature, media_type in DICT_MEDIA_TYPE.items():
+        if image_data.startswith(signature):
+            return media_type
+    return "application/octet-stream"
+
+
+def get_media_type_file(path: Path) -> str:
+    """MIME-тип файла эскиза по первым байтам"""
+    with open(path, "rb") as file:
+        return get_media_type(file.read(8))
+
+
+def write_atomic(path: Path, data: bytes):
+    """Записать файл через временный, чтобы не отдать клиенту недописанный"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path_tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    path_tmp.write_bytes(data)
+    os.replace(path_tmp, path)
+
+
+def save_sketch(image_data: bytes) -> str:
+    """Сохранить эскиз и его миниатюры, вернуть SHA-256.
+
+    Уже сохранённый эскиз повторно не пишется.
+    """
+    sketch_hash = hashlib.sha256(image_data).hexdigest()
+    path = get_path(sketch_hash)
+    if not path.exists():
+        write_atomic(path, image_data)
+    for size in DICT_THUMBNAIL_SIZE:
+        if not get_path(sketch_hash, size).exists():
+            save_thumbnail(sketch_hash, image_data, size)
+    return sketch_hash
+
+
+def save_thumbnail(sketch_hash: str, image_data: bytes, size: str):
+    """Построить миниатюру эскиза; нераспознанное изображение пропускается"""
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            image.thumbnail(DICT_THUMBNAIL_SIZE[size], Image.LANCZOS)
+            if image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA")
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG", optimize=True)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Не удалось построить миниатюру {size} эскиза {sketch_hash}: {e}")
+        return
+    write_atomic(get_path(sketch_hash, size), buffer.getvalue())
+
+
+def get_sketch_path(sketch_hash: str, size: Optional[str] = None) -> Optional[Path]:
+    """Путь к файлу для отдачи: миниатюра, если есть, иначе оригинал"""
+    if size is not None:
+        path = get_path(sketch_hash, size)
+        if path.exists():
+            return path
+    path = get_path(sketch_hash)
+    return path if path.exists() else None
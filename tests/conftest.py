@@ -0,0 +1,70 @@
+"""Общие фикстуры: приложение на SQLite в памяти с синтетическими данными и счётчик SQL-запросов"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.server import database
+from src.server.main import app
+from src.server.database import Base, get_db
+from src.server.dataset import generate
+from src.server.directory_cache import cache_directory
+from src.server.measure import CounterQuery, clear_cache
+
+
+class DatabaseApi:
+    """Приложение на своей базе в памяти, заполненной generate(scale)"""
+
+    def __init__(self, scale: int):
+        self.scale = scale
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        with self.Session() as db:
+            self.dict_count = generate(db, scale)
+        self.client = TestClient(app)
+
+    def get_db(self):
+        db = self.Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def request(self, method: str, url: str, is_cold: bool = True, **kwargs):
+        """(ответ, CounterQuery) запроса к этой базе.
+
+        is_cold — кеши ответов сброшены; справочники загружены заранее, как при старте сервера.
+        """
+        app.dependency_overrides[get_db] = self.get_db
+        database.SessionLocal = self.Session
+        if is_cold:
+            clear_cache()
+            with self.Session() as db:
+                cache_directory.get(db)
+        with CounterQuery(self.engine) as counter:
+            response = self.client.request(method, url, **kwargs)
+        return response, counter
+
+
+@pytest.fixture(scope="session")
+def open_api():
+    """Фабрика DatabaseApi по масштабу; базы создаются один раз на сессию"""
+    dict_api = {}
+    session_local = database.SessionLocal
+
+    def open_scale(scale: int = 1) -> DatabaseApi:
+        if scale not in dict_api:
+            dict_api[scale] = DatabaseApi(scale)
+        return dict_api[scale]
+
+    yield open_scale
+    app.dependency_overrides.pop(get_db, None)
+    database.SessionLocal = session_local
+    clear_cache()
+
+
+@pytest.fixture
+def api(open_api) -> DatabaseApi:
+    return open_api(1)
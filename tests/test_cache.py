@@ -0,0 +1,60 @@
+"""Кеш списков задач: тело, собранное до сброса фрагментов, не кешируется под новой версией;
+строки, удалённые во время сборки списка, пропускаются"""
+from sqlalchemy import text
+
+from src.server.fragment_cache import cache_fragment
+from src.server.models.task import ModelTask
+
+SCALE_DELETE = 2  # отдельная база: тест удаляет строки
+
+
+def test_task_list_not_cached_before_invalidate(api, monkeypatch):
+    api.request("GET", "/api/task")  # фрагменты задач в кеше
+    invalidate = cache_fragment.invalidate
+    list_response = []
+
+    def invalidate_after_request(*args, **kwargs):
+        # Запрос между коммитом (версия уже новая) и сбросом фрагментов
+        list_response.append(api.client.get("/api/task"))
+        invalidate(*args, **kwargs)
+
+    monkeypatch.setattr(cache_fragment, "invalidate", invalidate_after_request)
+    with api.Session() as db:
+        db.get(ModelTask, 1).description = "после коммита"
+        db.commit()
+    monkeypatch.undo()
+
+    assert list_response and list_response[0].status_code == 200
+    response, _ = api.request("GET", "/api/task", is_cold=False)
+    dict_task = {task["id"]: task for task in response.json()}
+    assert dict_task[1]["description"] == "после коммита"
+    assert cache_fragment.get_stat()["change"] == 0
+
+
+def test_task_list_row_deleted_during_build(open_api, monkeypatch):
+    api = open_api(SCALE_DELETE)
+    with api.engine.connect() as connection:
+        component_id = connection.execute(text("SELECT min(id) FROM task_component WHERE task_id = 2")).scalar()
+    get = cache_fragment.get
+    dict_sql = {
+        "task": "DELETE FROM task WHERE id = 1",
+        "task_component": f"DELETE FROM task_component WHERE id = {component_id}",
+    }
+
+    def get_after_delete(kind, list_id):
+        # Удаление между чтением страницы и загрузкой фрагментов
+        sql = dict_sql.pop(kind, None)
+        if sql is not None:
+            with api.engine.begin() as connection:
+                connection.execute(text(sql))
+        return get(kind, list_id)
+
+    monkeypatch.setattr(cache_fragment, "get", get_after_delete)
+    response, _ = api.request("GET", "/api/task")
+    monkeypatch.undo()
+
+    assert response.status_code == 200
+    dict_task = {task["id"]: task for task in response.json()}
+    assert 1 not in dict_task
+    assert component_id not in {component["id"] for component in dict_task[2]["component"]}
+    assert not dict_sql
@@ -0,0 +1,15 @@
+"""Кодирование ответов: Vary на всех ответах, вид которых зависит от заголовков запроса"""
+import pytest
+
+
+@pytest.mark.parametrize("accept_encoding, content_encoding", [("identity", None), ("gzip", "gzip")])
+def test_vary_accept_encoding(api, accept_encoding, content_encoding):
+    response, _ = api.request("GET", "/api/task", headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == content_encoding
+    assert "Accept-Encoding" in response.headers.get_list("vary")
+    response_cached, _ = api.request(
+        "GET", "/api/task", is_cold=False,
+        headers={"Accept-Encoding": accept_encoding, "If-None-Match": response.headers["etag"]}
+    )
+    assert response_cached.status_code == 304
+    assert "Accept-Encoding" in response_cached.headers.get_list("vary")
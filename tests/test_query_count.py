@@ -0,0 +1,81 @@
+"""Число SQL-запросов на запрос к API: бюджеты и независимость от объёма данных.
+
+Бюджет — предел запросов холодного GET (кеши ответов сброшены). Списки
+грузят связи пакетами (selectinload), поэтому число запросов не зависит
+от числа строк: при scale ×10 оно должно совпадать.
+"""
+import pytest
+
+SCALE_LARGE = 10
+
+# URL → предел запросов
+DICT_BUDGET = {
+    "/api/task": 33,
+    "/api/taskdev": 33,
+    "/api/task/queue": 33,
+    "/api/task?fields=id,type.name,status.name,deadline,created,description,display_name": 8,
+    "/api/profile": 14,
+    "/api/profile-tool": 14,
+    "/api/profile-tool/1/component": 10,
+    "/api/profile-tool/component/1/history": 5,
+    "/api/product": 6,
+    "/api/product/1/component": 4,
+    "/api/blank": 5,
+    "/api/blank/1": 3,
+    "/api/blank/order": 5,
+    "/api/blank/order/next": 2,
+    "/api/blank/order/1/group": 4,
+    "/api/blank/stock": 4,
+    "/api/plan_task_component_stage": 8,
+    "/api/directory/dir_component_type": 3,
+    "/api/directory/dir_machine": 3,
+    "/api/directory/dir_blank_type": 3,
+    "/api/operator/stage": 5,
+    "/api/report/task": 4,
+    "/api/report/machine": 6,
+    "/api/sync?since=0": 8,
+    "/api/bootstrap": 28,
+}
+
+# Повторный запрос без изменений отвечает из кеша: проверка версии и справочники
+DICT_BUDGET_WARM = {
+    "/api/task": 2,
+    "/api/taskdev": 2,
+    "/api/task/queue": 2,
+}
+
+
+@pytest.mark.parametrize("url", DICT_BUDGET)
+def test_query_budget(api, url):
+    response, counter = api.request("GET", url)
+    assert response.status_code == 200, response.text
+    assert counter.count <= DICT_BUDGET[url], (
+        f"{url}: {counter.count} запросов (бюджет {DICT_BUDGET[url]}), "
+        f"SQL {counter.elapsed * 1000:.1f} мс\n{counter.format()}"
+    )
+
+
+@pytest.mark.parametrize("url", DICT_BUDGET)
+def test_query_count_constant_on_scale(open_api, url):
+    _, counter_small = open_api(1).request("GET", url)
+    response, counter_large = open_api(SCALE_LARGE).request("GET", url)
+    assert response.status_code == 200, response.text
+    assert counter_large.count == counter_small.count, (
+        f"{url}: {counter_small.count} запросов на scale 1, {counter_large.count} на scale {SCALE_LARGE} — "
+        f"запросы на строку (N+1)\n{counter_large.format()}"
+    )
+
+
+@pytest.mark.parametrize("url", DICT_BUDGET_WARM)
+def test_query_budget_warm(api, url):
+    api.request("GET", url)
+    response, counter = api.request("GET", url, is_cold=False)
+    assert response.status_code == 200, response.text
+    assert counter.count <= DICT_BUDGET_WARM[url], f"{url}: {counter.count} запросов\n{counter.format()}"
+
+
+def test_etag_not_modified_without_query_data(api):
+    response, _ = api.request("GET", "/api/task")
+    response, counter = api.request("GET", "/api/task", is_cold=False, headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    assert counter.count <= 1, counter.format()
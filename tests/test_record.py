@@ -0,0 +1,57 @@
+"""Журнал трафика: запись запросов и вебсокета, чтение для воспроизведения"""
+import json
+
+from fastapi.testclient import TestClient
+
+from src.server.main import app
+from src.server.record import MiddlewareRecord
+from src.server.replay import get_route, get_body, load_log
+
+
+def test_record_http_and_websocket(api, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    middleware = MiddlewareRecord(app, path=str(path))
+    client = TestClient(middleware)
+    api.request("GET", "/api/task")  # базу теста подставляет api
+    # Первое событие после сброса кешей начинает цепочку версий и идёт без изменений
+    assert client.patch("/api/task/1", json={"description": "start"}).status_code == 200
+    with client.websocket_connect("/ws/updates") as websocket:
+        assert client.get("/api/profile-tool/1/component").status_code == 200
+        assert client.patch("/api/task/1", json={"description": "replay"}).status_code == 200
+        message = json.loads(websocket.receive_text())
+    middleware.recorder.close()
+
+    assert message["event"] == "data_updated"
+    assert message["since"] is not None and message["version"] > message["since"]
+    list_upsert = [item for change in message["change"] for item in change["list_upsert"]]
+    assert {item["id"] for item in list_upsert} == {1}
+    assert all(item["description"] == "replay" for item in list_upsert)
+
+    list_item = load_log(path)
+    list_http = [item for item in list_item if item["k"] == "http"][1:]
+    assert [get_route(item) for item in list_http] == [
+        "GET /api/profile-tool/{profiletool_id}/component", "PATCH /api/task/{task_id}"
+    ]
+    assert get_body(list_http[1]) == b'{"description":"replay"}'
+    assert list_http[1]["h"]["content-type"] == "application/json"
+    assert all(item["s"] == 200 and item["n"] > 0 for item in list_http)
+    assert [item["k"] for item in list_item if item["k"] != "http"] == ["ws_open", "ws_close"]
+    assert '"k":"ws_send"' in path.read_text(encoding="utf-8")
+
+
+def test_route_without_template():
+    assert get_route({"m": "PATCH", "p": "/api/task/component/stage/17"}) == "PATCH /api/task/component/stage/{id}"
+
+
+def test_connection_unique_across_session(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    list_line = [
+        {"t": 0, "k": "start"}, {"t": 1, "k": "ws_open", "c": 1, "p": "/ws/updates"}, {"t": 2, "k": "ws_close", "c": 1},
+        {"t": 0, "k": "start"}, {"t": 1, "k": "ws_open", "c": 1, "p": "/ws/updates"},
+    ]
+    path.write_text("\n".join(json.dumps(item) for item in list_line), encoding="utf-8")
+    list_item = load_log(path)
+    assert [(item["k"], item["c"]) for item in list_item] == [
+        ("ws_open", (1, 1)), ("ws_close", (1, 1)), ("ws_open", (2, 1))
+    ]
+    assert list_item[-1]["t"] == 3
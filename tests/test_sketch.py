@@ -0,0 +1,32 @@
+"""Эскиз из колонки profile.sketch (до миграции 003) переносится в хранилище при первом запросе"""
+import base64
+
+from src.server import sketch_store
+from src.server.models.profile import ModelProfile
+
+SCALE_LEGACY = 2  # отдельная база: тест меняет профиль
+# PNG 1×1
+IMAGE_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+
+
+def test_legacy_sketch_moved_on_request(open_api, tmp_path, monkeypatch):
+    monkeypatch.setattr(sketch_store, "DIR_SKETCH", tmp_path)
+    api = open_api(SCALE_LEGACY)
+    with api.Session() as db:
+        profile = db.get(ModelProfile, 1)
+        profile.sketch = "data:image/png;base64," + base64.b64encode(IMAGE_PNG).decode()
+        profile.sketch_hash = None
+        db.commit()
+
+    response, _ = api.request("GET", "/api/profile/1/sketch")
+    assert response.status_code == 200 and response.content == IMAGE_PNG
+    with api.Session() as db:
+        profile = db.get(ModelProfile, 1)
+        assert profile.sketch is None and profile.sketch_hash
+        sketch_hash = profile.sketch_hash
+    response, _ = api.request("GET", "/api/profile")
+    assert {item["id"]: item for item in response.json()}[1]["sketch_hash"] == sketch_hash
+    response, _ = api.request("GET", "/api/profile/1/sketch", headers={"If-None-Match": f'"{sketch_hash}"'})
+    assert response.status_code == 304